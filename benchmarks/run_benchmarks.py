@@ -0,0 +1,368 @@
+"""
+Scalability benchmarks of the scheduler and the task lifecycle.
+
+Every case runs in a fresh interpreter, so threads and memory of one case never leak into the next one.
+The results are written as JSON, and a previous result file can be passed to --compare to print the ratios.
+
+    python benchmarks/run_benchmarks.py --sizes 1000 10000 --output results.json
+    python benchmarks/run_benchmarks.py --sizes 1000 --compare results.json
+"""
+import gc
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import datetime
+import tempfile
+import threading
+import subprocess
+import tracemalloc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from taskmanager import Manager, TimePlan, Timeout
+from taskmanager.logutil import Logger
+
+
+# cases which start one thread per task are capped to this many tasks
+THREAD_HEAVY_LIMIT = 2000
+
+
+################################################ task functions ################################################
+
+def noop_task(terminate_event):
+    return True, None
+
+
+def sleep_task(terminate_event):
+    terminate_event.wait(0.01)
+    return True, None
+
+
+def cpu_task(terminate_event):
+    deadline = time.perf_counter() + 0.001
+    while time.perf_counter() < deadline:
+        pass
+    return True, None
+
+
+def blocking_task(terminate_event):
+    terminate_event.wait()
+    return False, "terminated"
+
+
+TASK_FUNCS = {"noop": noop_task, "sleep": sleep_task, "cpu": cpu_task}
+
+################################################################################################################
+
+
+class _SampleRecorder:
+    """Keeps every observed value, so the percentiles are exact."""
+
+    def __init__(self) -> None:
+        self.samples = []
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self.samples.append(value)
+
+
+class _RecordingMetrics:
+    """Stands in for TaskMetrics, all tasks of a case share one."""
+
+    def __init__(self) -> None:
+        self.schedule_lag = _SampleRecorder()
+        self.queue_wait = _SampleRecorder()
+        self.running_time = _SampleRecorder()
+
+    def count_state(self, state):
+        pass
+
+    def observe_report(self, running_time, result_bool):
+        self.running_time.observe(running_time)
+
+
+def _percentiles(samples):
+    if not samples:
+        return {"count": 0}
+    samples = sorted(samples)
+    count = len(samples)
+
+    def rank(percentile):
+        return samples[min(count - 1, int(count * percentile))]
+
+    return {"count": count, "mean": sum(samples) / count, "p50": rank(0.5), "p90": rank(0.9), "p99": rank(0.99), "max": samples[-1]}
+
+
+def _create_manager(**kwargs):
+    return Manager("bench", streaming_log_level="CRITICAL", **kwargs)
+
+
+def _record_metrics(manager):
+    recording_metrics = _RecordingMetrics()
+    for task in manager.task_dict.values():
+        task._metrics = recording_metrics
+    return recording_metrics
+
+
+def _start_management(manager):
+    # the first run is skipped, every case starts from the scheduled runs
+    threading.Thread(target=manager._run_management, daemon=True).start()
+
+
+################################################ benchmark cases ################################################
+
+def bench_idle_cpu(size, task_kind, duration):
+    """CPU time of the process while size tasks are registered and none of them is due."""
+    manager = _create_manager()
+    for index in range(size):
+        manager.add_task(f"task-{index}", TASK_FUNCS[task_kind], TimePlan.create_interval_schedule(hr=1), Timeout(sec=1))
+
+    _start_management(manager)
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    time.sleep(duration)
+    cpu_time, wall_time = time.process_time() - cpu_start, time.perf_counter() - wall_start
+    return {"cpu_ratio": cpu_time / wall_time, "cpu_seconds_per_task_per_second": cpu_time / wall_time / size}
+
+
+def bench_firing_latency(size, task_kind, duration):
+    """Delay from the due time to Task.run (schedule lag) and to the start on a worker (queue wait), spread 1s fixed-rate tasks."""
+    manager = _create_manager(spread=True)
+    for index in range(size):
+        manager.add_task(f"task-{index}", TASK_FUNCS[task_kind], TimePlan.create_interval_schedule(sec=1, fixed_rate=True), Timeout(sec=5))
+    recording_metrics = _record_metrics(manager)
+
+    _start_management(manager)
+    time.sleep(duration)
+
+    firing_lags = [lag + wait for lag, wait in zip(recording_metrics.schedule_lag.samples, recording_metrics.queue_wait.samples)]
+    return {
+        "schedule_lag": _percentiles(recording_metrics.schedule_lag.samples),
+        "queue_wait": _percentiles(recording_metrics.queue_wait.samples),
+        "firing_lag": _percentiles(firing_lags),
+    }
+
+
+def bench_run_startup(size, task_kind, duration):
+    """Cost of Task.run on the caller and the delay until the run starts, with cold and with warm workers."""
+    size = min(size, THREAD_HEAVY_LIMIT)
+    manager = _create_manager()
+    for index in range(size):
+        manager.add_task(f"task-{index}", TASK_FUNCS[task_kind], TimePlan.create_interval_schedule(hr=1), Timeout(sec=5))
+    recording_metrics = _record_metrics(manager)
+    _start_management(manager)
+
+    results = {}
+    for phase in ["cold", "warm"]:
+        recording_metrics.queue_wait.samples = []
+        recording_metrics.running_time.samples = []
+        call_times = []
+        # gen 0 collections are triggered by allocations of tracked objects, so they track the allocation churn per run
+        gc_collections = gc.get_stats()[0]["collections"]
+        for task in manager.task_dict.values():
+            call_start = time.perf_counter_ns()
+            task.run()
+            call_times.append((time.perf_counter_ns() - call_start) / 1e9)
+
+        # the runs are reported by the management loop
+        wait_deadline = time.monotonic() + max(duration, 10)
+        while len(recording_metrics.running_time.samples) < size and time.monotonic() < wait_deadline:
+            time.sleep(0.01)
+
+        results[phase] = {"run_call": _percentiles(call_times), "queue_wait": _percentiles(recording_metrics.queue_wait.samples),
+                          "gc_collections_per_run": (gc.get_stats()[0]["collections"] - gc_collections) / size}
+    results["size"] = size
+    return results
+
+
+def bench_manage_scan(size, task_kind, duration):
+    """Cost of one _manage_tasks pass with size registered tasks and nothing to do."""
+    manager = _create_manager()
+    for index in range(size):
+        manager.add_task(f"task-{index}", TASK_FUNCS[task_kind], TimePlan.create_interval_schedule(hr=1), Timeout(sec=1))
+
+    pass_times = []
+    bench_deadline = time.perf_counter() + min(duration, 2)
+    while time.perf_counter() < bench_deadline:
+        pass_start = time.perf_counter_ns()
+        manager._manage_tasks()
+        pass_times.append((time.perf_counter_ns() - pass_start) / 1e9)
+    return {"manage_pass": _percentiles(pass_times)}
+
+
+def bench_timeout_accuracy(size, task_kind, duration):
+    """Lateness of the termination of runs which never finish, against a 200ms timeout."""
+    size = min(size, THREAD_HEAVY_LIMIT)
+    timeout = 0.2
+    manager = _create_manager()
+    for index in range(size):
+        manager.add_task(f"task-{index}", blocking_task, TimePlan.create_interval_schedule(hr=1), Timeout(sec=0, ms=200))
+    recording_metrics = _record_metrics(manager)
+
+    # the runs are started before the loop, as in Manager.start, so the loop sees their deadlines
+    for task in manager.task_dict.values():
+        task.run()
+    _start_management(manager)
+
+    wait_deadline = time.monotonic() + max(duration, 10)
+    while len(recording_metrics.running_time.samples) < size and time.monotonic() < wait_deadline:
+        time.sleep(0.01)
+
+    lateness = [running_time - timeout for running_time in recording_metrics.running_time.samples]
+    return {"size": size, "termination_lateness": _percentiles(lateness)}
+
+
+def bench_memory_per_task(size, task_kind, duration):
+    """Python memory allocated per registered task, and per active run of tasks which block until they are terminated."""
+    tracemalloc.start()
+    manager = _create_manager()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for index in range(size):
+        manager.add_task(f"task-{index}", blocking_task, TimePlan.create_interval_schedule(hr=1), Timeout(hr=1))
+    registered = tracemalloc.get_traced_memory()[0]
+
+    run_size = min(size, THREAD_HEAVY_LIMIT)
+    recording_metrics = _record_metrics(manager)
+    for task in list(manager.task_dict.values())[:run_size]:
+        task.run()
+    wait_deadline = time.monotonic() + max(duration, 10)
+    while len(recording_metrics.queue_wait.samples) < run_size and time.monotonic() < wait_deadline:
+        time.sleep(0.01)
+    running = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return {"bytes_per_task": (registered - baseline) / size, "bytes_per_active_run": (running - registered) / run_size}
+
+
+def bench_logging_throughput(size, task_kind, duration):
+    """Log calls per second on the caller, in sync mode and in queue mode, with a stream and a file handler."""
+    results = {}
+    with tempfile.TemporaryDirectory() as log_folder_path:
+        for mode in ["sync", "queue"]:
+            logger = Logger(f"bench-log-{mode}", "DEBUG")
+            # the stream handler writes to devnull, so the terminal does not dominate the numbers
+            devnull = open(os.devnull, "w")
+            for handler in logger._logger.handlers:
+                handler.setStream(devnull)
+            logger.enable_physical_logging(log_folder_path, "DEBUG", 1)
+            if mode == "queue":
+                logger.enable_queue_logging(max(size, 1), 256)
+
+            call_start = time.perf_counter()
+            for index in range(size):
+                logger.info("%s Task name: %s, Run: %s, Result: %s", "[Bench]", "task", index, True)
+            call_time = time.perf_counter() - call_start
+            logger.stop_queue_logging()
+            total_time = time.perf_counter() - call_start
+            devnull.close()
+
+            results[mode] = {"calls_per_second": size / call_time, "records_per_second": size / total_time,
+                             "dropped_count": logger.dropped_count}
+    return results
+
+
+BENCHMARKS = {
+    "idle_cpu": bench_idle_cpu,
+    "firing_latency": bench_firing_latency,
+    "run_startup": bench_run_startup,
+    "manage_scan": bench_manage_scan,
+    "timeout_accuracy": bench_timeout_accuracy,
+    "memory_per_task": bench_memory_per_task,
+    "logging_throughput": bench_logging_throughput,
+}
+
+################################################################################################################
+
+
+def _run_case(benchmark, size, task_kind, duration):
+    command = [sys.executable, os.path.abspath(__file__), "--child", benchmark,
+               "--sizes", str(size), "--task-kinds", task_kind, "--duration", str(duration)]
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {"error": completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else f"exit code {completed.returncode}"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _meta():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True).stdout.strip() or None
+    except Exception:
+        commit = None
+    return {
+        "timestamp": datetime.datetime.now().isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def _flatten(value, prefix=""):
+    if isinstance(value, dict):
+        flat = {}
+        for key, child in value.items():
+            flat.update(_flatten(child, f"{prefix}.{key}" if prefix else key))
+        return flat
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {prefix: value}
+    return {}
+
+
+def _compare(results, baseline_path):
+    with open(baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)
+    baseline_cases = {(case["benchmark"], case["size"], case["task_kind"]): case for case in baseline["results"]}
+
+    for case in results:
+        baseline_case = baseline_cases.get((case["benchmark"], case["size"], case["task_kind"]))
+        if baseline_case is None:
+            continue
+        baseline_values = _flatten(baseline_case["result"])
+        for metric, value in _flatten(case["result"]).items():
+            baseline_value = baseline_values.get(metric)
+            if baseline_value:
+                print(f"{case['benchmark']}[{case['size']},{case['task_kind']}] {metric}: {baseline_value:.6g} -> {value:.6g} ({value / baseline_value:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--benchmarks", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000])
+    parser.add_argument("--task-kinds", nargs="+", choices=list(TASK_FUNCS), default=["noop"])
+    parser.add_argument("--duration", type=float, default=5, help="seconds each timed case runs for")
+    parser.add_argument("--output", help="JSON file to write, stdout if not given")
+    parser.add_argument("--compare", help="JSON file of a previous run to compare with")
+    parser.add_argument("--child", choices=list(BENCHMARKS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        result = BENCHMARKS[args.child](args.sizes[0], args.task_kinds[0], args.duration)
+        print(json.dumps(result))
+        # worker threads of the case are not joined
+        os._exit(0)
+
+    results = []
+    for benchmark in args.benchmarks:
+        for size in args.sizes:
+            for task_kind in args.task_kinds:
+                print(f"running {benchmark} size={size} task_kind={task_kind}", file=sys.stderr)
+                results.append({"benchmark": benchmark, "size": size, "task_kind": task_kind,
+                                "result": _run_case(benchmark, size, task_kind, args.duration)})
+
+    report = {"meta": _meta(), "results": results}
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        _compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,8 +6,8 @@ setup(
     description='A lite task manager for manage tasks in python',
     author='Tsung-Hsuan Hung',
     author_email="cxweoth@gmail.com",
-    packages=find_packages(),
+    packages=find_packages(exclude=["tests", "tests.*"]),
     long_description=open('README.md').read(),
     long_description_content_type='text/markdown',
-    install_requires=["schedule"],
+    install_requires=[],
 )
@@ -1,17 +1,37 @@
+import os
 import time
+import zlib
+import atexit
+import socket
+import datetime
+import functools
+import threading
 
 from .TimePlan import TimePlan, TimePlanType
 
-from .task import TaskConfig, Task
-from .taskscheduler import TaskScheduler
+from .task import TaskConfig, Task, TaskState, OverlapPolicy
+from .taskscheduler import TaskScheduler, DeadlineHeap, CompletionQueue
+from .executor import ThreadWorkerPool, ProcessWorkerPool, AsyncioWorkerPool
 from .logutil import Logger
+from .ledger import RunRecord, RunLedger, SqliteRunLedger
+from .metrics import TaskMetrics, MetricsRegistry, MetricsServer, LoopProfiler
+from .coordination import Coordinator
+from .subscription import OverflowPolicy, Subscription, SubscriptionBroker
+from .workflow import Workflow
+from .checkpoint import MisfirePolicy, CheckpointStore
+from .resource import ResourceBudget
 
 
 class Manager:
 
-    def __init__(self, manager_name, sleep_time=1, streaming_log_level="DEBUG") -> None:
+    # low-discrepancy step, the k-th aligned task is placed at frac(k * ratio) of the period
+    _SPREAD_RATIO = 0.6180339887498949
+
+    def __init__(self, manager_name, sleep_time=1, streaming_log_level="DEBUG", max_workers=None, max_pending=0,
+                 startup_ramp=0, spread=False, spread_window=60) -> None:
 
         self._manager_name = manager_name
+        # kept for compatibility, the management loop no longer ticks
         self._sleep_time = sleep_time
 
         # Initialize logging and task dictionary
@@ -21,6 +41,62 @@ class Manager:
         # scheduler
         self._task_scheduler = TaskScheduler()
 
+        # timeout and force kill deadlines of the running tasks
+        self._deadline_heap = DeadlineHeap()
+
+        # worker pools, tasks run on the default pool unless they pick another one
+        self._executor_dict = {}
+        self.add_executor("default", max_workers, max_pending)
+
+        # token budgets of the resources shared by the tasks, runs wait for their tokens in one fair queue
+        self._resource_budget = ResourceBudget()
+
+        # tasks whose state has changed, it also wakes up the management loop before its next deadline
+        self._completion_queue = CompletionQueue()
+
+        # load spreading, the first runs are ramped up over startup_ramp seconds,
+        # with spread aligned tasks get phase offsets across their interval or across spread_window for time points
+        if not isinstance(startup_ramp, (int, float)) or startup_ramp < 0:
+            raise ValueError("startup_ramp must be non-negative number")
+        if not isinstance(spread_window, (int, float)) or spread_window < 0:
+            raise ValueError("spread_window must be non-negative number")
+        self._startup_ramp = startup_ramp
+        self._is_spread = spread
+        self._spread_window = spread_window
+        # number of tasks added per aligned plan, keyed by plan type and plan
+        self._spread_counts = {}
+
+        # run history, None means the reports are only logged
+        self._run_ledger = None
+
+        # streaming of the reported runs to the subscriptions
+        self._subscription_broker = SubscriptionBroker()
+
+        # histograms and counters of every task, served over http once the metrics server is enabled
+        self._metrics_registry = MetricsRegistry(manager_name)
+        self._metrics_server = None
+
+        # phase timing of the management loop, None means the loop is not instrumented
+        self._loop_profiler = None
+
+        # coordination with other managers sharing the task set, None means every run fires here
+        self._coordinator = None
+        self._coordination_mode = None
+        self._owner_id = None
+        self._owned_tasks = frozenset()
+        self._lease_valid_until = 0 # time.monotonic()
+        # task name -> claim slot length in seconds
+        self._claim_periods = {}
+
+        # warm restarts from the checkpointed schedule state, None means every start fires every task once
+        self._checkpoint_store = None
+        self._checkpoint_state = None
+        self._checkpoint_interval = 30
+        self._misfire_policy = MisfirePolicy.RUN_ONCE
+        self._catch_up_limit = 1
+        # task name -> time.time() of the last fire, kept only while checkpointing
+        self._last_fire_times = {}
+
     def _initialize_logging(self, streaming_log_level):
         # logging setting
         self._log_title = f"[{self.__class__.__name__}]"
@@ -30,6 +106,21 @@ class Manager:
     def _initialize_task_dict(self):
         # task dict
         self._task_dict = {}
+        # task name -> scheduler job, and the (time_plan, jitter, offset) it was created from, kept to resume or reschedule
+        self._job_dict = {}
+        self._schedule_dict = {}
+        self._paused_tasks = set()
+        # guards the dicts above against runtime changes from other threads
+        self._task_lock = threading.RLock()
+
+        # workflows, their node tasks are kept apart from the task dict since they only run as part of the workflow
+        self._workflow_dict = {}
+        # node task name -> (workflow, node name), and node task name -> Task
+        self._workflow_node_dict = {}
+        self._workflow_task_dict = {}
+        # workflow name -> scheduler job, and the (time_plan, jitter, offset) it was created from, kept to resume from a checkpoint
+        self._workflow_job_dict = {}
+        self._workflow_schedule_dict = {}
 
     @property
     def manager_name(self):
@@ -42,6 +133,93 @@ class Manager:
     @property
     def task_dict(self):
         return self._task_dict
+
+    @property
+    def workflow_dict(self):
+        return self._workflow_dict
+
+    @property
+    def paused_tasks(self):
+        return sorted(self._paused_tasks)
+
+    @property
+    def executor_dict(self):
+        return self._executor_dict
+
+    @property
+    def resource_budget(self):
+        return self._resource_budget
+
+    @property
+    def run_ledger(self):
+        return self._run_ledger
+
+    @property
+    def metrics_registry(self):
+        return self._metrics_registry
+
+    def metrics_snapshot(self):
+        """
+        Returns the metrics of every task as {task_name: metrics}. metrics holds the schedule_lag, resource_wait, queue_wait and running_time
+        histograms in seconds, state_counts by TaskState value, failed_count, overlap_counts, active_runs and pending_runs.
+        """
+        return self._metrics_registry.snapshot()
+
+    def status(self):
+        """
+        Returns a summary of the manager as {"manager_name", "task_count", "active_runs", "pending_runs", "waiting_runs", "next_run_in",
+        "leaked_workers"}, waiting_runs are the active runs waiting for resource tokens, next_run_in is in seconds, None if no run is scheduled.
+        """
+        tasks = list(self._task_dict.values())
+        return {
+            "manager_name": self._manager_name,
+            "task_count": len(tasks),
+            "active_runs": sum(len(task.active_runs) for task in tasks),
+            "pending_runs": sum(task.pending_count for task in tasks),
+            "waiting_runs": self._resource_budget.waiting_count,
+            "next_run_in": self._task_scheduler.idle_seconds,
+            "leaked_workers": sum(executor.leaked_count for executor in list(self._executor_dict.values())),
+        }
+
+    def leak_stats(self):
+        """
+        Returns {executor_name: {"leaked_count", "recovered_count", "leaked_cpu_time"}} of the worker pools.
+        A worker is leaked when it still runs after the whole kill ladder, it is recovered once it finishes.
+        leaked_cpu_time is the CPU time in seconds used by the leaked threads, None where it is not measured.
+        """
+        return {executor_name: executor.leak_stats() for executor_name, executor in list(self._executor_dict.items())}
+
+    def resource_stats(self):
+        """Returns {resource_name: {"capacity", "available", "waiting"}}, waiting is the number of queued runs which need the resource."""
+        return self._resource_budget.snapshot()
+
+    def subscribe(self, task_name=None, callback=None, capacity=1024, overflow_policy=OverflowPolicy.DROP_OLDEST,
+                  block_timeout=1, sample_every=10):
+        """
+        Subscribes to the outputs of the runs as they are reported, every subscription has its own bounded ring buffer.
+ 
+        Parameters:
+        - task_name (str, optional): The name of the task, or "<workflow_name>.<node_name>" of a workflow node,
+          None subscribes to every task.
+        - callback (callable, optional): Called with every RunRecord on a thread of the subscription.
+          Without a callback the records are read with Subscription.get, a for loop or an async for loop.
+        - capacity (int, optional): Maximum number of buffered records.
+        - overflow_policy (OverflowPolicy or str, optional): What to do with a record while the buffer is full,
+          "drop_oldest", "block" or "sample". "block" holds the manager loop up to block_timeout seconds, then drops the oldest record.
+        - block_timeout (float, optional): Maximum wait of the "block" policy in seconds.
+        - sample_every (int, optional): The "sample" policy keeps one of every sample_every overflowing records.
+        Returns:
+        Subscription: close it to unsubscribe.
+        """
+
+        # the runs of workflow nodes are published like the runs of tasks
+        if task_name is not None and task_name not in self._task_dict and task_name not in self._workflow_task_dict:
+            raise ValueError(f"task {task_name} does not exist")
+
+        subscription = Subscription(task_name, capacity, overflow_policy, callback, block_timeout, sample_every,
+                                    on_close=self._subscription_broker.remove)
+        self._subscription_broker.add(subscription)
+        return subscription
     
     ###################################### enable tools ######################################
     def enable_physical_logging(self, log_folder_path, log_level="DEBUG", rotate_days=30):
@@ -64,47 +242,561 @@ class Manager:
         except Exception as e:
             raise Exception(f"enable physical logging failed: {str(e)}")
 
+    def enable_queue_logging(self, max_queue_size=10000, batch_size=256):
+        """
+        Enables queue logging. The manager loop and the tasks only enqueue log records,
+        a background thread formats and writes them, so a slow disk never stalls scheduling.
+        The queue depth and the number of dropped records are exposed by manager.logger.queue_depth and manager.logger.dropped_count.
+
+        Parameters:
+        - max_queue_size (int, optional): Maximum number of queued records, a record which does not fit is dropped.
+        - batch_size (int, optional): Maximum number of records written per wakeup of the writer thread.
+        Returns:
+        None
+        """
+
+        try:
+            self._logger.enable_queue_logging(max_queue_size, batch_size)
+        except Exception as e:
+            raise Exception(f"enable queue logging failed: {str(e)}")
+
+    def enable_run_ledger(self, db_path=None, retention_days=30, ledger=None):
+        """
+        Enables the run ledger, which records the report of every finished run.
+        The records are written in batches by a background thread and can be queried by task and time range,
+        e.g. manager.run_ledger.running_time_percentile("my_task", 95, start=last_week).
+
+        Parameters:
+        - db_path (str, optional): The path to the SQLite file of the default ledger.
+        - retention_days (float, optional): The number of days the records are kept in the default ledger, None keeps them forever.
+        - ledger (RunLedger, optional): A ledger to use instead of the default SQLite ledger.
+        Returns:
+        None
+        """
+
+        if ledger is not None:
+            if not isinstance(ledger, RunLedger):
+                raise ValueError("ledger must be RunLedger")
+            self._run_ledger = ledger
+            return
+
+        if not isinstance(db_path, str):
+            raise ValueError("db_path must be string")
+
+        try:
+            self._run_ledger = SqliteRunLedger(db_path, retention_days, logger=self._logger)
+        except Exception as e:
+            raise Exception(f"enable run ledger failed: {str(e)}")
+
+    def enable_metrics_server(self, port=9100, host="127.0.0.1"):
+        """
+        Serves the task metrics at http://host:port/metrics in the Prometheus text format.
+
+        Parameters:
+        - port (int, optional): The port to listen on, 0 picks a free port.
+        - host (str, optional): The address to bind.
+        Returns:
+        int: The port the server listens on.
+        """
+
+        if self._metrics_server is not None:
+            return self._metrics_server.port
+
+        try:
+            self._metrics_server = MetricsServer(self._metrics_registry, port, host)
+            self._metrics_server.start()
+        except Exception as e:
+            self._metrics_server = None
+            raise Exception(f"enable metrics server failed: {str(e)}")
+        return self._metrics_server.port
+
+    def enable_loop_profiling(self, budget=0.1, window=1000):
+        """
+        Times every phase of each iteration of the management loop. An iteration which runs longer than budget
+        is logged as a warning with the stack of the loop thread, taken while it is still stalled.
+
+        Parameters:
+        - budget (float, optional): The time in seconds an iteration may take.
+        - window (int, optional): The number of iterations the rolling stats are kept for.
+        Returns:
+        None
+        """
+
+        if self._loop_profiler is not None:
+            return
+
+        try:
+            loop_profiler = LoopProfiler(self._logger, self._log_title, budget, window)
+            loop_profiler.start_watchdog()
+        except Exception as e:
+            raise Exception(f"enable loop profiling failed: {str(e)}")
+        self._loop_profiler = loop_profiler
+
+    def loop_stats(self):
+        """
+        Returns the rolling stats of the management loop as {phase: {"count", "mean", "p50", "p99", "max"}} in seconds,
+        the phases are "schedule", "deadlines", "completions" and "total". None if loop profiling is not enabled.
+        """
+        if self._loop_profiler is None:
+            return None
+        return self._loop_profiler.stats()
+
+    def profile_loop(self, iterations=100, profiler=None):
+        """
+        Runs a profiler on the management loop thread for the next iterations. Loop profiling must be enabled.
+
+        Parameters:
+        - iterations (int, optional): The number of iterations to profile.
+        - profiler (optional): Anything with enable() and disable(), cProfile.Profile() by default.
+        Returns:
+        Future: Resolves to the profiler once it is disabled, e.g. pstats.Stats(future.result()).
+        """
+
+        if self._loop_profiler is None:
+            raise ValueError("loop profiling is not enabled")
+        return self._loop_profiler.profile_iterations(iterations, profiler)
+
+    def enable_coordination(self, coordinator, mode="lease", lease_ttl=30, claim_resolution=1, owner_id=None):
+        """
+        Shares the task set with other managers which use the same coordinator, so every run fires on one manager only.
+        In "lease" mode each task is owned by one manager at a time, the tasks are balanced across the live managers,
+        and the tasks of a manager which stops renewing are taken over once its leases expire.
+        In "claim" mode every manager schedules every task, and a run fires on the manager which first claims its slot,
+        the slot is the interval for interval plans and claim_resolution seconds otherwise. Claim mode suits fixed-rate,
+        daily, weekly and cron plans without jitter, and skips the first run of start.
+
+        Parameters:
+        - coordinator (Coordinator): e.g. SqliteCoordinator("coordination.db") or FileLockCoordinator("/shared/folder").
+        - mode (str, optional): "lease" or "claim".
+        - lease_ttl (float, optional): Seconds a lease lasts without renewal, leases are renewed every third of it.
+        - claim_resolution (float, optional): Slot length in seconds of the claims of time point plans.
+        - owner_id (str, optional): The name of this manager in the coordinator, host, pid and manager name by default.
+        Returns:
+        None
+        """
+
+        if not isinstance(coordinator, Coordinator):
+            raise ValueError("coordinator must be Coordinator")
+        if mode not in ("lease", "claim"):
+            raise ValueError(f"coordination mode {mode} is not supported")
+        if not isinstance(lease_ttl, (int, float)) or lease_ttl <= 0:
+            raise ValueError("lease_ttl must be positive number")
+        if not isinstance(claim_resolution, (int, float)) or claim_resolution <= 0:
+            raise ValueError("claim_resolution must be positive number")
+        if self._coordinator is not None:
+            raise ValueError("coordination is already enabled")
+
+        self._owner_id = owner_id if owner_id is not None else f"{socket.gethostname()}-{os.getpid()}-{self._manager_name}"
+        self._coordination_mode = mode
+        self._lease_ttl = lease_ttl
+        self._claim_resolution = claim_resolution
+        self._coordinator = coordinator
+
+        if mode == "lease":
+            # the first leases are taken before start, so the first run only fires on the owners
+            self._renew_leases()
+            threading.Thread(target=self._run_lease_renewal, name=f"{self._manager_name}-lease-renewal", daemon=True).start()
+            atexit.register(self._release_leases)
+
+    def enable_checkpoint(self, state_path, interval=30, misfire_policy=MisfirePolicy.RUN_ONCE, catch_up_limit=1):
+        """
+        Enables warm restarts. The last run and next due time of every task and workflow are saved to state_path every interval
+        seconds and at exit. On start, a task or workflow which is in the state file with the same time plan is not run at once,
+        it resumes its schedule, and the runs it missed while the manager was down are handled by misfire_policy.
+        New tasks and workflows, and those whose time plan has changed, run at once as on a cold start.
+        Call it before start.
+
+        Parameters:
+        - state_path (str): The path to the state file.
+        - interval (float, optional): The number of seconds between two checkpoints.
+        - misfire_policy (MisfirePolicy or str, optional): "run_once" runs a task once if it missed any run,
+          "skip" waits for its next due time, "catch_up" fires one run for every missed run, up to catch_up_limit.
+        - catch_up_limit (int, optional): Maximum number of missed runs fired by "catch_up", the overlap policy of the task applies to them.
+        Returns:
+        None
+        """
+
+        if not isinstance(interval, (int, float)) or interval <= 0:
+            raise ValueError("interval must be positive number")
+        try:
+            misfire_policy = MisfirePolicy(misfire_policy)
+        except ValueError:
+            raise ValueError(f"misfire_policy {misfire_policy} is not supported")
+        if not isinstance(catch_up_limit, int) or catch_up_limit <= 0:
+            raise ValueError("catch_up_limit must be positive int")
+
+        try:
+            self._checkpoint_store = CheckpointStore(state_path)
+        except Exception as e:
+            raise Exception(f"enable checkpoint failed: {str(e)}")
+        self._checkpoint_interval = interval
+        self._misfire_policy = misfire_policy
+        self._catch_up_limit = catch_up_limit
+
+        try:
+            self._checkpoint_state = self._checkpoint_store.load()
+        except Exception as e:
+            # a broken state file only costs a cold start
+            self._logger.critical(f"{self._log_title} load checkpoint {state_path} failed, start cold: {str(e)}")
+            self._checkpoint_state = None
+
+    ###########################################################################################
+
+    ###################################### add executor #######################################
+
+    def add_executor(self, executor_name:str, max_workers=None, max_pending=0, executor_type="thread", kill_delays=(0, 1, 5), leak_grace=5):
+        """
+        Adds a named worker pool which tasks can pick in add_task.
+
+        Parameters:
+        - executor_name (str): The name of the pool.
+        - max_workers (int, optional): Maximum number of workers, None means no limit for threads and the cpu count for processes.
+        - max_pending (int, optional): Maximum number of runs waiting for a worker, 0 means no limit.
+        - executor_type (str, optional): "thread", "process" or "asyncio". Process pools run picklable task functions in worker processes,
+          asyncio pools run coroutine task functions on one event loop thread.
+        - kill_delays (tuple, optional): Seconds before each force kill attempt of a thread pool, the first one counts from the terminate limit.
+        - leak_grace (float, optional): Seconds after the last force kill attempt of a thread pool before its worker is leaked.
+        Returns:
+        None
+        """
+
+        if not isinstance(executor_name, str):
+            raise ValueError("executor_name must be string")
+        if executor_name in self._executor_dict:
+            raise ValueError(f"executor {executor_name} already exists")
+
+        pool_name = f"{self._manager_name}-{executor_name}"
+        if executor_type == "thread":
+            self._executor_dict[executor_name] = ThreadWorkerPool(pool_name, max_workers, max_pending, kill_delays, leak_grace)
+        elif executor_type == "process":
+            self._executor_dict[executor_name] = ProcessWorkerPool(pool_name, max_workers, max_pending)
+        elif executor_type == "asyncio":
+            self._executor_dict[executor_name] = AsyncioWorkerPool(pool_name, max_workers, max_pending)
+        else:
+            raise ValueError(f"executor_type {executor_type} is not supported")
+
+    ###########################################################################################
+
+    ###################################### add resource #######################################
+
+    def add_resource(self, resource_name:str, capacity:int):
+        """
+        Adds a resource shared by the tasks of the manager, e.g. a database which takes 4 connections at most.
+        Tasks declare the tokens a run holds in add_task, a run waits for its tokens before it is started on a worker.
+
+        Parameters:
+        - resource_name (str): The name of the resource.
+        - capacity (int): The number of tokens of the resource.
+        Returns:
+        None
+        """
+
+        self._resource_budget.add_resource(resource_name, capacity)
+
     ###########################################################################################
 
     ###################################### add task ###########################################
 
-    def add_task(self, task_name:str, task_func, time_plan:TimePlan, timeout:int, *args, **kwargs):
+    def add_task(self, task_name:str, task_func, time_plan:TimePlan, timeout:int, *args, executor="default",
+                 max_instances=1, overlap_policy=OverlapPolicy.SKIP, queue_depth=1, jitter=0, phase=None,
+                 cache=False, cache_ttl=None, cache_size=128, cache_key=None, resources=None, **kwargs):
         """
         Adds a task to the manager.
  
         Parameters:
         - task_name (str): The name of the task.
-        - task_func (callable): The function that implements the task.
+        - task_func (callable): The function that implements the task, an async def function runs on the shared event loop.
         - time_plan (TimePlan): The schedule on which the task should run.
         - timeout (int): Maximum allowed runtime for the task in seconds.
         - args (tuple, optional): Positional arguments to pass to task_func.
+        - executor (str, optional): The name of the worker pool which runs the task, "process" runs it on the shared process pool.
+          Coroutine functions run on the shared "asyncio" pool unless an asyncio pool is given.
+        - max_instances (int, optional): Maximum number of runs of the task which may be active at once.
+        - overlap_policy (OverlapPolicy or str, optional): What to do with a run which is due while max_instances runs are active,
+          "skip", "queue", "coalesce" or "replace".
+        - queue_depth (int, optional): Maximum number of pending runs for the "queue" policy.
+        - jitter (float, optional): Maximum random delay of every run in seconds, the sequence is seeded by task_name.
+          Interval jitter is symmetric for fixed-delay plans and must be less than the interval.
+        - phase (float, optional): Offset of the schedule in seconds, None uses the spread offset if spread is enabled.
+        - cache (bool, optional): Memoizes the true results of the task, a run whose inputs are cached replays the result
+          instead of calling task_func.
+        - cache_ttl (float, optional): Seconds a cached result is replayed, None keeps it until it is evicted.
+          cache needs cache_ttl or cache_key, since the arguments of a task are fixed.
+        - cache_size (int, optional): Maximum number of cached results, the least recently used one is evicted first.
+        - cache_key (callable, optional): Called with args and kwargs, returns the fingerprint of the inputs.
+          None uses a digest of args and kwargs.
+        - resources (dict or list, optional): Tokens of the resources added by add_resource which a run holds, e.g. {"db": 1, "api": 2},
+          a list takes one token of each. A run waits for all of its tokens in a fair queue before it starts, the timeout
+          counts from the start and the wait is reported apart.
         - kwargs (dict, optional): Keyword arguments to pass to task_func.
  
         Returns:
         None
         """
 
-        task_config = TaskConfig(task_func, timeout, args, kwargs)
-        task = Task(task_config, task_name, self._logger)
+        self._check_name_is_free(task_name)
+        self._verify_schedule_args(jitter, phase)
+        task = self._create_task(task_name, task_func, timeout, args, kwargs, executor, max_instances, overlap_policy, queue_depth,
+                                 cache, cache_ttl, cache_size, cache_key, resources)
 
         # According time plan to create schedule
+        offset = phase if phase is not None else self._spread_offset(time_plan)
+        job = self._create_schedule(task_name, functools.partial(self._fire_task, task), time_plan, jitter, offset)
+
+        # add task to task dict
+        with self._task_lock:
+            self._task_dict[task_name] = task
+            self._job_dict[task_name] = job
+            self._schedule_dict[task_name] = (time_plan, jitter, offset)
+            self._set_claim_period(task_name, time_plan)
+        self._metrics_registry.add_task(task)
+
+        # memo to logs
+        log_msg = f"{self._log_title} Add task: {task_name} to manager: {self._manager_name}"
+        self._logger.info(log_msg)
+
+        # the new job may be due before the current deadline
+        self._wakeup()
+
+    def add_workflow(self, workflow:Workflow, time_plan:TimePlan, jitter=0, phase=None):
+        """
+        Adds a workflow to the manager. Every node runs as a task named "<workflow_name>.<node_name>" with its own timeout,
+        a node starts as soon as its upstream nodes are done with a true result.
+        A run which is due while the previous run of the workflow is active is skipped.
+
+        Parameters:
+        - workflow (Workflow): The workflow with its nodes.
+        - time_plan (TimePlan): The schedule on which the workflow should run.
+        - jitter (float, optional): Maximum random delay of every run in seconds, see add_task.
+        - phase (float, optional): Offset of the schedule in seconds, see add_task.
+        Returns:
+        None
+        """
+
+        if not isinstance(workflow, Workflow):
+            raise ValueError("workflow must be Workflow")
+        if not workflow.node_names:
+            raise ValueError(f"workflow {workflow.workflow_name} has no node")
+        self._check_name_is_free(workflow.workflow_name)
+        self._verify_schedule_args(jitter, phase)
+
+        node_tasks = {}
+        for node_name in workflow.node_names:
+            node_task_name = workflow.node_task_name(node_name)
+            self._check_name_is_free(node_task_name)
+            task_func, timeout, args, kwargs, executor = workflow.node(node_name)
+            node_tasks[node_name] = self._create_task(node_task_name, task_func, timeout, args, kwargs, executor)
+
+        offset = phase if phase is not None else self._spread_offset(time_plan)
+        job = self._create_schedule(workflow.workflow_name, functools.partial(self._fire_workflow, workflow), time_plan, jitter, offset)
+
+        with self._task_lock:
+            self._workflow_dict[workflow.workflow_name] = workflow
+            self._workflow_job_dict[workflow.workflow_name] = job
+            self._workflow_schedule_dict[workflow.workflow_name] = (time_plan, jitter, offset)
+            for node_name, task in node_tasks.items():
+                self._workflow_task_dict[task.task_name] = task
+                self._workflow_node_dict[task.task_name] = (workflow, node_name)
+                self._metrics_registry.add_task(task)
+
+        self._logger.info(f"{self._log_title} Add workflow: {workflow.workflow_name} with {len(node_tasks)} nodes to manager: {self._manager_name}")
+        self._wakeup()
+
+    def remove_task(self, task_name:str):
+        """
+        Removes a task from the manager while it is running. The task is not scheduled any more,
+        its active runs drain and are reported as usual, its pending runs are dropped.
+
+        Parameters:
+        - task_name (str): The name of the task.
+        Returns:
+        None
+        """
+
+        with self._task_lock:
+            task = self._task_dict.pop(task_name, None)
+            if task is None:
+                raise ValueError(f"task {task_name} does not exist")
+            job = self._job_dict.pop(task_name, None)
+            self._schedule_dict.pop(task_name, None)
+            self._paused_tasks.discard(task_name)
+            self._claim_periods.pop(task_name, None)
+            self._last_fire_times.pop(task_name, None)
+
+        if job is not None:
+            self._task_scheduler.cancel_job(job)
+        task.retire()
+        self._metrics_registry.remove_task(task_name)
+
+        self._logger.info(f"{self._log_title} Remove task: {task_name} from manager: {self._manager_name}, "
+                          f"draining {len(task.active_runs)} active runs")
+        self._wakeup()
+
+    def pause_task(self, task_name:str):
+        """
+        Stops scheduling a task until resume_task is called, its active and pending runs are not touched.
+
+        Parameters:
+        - task_name (str): The name of the task.
+        Returns:
+        None
+        """
+
+        with self._task_lock:
+            self._check_task_exists(task_name)
+            if task_name in self._paused_tasks:
+                return
+            self._paused_tasks.add(task_name)
+            job = self._job_dict.pop(task_name, None)
+
+        if job is not None:
+            self._task_scheduler.cancel_job(job)
+        self._logger.info(f"{self._log_title} Pause task: {task_name}")
+        self._wakeup()
+
+    def resume_task(self, task_name:str):
+        """
+        Schedules a paused task again, its next run is computed from now, the runs missed while paused are not fired.
+
+        Parameters:
+        - task_name (str): The name of the task.
+        Returns:
+        None
+        """
+
+        with self._task_lock:
+            self._check_task_exists(task_name)
+            if task_name not in self._paused_tasks:
+                return
+            time_plan, jitter, offset = self._schedule_dict[task_name]
+            fire_task = functools.partial(self._fire_task, self._task_dict[task_name])
+            self._job_dict[task_name] = self._create_schedule(task_name, fire_task, time_plan, jitter, offset)
+            self._paused_tasks.discard(task_name)
+
+        self._logger.info(f"{self._log_title} Resume task: {task_name}")
+        self._wakeup()
+
+    def update_time_plan(self, task_name:str, time_plan:TimePlan, jitter=None, phase=None):
+        """
+        Replaces the schedule of a task while it is running, its active runs are not touched.
+        The next run is computed from now. A paused task keeps the new plan until it is resumed.
+
+        Parameters:
+        - task_name (str): The name of the task.
+        - time_plan (TimePlan): The new schedule of the task.
+        - jitter (float, optional): Maximum random delay of every run in seconds, None keeps the current jitter.
+        - phase (float, optional): Offset of the schedule in seconds, None uses the spread offset if spread is enabled.
+        Returns:
+        None
+        """
+
+        self._verify_schedule_args(jitter if jitter is not None else 0, phase)
+
+        with self._task_lock:
+            self._check_task_exists(task_name)
+            if jitter is None:
+                jitter = self._schedule_dict[task_name][1]
+            offset = phase if phase is not None else self._spread_offset(time_plan)
+
+            # the new job is created first, so a plan which fails keeps the current schedule
+            job = None
+            if task_name not in self._paused_tasks:
+                fire_task = functools.partial(self._fire_task, self._task_dict[task_name])
+                job = self._create_schedule(task_name, fire_task, time_plan, jitter, offset)
+            elif not isinstance(time_plan, TimePlan) or not time_plan.is_valid:
+                raise ValueError("time_plan must be valid TimePlan")
+
+            old_job = self._job_dict.pop(task_name, None)
+            if job is not None:
+                self._job_dict[task_name] = job
+            self._schedule_dict[task_name] = (time_plan, jitter, offset)
+            self._set_claim_period(task_name, time_plan)
+
+        if old_job is not None:
+            self._task_scheduler.cancel_job(old_job)
+        self._logger.info(f"{self._log_title} Update time plan of task: {task_name} to {time_plan}")
+        self._wakeup()
+
+    def _check_task_exists(self, task_name):
+        if task_name not in self._task_dict:
+            raise ValueError(f"task {task_name} does not exist")
+
+    @staticmethod
+    def _verify_schedule_args(jitter, phase):
+        if not isinstance(jitter, (int, float)) or jitter < 0:
+            raise ValueError("jitter must be non-negative number")
+        if phase is not None and (not isinstance(phase, (int, float)) or phase < 0):
+            raise ValueError("phase must be non-negative number")
+
+    def _check_name_is_free(self, name):
+        if name in self._task_dict or name in self._workflow_dict or name in self._workflow_task_dict:
+            raise ValueError(f"task {name} already exists")
+
+    def _create_task(self, task_name, task_func, timeout, args, kwargs, executor, max_instances=1,
+                     overlap_policy=OverlapPolicy.SKIP, queue_depth=1, cache=False, cache_ttl=None, cache_size=128, cache_key=None,
+                     resources=None):
+        task_config = TaskConfig(task_func, timeout, args, kwargs, executor_name=executor,
+                                 max_instances=max_instances, overlap_policy=overlap_policy, queue_depth=queue_depth,
+                                 cache=cache, cache_ttl=cache_ttl, cache_size=cache_size, cache_key=cache_key, resources=resources)
+        for resource_name, tokens in task_config.resources.items():
+            if resource_name not in self._resource_budget.resource_names:
+                raise ValueError(f"resource {resource_name} does not exist")
+            # such a run would wait forever
+            if tokens > self._resource_budget.capacity(resource_name):
+                raise ValueError(f"tokens of resource {resource_name} exceed its capacity")
+        if task_config.is_coroutine and executor == "default":
+            executor = task_config.executor_name = "asyncio"
+
+        # the shared process and asyncio pools are created on first use
+        if executor in ("process", "asyncio") and executor not in self._executor_dict:
+            self.add_executor(executor, executor_type=executor)
+
+        if executor not in self._executor_dict:
+            raise ValueError(f"executor {executor} does not exist")
+        if task_config.is_coroutine != isinstance(self._executor_dict[executor], AsyncioWorkerPool):
+            raise ValueError(f"executor {executor} can not run task function {task_name}")
+
+        return Task(task_config, task_name, self._logger, self._completion_queue, self._executor_dict[executor], self._deadline_heap,
+                    TaskMetrics(task_name), self._resource_budget)
+
+    def _create_schedule(self, schedule_name, fire_task, time_plan, jitter, offset):
+        # fire_task is called with the due time by the scheduler
         try:
             time_plan_type = time_plan.time_plan_type
+            seed = zlib.crc32(schedule_name.encode())
             if time_plan_type == TimePlanType.INTERVAL:
-                self._task_scheduler.create_interval_schedule(time_plan.plan, task.run)
+                return self._task_scheduler.create_interval_schedule(time_plan.plan, fire_task, time_plan.is_fixed_rate, offset, jitter, seed)
             elif time_plan_type == TimePlanType.DAILY_POINTS:
-                self._task_scheduler.create_daily_schedule(time_plan.plan, task.run)
+                return self._task_scheduler.create_daily_schedule(time_plan.plan, fire_task, offset, jitter, seed)
             elif time_plan_type == TimePlanType.WEEKLY_POINTS:
-                self._task_scheduler.create_weekly_schedule(time_plan.plan, task.run)
+                return self._task_scheduler.create_weekly_schedule(time_plan.plan, fire_task, offset, jitter, seed)
+            elif time_plan_type == TimePlanType.CRON:
+                return self._task_scheduler.create_cron_schedule(time_plan.plan, fire_task, offset, jitter, seed)
+            raise ValueError(f"time plan type {time_plan_type} is not supported")
         except Exception as e:
             raise Exception(f"create schedule failed: {str(e)}")
 
-        # add task to task dict
-        self._task_dict[task_name] = task
+    def _set_claim_period(self, task_name, time_plan):
+        if time_plan.time_plan_type == TimePlanType.INTERVAL:
+            self._claim_periods[task_name] = time_plan.plan
+        else:
+            self._claim_periods.pop(task_name, None)
 
-        # memo to logs
-        log_msg = f"{self._log_title} Add task: {task_name} to manager: {self._manager_name}"
-        self._logger.info(log_msg)
+    def _spread_offset(self, time_plan):
+        if not self._is_spread:
+            return 0
+
+        # tasks with the same plan are aligned, so each one gets the next low-discrepancy point of the period
+        if time_plan.time_plan_type == TimePlanType.INTERVAL:
+            spread_key = (time_plan.time_plan_type, time_plan.plan, time_plan.is_fixed_rate)
+            period = time_plan.plan
+        else:
+            spread_key = (time_plan.time_plan_type, str(time_plan))
+            period = self._spread_window
+
+        aligned_count = self._spread_counts.get(spread_key, 0)
+        self._spread_counts[spread_key] = aligned_count + 1
+        return (aligned_count * self._SPREAD_RATIO) % 1 * period
 
     ###########################################################################################
 
@@ -127,6 +819,12 @@ class Manager:
             self._logger.critical(f"{self._log_title} first run failed: {str(e)}")
             raise Exception(f"first run failed: {str(e)}")
 
+        # checkpoints start once the schedule is resumed, so the loaded state is never overwritten before
+        if self._checkpoint_store is not None:
+            self._save_checkpoint()
+            threading.Thread(target=self._run_checkpointing, name=f"{self._manager_name}-checkpoint", daemon=True).start()
+            atexit.register(self._save_checkpoint)
+
         # run management
         self._logger.info(f"{self._log_title} Run management")
         try:
@@ -138,62 +836,353 @@ class Manager:
     ###########################################################################################
 
     def _first_run(self):
-        # run immediately
-        for _, task in self._task_dict.items():
-            task.run()
+        # name -> fire function, the same function the scheduler job of the task or workflow calls
+        task_fire_funcs = {task.task_name: functools.partial(self._fire_task, task) for task in list(self._task_dict.values())}
+        workflow_fire_funcs = {workflow.workflow_name: functools.partial(self._fire_workflow, workflow)
+                               for workflow in list(self._workflow_dict.values())}
+        if self._checkpoint_state is not None:
+            fire_funcs = self._resume_from_checkpoint("tasks", task_fire_funcs, self._schedule_dict, self._job_dict)
+            fire_funcs += self._resume_from_checkpoint("workflows", workflow_fire_funcs, self._workflow_schedule_dict, self._workflow_job_dict)
+        else:
+            fire_funcs = list(task_fire_funcs.values()) + list(workflow_fire_funcs.values())
+
+        if self._startup_ramp <= 0:
+            # run immediately
+            for fire_func in fire_funcs:
+                fire_func()
+            return
+
+        # the first runs are evenly spaced over the ramp, in the order the tasks were added
+        fire_count = len(fire_funcs)
+        for index, fire_func in enumerate(fire_funcs):
+            self._task_scheduler.create_once_schedule(self._startup_ramp * index / fire_count, fire_func)
+
+    def _fire_task(self, task, due_time=None, slot_time=None):
+        # due_time is the time.monotonic_ns() value the run was scheduled at, None for the first run
+        # slot_time is the wall clock point of calendar and cron runs in epoch seconds
+        # a removed or paused task may still have a job popped by the scheduler, or a first run ramped in
+        if task.is_retired or task.task_name in self._paused_tasks:
+            return
+        if self._coordinator is not None and not self._is_run_granted(task.task_name, due_time, slot_time):
+            return
+        if self._checkpoint_store is not None:
+            self._last_fire_times[task.task_name] = time.time()
+        task.run(due_time)
+
+    def _resume_from_checkpoint(self, section, fire_funcs, schedule_dict, job_dict):
+        # section is "tasks" or "workflows", returns the fire functions to call at once, repeated for every missed run caught up
+        saved_schedules = self._checkpoint_state.get(section, {})
+        now = time.time()
+        now_datetime = datetime.datetime.fromtimestamp(now)
+        resumed_fire_funcs = []
+        resumed_count = 0
+        missed_count = 0
+
+        for name, fire_func in fire_funcs.items():
+            time_plan, jitter, _ = schedule_dict[name]
+            saved_schedule = saved_schedules.get(name)
+            if saved_schedule is None or saved_schedule.get("plan") != str(time_plan) or saved_schedule.get("next_due") is None:
+                resumed_fire_funcs.append(fire_func)
+                continue
+
+            resumed_count += 1
+            if saved_schedule.get("last_run") is not None:
+                self._last_fire_times[name] = saved_schedule["last_run"]
+            next_due = saved_schedule["next_due"]
+            if next_due > now:
+                self._resume_schedule(name, fire_func, time_plan, jitter, next_due - now, job_dict)
+                continue
+
+            job = job_dict.get(name)
+            if job is None or self._misfire_policy == MisfirePolicy.SKIP:
+                continue
+            limit = self._catch_up_limit if self._misfire_policy == MisfirePolicy.CATCH_UP else 1
+            slot_count = job.count_slots(datetime.datetime.fromtimestamp(next_due), now_datetime, limit)
+            resumed_fire_funcs.extend([fire_func] * slot_count)
+            missed_count += slot_count
+
+        self._logger.info(f"{self._log_title} Resume {resumed_count} of {len(fire_funcs)} {section} from checkpoint "
+                          f"{self._checkpoint_store.state_path}, fire {missed_count} missed runs by policy {self._misfire_policy.value}")
+        return resumed_fire_funcs
+
+    def _resume_schedule(self, name, fire_func, time_plan, jitter, delay, job_dict):
+        # calendar plans are computed from the wall clock, only interval plans lose their phase on a restart
+        if time_plan.time_plan_type != TimePlanType.INTERVAL:
+            return
+        with self._task_lock:
+            old_job = job_dict.pop(name, None)
+            if old_job is None:
+                return
+            self._task_scheduler.cancel_job(old_job)
+            job_dict[name] = self._create_schedule(name, fire_func, time_plan, jitter, delay)
+
+    def _run_checkpointing(self):
+        while True:
+            time.sleep(self._checkpoint_interval)
+            self._save_checkpoint()
+
+    def _save_checkpoint(self):
+        now, now_ns = time.time(), time.monotonic_ns()
+        with self._task_lock:
+            saved_tasks = self._checkpoint_schedules(self._schedule_dict, self._job_dict, now, now_ns)
+            saved_workflows = self._checkpoint_schedules(self._workflow_schedule_dict, self._workflow_job_dict, now, now_ns)
+
+        try:
+            self._checkpoint_store.save({"manager_name": self._manager_name, "saved_at": now, "tasks": saved_tasks,
+                                         "workflows": saved_workflows})
+        except Exception as e:
+            self._logger.critical(f"{self._log_title} save checkpoint failed: {str(e)}")
+
+    def _checkpoint_schedules(self, schedule_dict, job_dict, now, now_ns):
+        saved_schedules = {}
+        for name, (time_plan, _, _) in schedule_dict.items():
+            job = job_dict.get(name)
+            next_due = None
+            if job is not None and job.next_run is not None:
+                next_due = now + (job.next_run - now_ns) / 1_000_000_000
+            saved_schedules[name] = {"plan": str(time_plan), "last_run": self._last_fire_times.get(name), "next_due": next_due}
+        return saved_schedules
+
+    def _fire_workflow(self, workflow, due_time=None, slot_time=None):
+        if self._coordinator is not None and not self._is_run_granted(workflow.workflow_name, due_time, slot_time):
+            return
+        if self._checkpoint_store is not None:
+            self._last_fire_times[workflow.workflow_name] = time.time()
+        workflow_run = workflow.start_run()
+        if workflow_run is None:
+            self._logger.warning(f"{self._log_title} Workflow: {workflow.workflow_name} is still running, the run is skipped, "
+                                 f"skipped count: {workflow.skipped_count}")
+            return
+        self._logger.info(f"{self._log_title} Start workflow: {workflow.workflow_name}, Run: {workflow_run.run_id}")
+        self._start_workflow_nodes(workflow, workflow_run)
+
+    def _start_workflow_nodes(self, workflow, workflow_run):
+        # starting a node may fail, e.g. on a full worker pool, which fails the node and may make other nodes ready
+        ready_nodes = workflow_run.take_ready_nodes()
+        while ready_nodes:
+            for node_name in ready_nodes:
+                task = self._workflow_task_dict[workflow.node_task_name(node_name)]
+                dropped_count = task.dropped_count
+                try:
+                    task.run()
+                except Exception as err:
+                    self._logger.critical(f"{self._log_title} start node {node_name} of workflow {workflow.workflow_name} failed: {str(err)}")
+                    workflow_run.finish_node(node_name, False)
+                    continue
+                if task.dropped_count != dropped_count:
+                    # a killed run of the node still holds its slot
+                    self._logger.critical(f"{self._log_title} node {node_name} of workflow {workflow.workflow_name} did not start")
+                    workflow_run.finish_node(node_name, False)
+            ready_nodes = workflow_run.take_ready_nodes()
+
+        if workflow_run.is_finished:
+            self._finish_workflow(workflow)
+
+    def _advance_workflow(self, node_task_name, job_status, result_bool, start_datetime, finish_datetime, running_time):
+        workflow, node_name = self._workflow_node_dict[node_task_name]
+        workflow_run = workflow.active_run
+        if workflow_run is None:
+            return
+        is_success = job_status == TaskState.DONE.value and bool(result_bool)
+        workflow_run.finish_node(node_name, is_success, start_datetime, finish_datetime, running_time)
+        self._start_workflow_nodes(workflow, workflow_run)
+
+    def _finish_workflow(self, workflow):
+        report = workflow.finish_run()
+        critical_path = " -> ".join(f"{node_name}({running_time or 0:.3f}s)" for node_name, running_time in report["critical_path"])
+        log_args = (self._log_title, report["workflow_name"], report["run_id"], report["result"], report["elapsed"],
+                    critical_path, report["node_states"])
+        if report["result"]:
+            self._logger.info(self._WORKFLOW_LOG_FORMAT, *log_args)
+        else:
+            self._logger.critical(self._WORKFLOW_LOG_FORMAT, *log_args)
+
+    def _is_run_granted(self, task_name, due_time, slot_time=None):
+        if self._coordination_mode == "lease":
+            return task_name in self._owned_tasks and time.monotonic() < self._lease_valid_until
+
+        if due_time is None:
+            return False
+        # every manager maps the run to the same slot, whatever the phase of its own schedule
+        claim_period = self._claim_periods.get(task_name, self._claim_resolution)
+        if slot_time is not None:
+            # the wall clock point of the schedule is exact, it never depends on when the run fired
+            slot = int(slot_time // claim_period)
+        else:
+            # interval runs have no wall clock point, the due time is rounded to the nearest slot
+            # so the skew of the two clock reads never moves a run on a slot boundary
+            due_wall_time = time.time() - (time.monotonic_ns() - due_time) / 1_000_000_000
+            slot = round(due_wall_time / claim_period)
+        try:
+            return self._coordinator.claim_run(self._owner_id, task_name, slot, time.time())
+        except Exception as e:
+            self._logger.critical(f"{self._log_title} claim run of task {task_name} failed: {str(e)}")
+            return False
+
+    def _run_lease_renewal(self):
+        while True:
+            time.sleep(self._lease_ttl / 3)
+            self._renew_leases()
+
+    def _renew_leases(self):
+        renew_start = time.monotonic()
+        try:
+            owned_tasks = self._coordinator.acquire_leases(self._owner_id, list(self._task_dict) + list(self._workflow_dict),
+                                                           self._lease_ttl, time.time())
+        except Exception as e:
+            # the current leases stay valid here until they would expire in the coordinator
+            self._logger.critical(f"{self._log_title} renew leases failed: {str(e)}")
+            return
+
+        owned_tasks = frozenset(owned_tasks)
+        if owned_tasks != self._owned_tasks:
+            self._logger.info(f"{self._log_title} Own {len(owned_tasks)} of {len(self._task_dict)} tasks as {self._owner_id}")
+        # a margin below the ttl covers the time the renewal took and small clock drift
+        self._lease_valid_until = renew_start + self._lease_ttl * 0.8
+        self._owned_tasks = owned_tasks
+
+    def _release_leases(self):
+        self._owned_tasks = frozenset()
+        try:
+            self._coordinator.release_leases(self._owner_id)
+        except Exception:
+            pass
 
     def _run_management(self):
         while True:  
+            loop_profiler = self._loop_profiler
+            if loop_profiler is not None:
+                loop_profiler.start_iteration()
             try:
                 # trigger task by scheduling and do management
                 self._schedule_tasks()
+                self._mark_phase("schedule")
                 self._manage_tasks()
             except Exception as err:
                 log_msg = f"{self._log_title} main process occur problem: {str(err)}"
                 self._logger.critical(log_msg)
-            time.sleep(self._sleep_time)
+            if loop_profiler is not None:
+                loop_profiler.end_iteration()
+            self._wait_for_next_event()
+
+    def _mark_phase(self, phase_name):
+        if self._loop_profiler is not None:
+            self._loop_profiler.mark(phase_name)
+
+    def _wakeup(self):
+        self._completion_queue.wakeup()
+
+    def _wait_for_next_event(self):
+        self._completion_queue.wait(self._next_wait_time())
+
+    def _next_wait_time(self):
+        # sleep until the nearest schedule or task deadline, None means wait for a wakeup only
+        wait_times = [self._task_scheduler.idle_seconds]
+        next_deadline = self._deadline_heap.next_deadline
+        if next_deadline is not None:
+            wait_times.append(max(0, next_deadline - time.monotonic_ns()) / 1_000_000_000)
+
+        wait_times = [wait_time for wait_time in wait_times if wait_time is not None]
+        if not wait_times:
+            return None
+        return min(wait_times)
 
     def _schedule_tasks(self):
         self._task_scheduler.run_pending()
 
     def _manage_tasks(self):
-        for task_name, task in self._task_dict.items():
-            if task.is_running:
-                self._handle_running_state(task)                
-            elif task.is_terminating:
-                self._handle_terminating_state(task)
-            elif task.is_done:
-                self._handle_done_state(task)                
-            elif task.is_terminated:
-                self._handle_terminated_state(task)
-            elif task.is_killed:
-                self._handle_killed_state(task)
-
-    def _handle_running_state(self, task):
-        if task.is_timeout:
-            task.terminate()
-
-    def _handle_terminating_state(self, task):
-        if task.is_finish_terminating:
-            task.set_terminating_reslt()
-
-    def _handle_done_state(self, task):
-        result_bool, log_msg = self._take_report_and_gen_log(task)
+        # only the runs whose timeout or force kill deadline has expired are touched
+        for task_run in self._deadline_heap.pop_expired(time.monotonic_ns()):
+            if task_run.is_running:
+                self._handle_running_state(task_run)
+            elif task_run.is_terminating:
+                self._handle_terminating_state(task_run)
+        self._mark_phase("deadlines")
+
+        # only the runs which published a state change are touched,
+        # handling may publish again (e.g. terminating -> terminated), so drain until it is empty
+        changed_runs = self._completion_queue.drain()
+        while changed_runs:
+            for task_run in changed_runs:
+                self._handle_state_change(task_run)
+            changed_runs = self._completion_queue.drain()
+        self._mark_phase("completions")
+
+    def _handle_state_change(self, task_run):
+        # a run may be published more than once, it is reported only the first time
+        if task_run.is_reported:
+            # a leaked run is published again when its worker finishes at last, which frees its slot
+            if task_run.is_leaked and task_run.is_worker_done:
+                task_run.task.release_leaked_run(task_run)
+            return
+
+        if task_run.is_terminating:
+            self._handle_terminating_state(task_run)
+        elif task_run.is_done:
+            self._handle_done_state(task_run)                
+        elif task_run.is_terminated:
+            self._handle_terminated_state(task_run)
+        elif task_run.is_killed:
+            self._handle_killed_state(task_run)
+        elif task_run.is_leaked:
+            self._handle_leaked_state(task_run)
+
+    def _handle_running_state(self, task_run):
+        # the deadline of the run has expired
+        task_run.terminate()
+
+    def _handle_terminating_state(self, task_run):
+        if task_run.is_finish_terminating:
+            task_run.set_terminating_reslt()
+
+    def _handle_done_state(self, task_run):
+        result_bool, log_msg, log_args = self._take_report_and_gen_log(task_run)
         if result_bool:
-            self._logger.info(log_msg)
+            self._logger.info(log_msg, *log_args)
         else:
-            self._logger.critical(log_msg)
+            self._logger.critical(log_msg, *log_args)
 
-    def _handle_terminated_state(self, task):
-        result_bool, log_msg = self._take_report_and_gen_log(task)
-        self._logger.critical(log_msg)
+    def _handle_terminated_state(self, task_run):
+        result_bool, log_msg, log_args = self._take_report_and_gen_log(task_run)
+        self._logger.critical(log_msg, *log_args)
 
-    def _handle_killed_state(self, task):
-        result_bool, log_msg = self._take_report_and_gen_log(task)
-        self._logger.critical(log_msg)
+    def _handle_killed_state(self, task_run):
+        result_bool, log_msg, log_args = self._take_report_and_gen_log(task_run)
+        self._logger.critical(log_msg, *log_args)
 
-    def _take_report_and_gen_log(self, task):
-        result_bool, result_msg, result_args, job_status, start_datetime, finish_datetime, running_time = task.take_report()
-        log_msg = f"{self._log_title} Task name: {task.task_name}, Result: {result_bool}, msg: {result_msg}, Output: {result_args}, Job Status: {job_status}, Start datetime: {str(start_datetime)}, Finish datetime: {str(finish_datetime)}, Running time: {running_time}"
-        return result_bool, log_msg
-    
+    def _handle_leaked_state(self, task_run):
+        result_bool, log_msg, log_args = self._take_report_and_gen_log(task_run)
+        self._logger.critical(log_msg, *log_args)
+
+    # the report is formatted only if a handler accepts it, which may be on the log writer thread
+    _REPORT_LOG_FORMAT = "%s Task name: %s, Run: %s, Result: %s, msg: %s, Output: %s, Job Status: %s, Start datetime: %s, Finish datetime: %s, Running time: %s"
+
+    _CACHED_REPORT_LOG_FORMAT = _REPORT_LOG_FORMAT + ", Cache: %s, Cache hits: %s, Cache misses: %s"
+
+    _RESOURCE_LOG_FORMAT = ", Resource wait: %.3f"
+
+    _WORKFLOW_LOG_FORMAT = "%s Workflow: %s, Run: %s, Result: %s, Elapsed: %.3f, Critical path: %s, Node states: %s"
+
+    def _take_report_and_gen_log(self, task_run):
+        # the run may be reused by the next run of the task once it is reported
+        task_name, run_id, is_cache_hit, resource_wait = task_run.task_name, task_run.run_id, task_run.is_cache_hit, task_run.resource_wait
+        result_cache = task_run.task.result_cache
+        result_bool, result_msg, result_args, job_status, start_datetime, finish_datetime, running_time = task_run.take_report()
+        if self._run_ledger is not None or self._subscription_broker.has_subscribers:
+            run_record = RunRecord(task_name, run_id, job_status, start_datetime, finish_datetime,
+                                   running_time, result_bool, result_msg, result_args)
+            if self._run_ledger is not None:
+                self._run_ledger.append(run_record)
+            self._subscription_broker.publish(run_record)
+        if self._workflow_node_dict and task_name in self._workflow_node_dict:
+            self._advance_workflow(task_name, job_status, result_bool, start_datetime, finish_datetime, running_time)
+        log_args = (self._log_title, task_name, run_id, result_bool, result_msg, result_args, job_status, start_datetime, finish_datetime, running_time)
+        log_format = self._REPORT_LOG_FORMAT
+        if result_cache is not None:
+            log_args += ("hit" if is_cache_hit else "miss", result_cache.hit_count, result_cache.miss_count)
+            log_format = self._CACHED_REPORT_LOG_FORMAT
+        if resource_wait is not None:
+            # the running time counts from the grant of the tokens
+            log_args += (resource_wait,)
+            log_format += self._RESOURCE_LOG_FORMAT
+        return result_bool, log_format, log_args
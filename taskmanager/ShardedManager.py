@@ -0,0 +1,297 @@
+import os
+import zlib
+import threading
+import multiprocessing
+from logging.handlers import QueueHandler
+
+from .Manager import Manager
+from .TimePlan import TimePlan
+from .task import TaskConfig, ResultCache, OverlapPolicy
+from .logutil import Logger, ForwardHandler
+from .workflow import Workflow
+
+
+# manager methods a shard process runs on request of the sharded manager
+_SHARD_COMMANDS = {"add_executor", "add_resource", "add_task", "add_workflow", "remove_task", "pause_task", "resume_task", "update_time_plan",
+                   "status", "leak_stats", "resource_stats", "metrics_snapshot", "enable_run_ledger", "enable_loop_profiling", "loop_stats"}
+
+
+def _shard_process_main(conn, log_queue, shard_name, manager_kwargs):
+    # the records of the shard are formatted by the logger of the sharded manager in the parent process
+    manager = Manager(shard_name, **manager_kwargs)
+    manager.logger.forward_to(QueueHandler(log_queue))
+
+    while True:
+        try:
+            command_name, args, kwargs = conn.recv()
+        except (EOFError, OSError):
+            # the parent is gone
+            return
+
+        try:
+            if command_name == "start":
+                threading.Thread(target=manager.start, name=f"{shard_name}-loop", daemon=True).start()
+                result = None
+            elif command_name in _SHARD_COMMANDS:
+                result = getattr(manager, command_name)(*args, **kwargs)
+            else:
+                raise ValueError(f"command {command_name} is not supported")
+            conn.send((True, result))
+        except Exception as e:
+            conn.send((False, str(e)))
+
+
+class _ShardProcess:
+    """A Manager running in a child process, driven by commands over a pipe."""
+
+    def __init__(self, shard_name, log_queue, manager_kwargs) -> None:
+        self._shard_name = shard_name
+        self._conn, child_conn = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(target=_shard_process_main, args=(child_conn, log_queue, shard_name, manager_kwargs),
+                                                name=shard_name, daemon=True)
+        self._process.start()
+        child_conn.close()
+        # one command at a time, so every reply matches its command
+        self._lock = threading.Lock()
+
+    @property
+    def process(self):
+        return self._process
+
+    def call(self, command_name, *args, **kwargs):
+        with self._lock:
+            try:
+                self._conn.send((command_name, args, kwargs))
+                is_ok, result = self._conn.recv()
+            except Exception as e:
+                raise Exception(f"shard {self._shard_name} is not reachable: {str(e)}")
+        if not is_ok:
+            raise Exception(result)
+        return result
+
+
+class ShardedManager:
+    """
+    Hash-partitions the tasks across shard_count Managers, each with its own scheduler, management loop and worker pools.
+    In "thread" mode every shard loop runs in a thread of this process, in "process" mode every shard is a Manager in its
+    own process, which needs picklable task functions, e.g. functions defined at module level.
+    The log records of all shards are written by the logger of the sharded manager.
+    """
+
+    def __init__(self, manager_name, shard_count=None, shard_mode="thread", streaming_log_level="DEBUG", **manager_kwargs) -> None:
+
+        if shard_count is None:
+            shard_count = os.cpu_count() or 1
+        if not isinstance(shard_count, int) or shard_count <= 0:
+            raise ValueError("shard_count must be positive int")
+        if shard_mode not in ("thread", "process"):
+            raise ValueError(f"shard_mode {shard_mode} is not supported")
+
+        self._manager_name = manager_name
+        self._shard_count = shard_count
+        self._shard_mode = shard_mode
+        self._log_title = f"[{self.__class__.__name__}]"
+        self._logger = Logger(manager_name, streaming_log_level)
+
+        # task name -> shard index
+        self._task_shard_dict = {}
+
+        manager_kwargs["streaming_log_level"] = streaming_log_level
+        shard_names = [f"{manager_name}-shard-{index}" for index in range(shard_count)]
+        if shard_mode == "thread":
+            self._shards = [Manager(shard_name, **manager_kwargs) for shard_name in shard_names]
+            for shard in self._shards:
+                shard.logger.forward_to(ForwardHandler(self._logger))
+        else:
+            self._log_queue = multiprocessing.Queue()
+            self._shards = [_ShardProcess(shard_name, self._log_queue, manager_kwargs) for shard_name in shard_names]
+            # started once every shard is forked, so no child inherits the locks of a running receiver thread
+            threading.Thread(target=self._receive_shard_logs, name=f"{manager_name}-shard-logs", daemon=True).start()
+
+        self._shard_threads = []
+
+    @property
+    def manager_name(self):
+        return self._manager_name
+
+    @property
+    def logger(self):
+        return self._logger
+
+    @property
+    def shard_count(self):
+        return self._shard_count
+
+    @property
+    def shard_mode(self):
+        return self._shard_mode
+
+    @property
+    def task_names(self):
+        return list(self._task_shard_dict)
+
+    def shard_of(self, task_name):
+        """The index of the shard which runs the task, stable across restarts."""
+        return zlib.crc32(task_name.encode()) % self._shard_count
+
+    ###################################### enable tools ######################################
+
+    def enable_physical_logging(self, log_folder_path, log_level="DEBUG", rotate_days=30):
+        """
+        Enables physical logging to a file, the records of all shards are written to one file.
+
+        Parameters:
+        - log_folder_path (str): The path to the folder where the log file should be stored.
+        - log_level (str, optional): The logging level to use.
+        - rotate_days (int, optional): The number of days after which the log file should be rotated.
+        Returns:
+        None
+        """
+
+        if not isinstance(log_folder_path, str):
+            raise ValueError("log_folder_path must be string")
+
+        try:
+            self._logger.enable_physical_logging(log_folder_path, log_level, rotate_days)
+        except Exception as e:
+            raise Exception(f"enable physical logging failed: {str(e)}")
+
+    ###########################################################################################
+
+    def add_executor(self, executor_name:str, max_workers=None, max_pending=0, executor_type="thread", kill_delays=(0, 1, 5), leak_grace=5):
+        """
+        Adds a named worker pool to every shard, see Manager.add_executor. max_workers is per shard.
+        """
+        for shard_index in range(self._shard_count):
+            self._call_shard(shard_index, "add_executor", executor_name, max_workers, max_pending, executor_type, kill_delays, leak_grace)
+
+    def add_resource(self, resource_name:str, capacity:int):
+        """
+        Adds a resource to every shard, see Manager.add_resource. capacity is per shard.
+        """
+        for shard_index in range(self._shard_count):
+            self._call_shard(shard_index, "add_resource", resource_name, capacity)
+
+    def add_task(self, task_name:str, task_func, time_plan:TimePlan, timeout:int, *args, executor="default",
+                 max_instances=1, overlap_policy=OverlapPolicy.SKIP, queue_depth=1, jitter=0, phase=None,
+                 cache=False, cache_ttl=None, cache_size=128, cache_key=None, resources=None, **kwargs):
+        """
+        Adds a task to the shard picked by the hash of task_name, see Manager.add_task for the parameters.
+        """
+
+        if task_name in self._task_shard_dict:
+            raise ValueError(f"task {task_name} already exists")
+        # fails here instead of in the shard process
+        TaskConfig(task_func, timeout, args, kwargs, max_instances=max_instances, overlap_policy=overlap_policy, queue_depth=queue_depth,
+                   cache=cache, cache_ttl=cache_ttl, cache_key=cache_key, resources=resources)
+        if cache:
+            ResultCache(cache_ttl, cache_size, cache_key)
+
+        shard_index = self.shard_of(task_name)
+        self._call_shard(shard_index, "add_task", task_name, task_func, time_plan, timeout, *args, executor=executor,
+                         max_instances=max_instances, overlap_policy=overlap_policy, queue_depth=queue_depth,
+                         jitter=jitter, phase=phase, cache=cache, cache_ttl=cache_ttl, cache_size=cache_size, cache_key=cache_key,
+                         resources=resources, **kwargs)
+        self._task_shard_dict[task_name] = shard_index
+
+    def add_workflow(self, workflow:Workflow, time_plan:TimePlan, jitter=0, phase=None):
+        """
+        Adds a workflow to the shard picked by the hash of its name, all of its nodes run on that shard, see Manager.add_workflow.
+        """
+
+        if workflow.workflow_name in self._task_shard_dict:
+            raise ValueError(f"task {workflow.workflow_name} already exists")
+
+        shard_index = self.shard_of(workflow.workflow_name)
+        self._call_shard(shard_index, "add_workflow", workflow, time_plan, jitter=jitter, phase=phase)
+        self._task_shard_dict[workflow.workflow_name] = shard_index
+
+    def remove_task(self, task_name:str):
+        """Removes a task from its shard, see Manager.remove_task."""
+        self._call_shard(self._shard_index_of(task_name), "remove_task", task_name)
+        del self._task_shard_dict[task_name]
+
+    def pause_task(self, task_name:str):
+        """Pauses a task on its shard, see Manager.pause_task."""
+        self._call_shard(self._shard_index_of(task_name), "pause_task", task_name)
+
+    def resume_task(self, task_name:str):
+        """Resumes a task on its shard, see Manager.resume_task."""
+        self._call_shard(self._shard_index_of(task_name), "resume_task", task_name)
+
+    def update_time_plan(self, task_name:str, time_plan:TimePlan, jitter=None, phase=None):
+        """Replaces the schedule of a task on its shard, see Manager.update_time_plan."""
+        self._call_shard(self._shard_index_of(task_name), "update_time_plan", task_name, time_plan, jitter=jitter, phase=phase)
+
+    def status(self):
+        """
+        Returns {"manager_name", "task_count", "active_runs", "pending_runs", "waiting_runs", "leaked_workers", "shards"},
+        where shards is the Manager.status() of every shard.
+        """
+        shard_status_list = [self._call_shard(shard_index, "status") for shard_index in range(self._shard_count)]
+        return {
+            "manager_name": self._manager_name,
+            "task_count": sum(shard_status["task_count"] for shard_status in shard_status_list),
+            "active_runs": sum(shard_status["active_runs"] for shard_status in shard_status_list),
+            "pending_runs": sum(shard_status["pending_runs"] for shard_status in shard_status_list),
+            "waiting_runs": sum(shard_status["waiting_runs"] for shard_status in shard_status_list),
+            "leaked_workers": sum(shard_status["leaked_workers"] for shard_status in shard_status_list),
+            "shards": shard_status_list,
+        }
+
+    def leak_stats(self):
+        """Returns [Manager.leak_stats()] of every shard, in shard order."""
+        return [self._call_shard(shard_index, "leak_stats") for shard_index in range(self._shard_count)]
+
+    def resource_stats(self):
+        """Returns [Manager.resource_stats()] of every shard, in shard order."""
+        return [self._call_shard(shard_index, "resource_stats") for shard_index in range(self._shard_count)]
+
+    def metrics_snapshot(self):
+        """Returns the metrics of every task of every shard, see Manager.metrics_snapshot."""
+        task_snapshots = {}
+        for shard_index in range(self._shard_count):
+            task_snapshots.update(self._call_shard(shard_index, "metrics_snapshot"))
+        return task_snapshots
+
+    def start(self):
+        """
+        Starts the management loop of every shard and blocks like Manager.start.
+        Returns:
+        None
+        """
+
+        self._logger.info(f"{self._log_title} Start {self._shard_count} {self._shard_mode} shards of manager: {self._manager_name}")
+
+        if self._shard_mode == "thread":
+            for shard in self._shards:
+                shard_thread = threading.Thread(target=shard.start, name=f"{shard.manager_name}-loop", daemon=True)
+                shard_thread.start()
+                self._shard_threads.append(shard_thread)
+            for shard_thread in self._shard_threads:
+                shard_thread.join()
+        else:
+            for shard_index in range(self._shard_count):
+                self._call_shard(shard_index, "start")
+            for shard in self._shards:
+                shard.process.join()
+                self._logger.critical(f"{self._log_title} shard process {shard.process.name} exited with code {shard.process.exitcode}")
+
+    def _shard_index_of(self, task_name):
+        if task_name not in self._task_shard_dict:
+            raise ValueError(f"task {task_name} does not exist")
+        return self._task_shard_dict[task_name]
+
+    def _call_shard(self, shard_index, command_name, *args, **kwargs):
+        shard = self._shards[shard_index]
+        if self._shard_mode == "thread":
+            return getattr(shard, command_name)(*args, **kwargs)
+        return shard.call(command_name, *args, **kwargs)
+
+    def _receive_shard_logs(self):
+        while True:
+            try:
+                record = self._log_queue.get()
+            except (EOFError, OSError):
+                return
+            self._logger.handle(record)
@@ -1,5 +1,8 @@
+import datetime
 from enum import Enum
 
+from .taskscheduler.CronExpression import CronExpression
+
 
 class TimePlanType(Enum):
     """Enum for schedule types."""
@@ -7,6 +10,7 @@ class TimePlanType(Enum):
     INTERVAL = "Every Interval"
     DAILY_POINTS = "Multiple Times at Hours of the Day"
     WEEKLY_POINTS = "Multiple Times at Days of the Week"
+    CRON = "Cron Expression"
     
 class DayType(Enum):
 
@@ -21,11 +25,15 @@ class DayType(Enum):
 class TimePlan:
 
     @classmethod
-    def create_interval_schedule(cls, day=0, hr=0, min=0, sec=0):
-        interval = _TimeTransformer(day, hr, min, sec)
+    def create_interval_schedule(cls, day=0, hr=0, min=0, sec=0, ms=0, fixed_rate=False):
+        """
+        fixed_rate=False (fixed-delay) counts every next run from the time the previous one fired.
+        fixed_rate=True keeps runs on the grid anchored at the first run, so they never drift.
+        """
+        interval = _TimeTransformer(day, hr, min, sec, ms)
         if interval <= 0:
             raise ValueError("Interval must be positive")
-        return cls(TimePlanType.INTERVAL, interval=interval)
+        return cls(TimePlanType.INTERVAL, interval=interval, fixed_rate=fixed_rate)
  
     @classmethod
     def create_daily_schedule(cls, *time_points):
@@ -34,13 +42,22 @@ class TimePlan:
     @classmethod
     def create_weekly_schedule(cls, **weekly_points):
         return cls(TimePlanType.WEEKLY_POINTS, points=weekly_points)
+
+    @classmethod
+    def create_cron_schedule(cls, expr):
+        """
+        expr is "minute hour day-of-month month day-of-week" with an optional leading seconds field,
+        e.g. "*/5 9-17 * * mon-fri" runs every 5 minutes during business hours on weekdays.
+        """
+        return cls(TimePlanType.CRON, cron=CronExpression(expr))
     
-    def __init__(self, schedule_type, interval=None, points=None):
+    def __init__(self, schedule_type, interval=None, points=None, fixed_rate=False, cron=None):
 
         if not isinstance(schedule_type, TimePlanType):
             raise ValueError("schedule_type must be TimePlanType")
         
         self._schedule_type = schedule_type
+        self._is_fixed_rate = bool(fixed_rate)
 
         # Set interval
         self._interval = None
@@ -61,11 +78,22 @@ class TimePlan:
                 self._verify_weekly_points(points)
                 self._daily_points = []
                 self._weekly_points = points
+
+        # Set cron
+        self._cron = None
+        if schedule_type == TimePlanType.CRON:
+            if cron is not None:
+                self._verify_cron(cron)
+                self._cron = cron
     
     @property
     def time_plan_type(self):
         return self._schedule_type
 
+    @property
+    def is_fixed_rate(self):
+        return self._is_fixed_rate
+
     @property
     def is_valid(self):
         if self._schedule_type == TimePlanType.INTERVAL:
@@ -74,6 +102,8 @@ class TimePlan:
             return len(self._daily_points) > 0
         elif self._schedule_type == TimePlanType.WEEKLY_POINTS:
             return len(self._weekly_points) > 0
+        elif self._schedule_type == TimePlanType.CRON:
+            return self._cron is not None
         else:
             return False
 
@@ -85,12 +115,15 @@ class TimePlan:
             return self._daily_points
         elif self._schedule_type == TimePlanType.WEEKLY_POINTS:
             return self._weekly_points
+        elif self._schedule_type == TimePlanType.CRON:
+            return self._cron
         else:
             return None
 
     def __str__(self):
         if self._schedule_type == TimePlanType.INTERVAL:
-            return f"Interval Schedule: Every {self._interval} units"
+            mode = "fixed-rate" if self._is_fixed_rate else "fixed-delay"
+            return f"Interval Schedule: Every {self._interval} seconds ({mode})"
         elif self._schedule_type == TimePlanType.DAILY_POINTS:
             times = ', '.join(self._daily_points)
             return f"Daily Points Schedule: {times}"
@@ -100,13 +133,15 @@ class TimePlan:
                 day_times = ', '.join(times)
                 days_str.append(f"{day.capitalize()}: {day_times}")
             return "Weekly Points Schedule:\n" + '\n'.join(days_str)
+        elif self._schedule_type == TimePlanType.CRON:
+            return f"Cron Schedule: {self._cron}"
         return "Undefined Schedule"
     
     def _set_interval(self, interval):
         if self._schedule_type != TimePlanType.INTERVAL:
             raise ValueError("schedule_type must be TimePlanType.INTERVAL")
-        if not isinstance(interval, int):
-            raise ValueError("interval must be int")
+        if isinstance(interval, bool) or not isinstance(interval, (int, float)):
+            raise ValueError("interval must be int or float")
         if interval <= 0:
             raise ValueError("interval must be positive")
         
@@ -129,21 +164,34 @@ class TimePlan:
                 if not self._is_valid_time_format(time):
                     raise ValueError(f"Invalid time format for {day}: {time}")
  
+    def _verify_cron(self, cron):
+        if not isinstance(cron, CronExpression):
+            raise ValueError("For CRON, 'cron' must be CronExpression")
+        # raises if the expression can never fire, e.g. "0 0 30 2 *"
+        cron.next_fire(datetime.datetime.now())
+
     @staticmethod
     def _is_valid_time_format(time_str):
+        # HH:MM or HH:MM:SS
         try:
-            hour, minute = map(int, time_str.split(":"))
-            return 0 <= hour < 24 and 0 <= minute < 60
+            parts = list(map(int, time_str.split(":")))
         except ValueError:
             return False
+        if len(parts) == 2:
+            parts.append(0)
+        if len(parts) != 3:
+            return False
+        hour, minute, second = parts
+        return 0 <= hour < 24 and 0 <= minute < 60 and 0 <= second < 60
 
-def Timeout(day=0, hr=0, min=0, sec=0):
-    s_value = _TimeTransformer(day, hr, min, sec)
+def Timeout(day=0, hr=0, min=0, sec=0, ms=0):
+    s_value = _TimeTransformer(day, hr, min, sec, ms)
     if s_value <= 0:
         raise ValueError("Timeout must be positive")
     return s_value
 
-def _TimeTransformer(day=0, hr=0, min=0, sec=0):
+def _TimeTransformer(day=0, hr=0, min=0, sec=0, ms=0):
+    """Returns seconds, a float only when ms is given."""
     if not isinstance(hr, int):
         raise ValueError("hr must be int")
     if not isinstance(min, int):
@@ -156,4 +204,11 @@ def _TimeTransformer(day=0, hr=0, min=0, sec=0):
         raise ValueError("min must be 0~59")
     if sec < 0 or sec > 59:
         raise ValueError("sec must be 0~59")
-    return day*24*60*60 + hr*60*60 + min*60 + sec
+    if not isinstance(ms, int):
+        raise ValueError("ms must be int")
+    if ms < 0 or ms > 999:
+        raise ValueError("ms must be 0~999")
+    s_value = day*24*60*60 + hr*60*60 + min*60 + sec
+    if ms:
+        return s_value + ms/1000
+    return s_value
@@ -1,3 +1,7 @@
 from taskmanager.Manager import Manager
 from taskmanager.TimePlan import TimePlan, Timeout
-from taskmanager.logutil import Logger
\ No newline at end of file
+from taskmanager.logutil import Logger
+from taskmanager.task import OverlapPolicy
+from taskmanager.subscription import OverflowPolicy
+from taskmanager.checkpoint import MisfirePolicy
+from taskmanager.ShardedManager import ShardedManager
\ No newline at end of file
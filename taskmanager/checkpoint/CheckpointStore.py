@@ -0,0 +1,59 @@
+import os
+import json
+import tempfile
+
+
+class CheckpointStore:
+    """
+    Keeps the schedule state of a manager in a small JSON file.
+    save writes a temporary file next to it and renames it over the old one, so a crash never leaves a partial file.
+    """
+
+    _VERSION = 1
+
+    def __init__(self, state_path) -> None:
+
+        if not isinstance(state_path, str):
+            raise ValueError("state_path must be string")
+
+        self._state_path = os.path.abspath(state_path)
+        os.makedirs(os.path.dirname(self._state_path), exist_ok=True)
+
+    @property
+    def state_path(self):
+        return self._state_path
+
+    def load(self):
+        """Returns the saved state, None if there is no state file."""
+        if not os.path.exists(self._state_path):
+            return None
+        with open(self._state_path, "r", encoding="utf-8") as state_file:
+            state = json.load(state_file)
+        if not isinstance(state, dict) or state.get("version") != self._VERSION:
+            raise ValueError(f"checkpoint {self._state_path} has an unknown format")
+        return state
+
+    def save(self, state):
+        state = dict(state, version=self._VERSION)
+        state_dir = os.path.dirname(self._state_path)
+        fd, temp_path = tempfile.mkstemp(prefix=".checkpoint-", dir=state_dir)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as temp_file:
+                json.dump(state, temp_file)
+                temp_file.flush()
+                os.fsync(temp_file.fileno())
+            os.replace(temp_path, self._state_path)
+        except Exception:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+
+        # the rename itself is durable only once the directory is synced
+        if hasattr(os, "O_DIRECTORY"):
+            dir_fd = os.open(state_dir, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
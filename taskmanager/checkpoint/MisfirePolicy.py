@@ -0,0 +1,8 @@
+from enum import Enum
+
+class MisfirePolicy(Enum):
+    """What a warm restart does with the runs of a task which were due while the manager was down."""
+
+    RUN_ONCE = "run_once"   # run once if at least one run was missed
+    SKIP = "skip"           # wait for the next due time
+    CATCH_UP = "catch_up"   # fire one run for every missed run, up to catch_up_limit
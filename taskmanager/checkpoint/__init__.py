@@ -0,0 +1,2 @@
+from .MisfirePolicy import MisfirePolicy
+from .CheckpointStore import CheckpointStore
\ No newline at end of file
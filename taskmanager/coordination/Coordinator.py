@@ -0,0 +1,65 @@
+import abc
+import math
+
+
+class Coordinator(abc.ABC):
+    """
+    Base class of the coordination backends, which let several managers share one task set.
+    Leases give each task one owner at a time, and the tasks are balanced across the live owners.
+    A lease expires ttl seconds after its last renewal, then another owner may take it.
+    Claims give each run slot of a task to the first manager which claims it.
+    Times are wall clock epoch seconds, so the clocks of the hosts must be in sync.
+    """
+
+    def acquire_leases(self, owner_id, task_names, ttl, now):
+        """
+        Renews the leases of owner_id, takes free or expired leases up to its fair share of task_names
+        and returns the set of task names it owns. Leases over the fair share are not renewed, so they expire.
+        """
+        with self._lease_state() as (lease_dict, member_dict):
+            return self._balance_leases(lease_dict, member_dict, owner_id, task_names, ttl, now)
+
+    def release_leases(self, owner_id):
+        """Drops every lease of owner_id, so the other owners may take them at once."""
+        with self._lease_state() as (lease_dict, member_dict):
+            member_dict.pop(owner_id, None)
+            for task_name in [task_name for task_name, (lease_owner, _) in lease_dict.items() if lease_owner == owner_id]:
+                del lease_dict[task_name]
+
+    @abc.abstractmethod
+    def claim_run(self, owner_id, task_name, slot, now):
+        """Returns True if owner_id is the first to claim the run slot of the task."""
+
+    def close(self):
+        pass
+
+    @abc.abstractmethod
+    def _lease_state(self):
+        """
+        Context manager which yields (lease_dict, member_dict) under an exclusive lock and stores the changes made to them.
+        lease_dict is {task_name: (owner_id, expires_at)}, member_dict is {owner_id: expires_at}.
+        """
+
+    @staticmethod
+    def _balance_leases(lease_dict, member_dict, owner_id, task_names, ttl, now):
+        member_dict[owner_id] = now + ttl
+        for member_id in [member_id for member_id, expires_at in member_dict.items() if expires_at < now]:
+            del member_dict[member_id]
+        fair_share = math.ceil(len(task_names) / len(member_dict))
+
+        owned_names = sorted(task_name for task_name in task_names
+                             if task_name in lease_dict and lease_dict[task_name][0] == owner_id and lease_dict[task_name][1] >= now)
+        # the leases over the fair share are left to expire, so a new owner gets them without a double run
+        owned_names = owned_names[:fair_share]
+        for task_name in owned_names:
+            lease_dict[task_name] = (owner_id, now + ttl)
+
+        for task_name in task_names:
+            if len(owned_names) >= fair_share:
+                break
+            lease = lease_dict.get(task_name)
+            if lease is None or lease[1] < now:
+                lease_dict[task_name] = (owner_id, now + ttl)
+                owned_names.append(task_name)
+
+        return set(owned_names)
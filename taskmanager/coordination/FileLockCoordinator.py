@@ -0,0 +1,106 @@
+import os
+import json
+import hashlib
+import contextlib
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+from .Coordinator import Coordinator
+
+
+class FileLockCoordinator(Coordinator):
+    """
+    Coordination through files in a shared folder. The lease state is a JSON file rewritten atomically
+    under an exclusive lock of a lock file, a claim is a file created with O_EXCL.
+    """
+
+    # claims older than this many seconds are deleted, once every _CLEANUP_EVERY claims
+    _CLAIM_RETENTION = 7 * 24 * 60 * 60
+    _CLEANUP_EVERY = 1000
+
+    def __init__(self, folder_path) -> None:
+
+        if not isinstance(folder_path, str):
+            raise ValueError("folder_path must be string")
+
+        self._folder_path = folder_path
+        self._lock_path = os.path.join(folder_path, "leases.lock")
+        self._state_path = os.path.join(folder_path, "leases.json")
+        self._claim_folder_path = os.path.join(folder_path, "claims")
+        self._claim_count = 0
+
+        try:
+            os.makedirs(self._claim_folder_path, exist_ok=True)
+        except Exception as e:
+            raise Exception(f"create coordinator folder {folder_path} failed: {str(e)}")
+
+    @property
+    def folder_path(self):
+        return self._folder_path
+
+    def claim_run(self, owner_id, task_name, slot, now):
+        # the task name is hashed, so any name maps to a valid file name, the digest is wide enough that two names never collide
+        task_digest = hashlib.blake2b(task_name.encode(), digest_size=16).hexdigest()
+        claim_path = os.path.join(self._claim_folder_path, f"{task_digest}-{slot}")
+        try:
+            claim_fd = os.open(claim_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(claim_fd, "w") as claim_file:
+            json.dump({"task_name": task_name, "slot": slot, "owner_id": owner_id}, claim_file)
+
+        self._claim_count += 1
+        if self._claim_count % self._CLEANUP_EVERY == 0:
+            self._cleanup_claims(now)
+        return True
+
+    @contextlib.contextmanager
+    def _lease_state(self):
+        with open(self._lock_path, "a+") as lock_file:
+            self._lock(lock_file)
+            try:
+                state = {"leases": {}, "members": {}}
+                if os.path.exists(self._state_path):
+                    with open(self._state_path) as state_file:
+                        state = json.load(state_file)
+                lease_dict = {task_name: tuple(lease) for task_name, lease in state["leases"].items()}
+                member_dict = state["members"]
+
+                yield lease_dict, member_dict
+
+                # readers never see a half written file
+                temp_path = f"{self._state_path}.{os.getpid()}.tmp"
+                with open(temp_path, "w") as temp_file:
+                    json.dump({"leases": lease_dict, "members": member_dict}, temp_file)
+                os.replace(temp_path, self._state_path)
+            finally:
+                self._unlock(lock_file)
+
+    def _cleanup_claims(self, now):
+        for claim_name in os.listdir(self._claim_folder_path):
+            claim_path = os.path.join(self._claim_folder_path, claim_name)
+            try:
+                if os.path.getmtime(claim_path) < now - self._CLAIM_RETENTION:
+                    os.remove(claim_path)
+            except OSError:
+                pass
+
+    @staticmethod
+    def _lock(lock_file):
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+
+    @staticmethod
+    def _unlock(lock_file):
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
@@ -0,0 +1,101 @@
+import os
+import sqlite3
+import threading
+import contextlib
+
+from .Coordinator import Coordinator
+
+
+class SqliteCoordinator(Coordinator):
+    """
+    Coordination through a SQLite file, which every manager on the host (or on a file system with working locks) opens.
+    Lease changes run in BEGIN IMMEDIATE transactions, a claim is an INSERT OR IGNORE on the (task_name, slot) key.
+    """
+
+    _CREATE_SQL = [
+        "CREATE TABLE IF NOT EXISTS leases (task_name TEXT PRIMARY KEY, owner_id TEXT NOT NULL, expires_at REAL NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS members (owner_id TEXT PRIMARY KEY, expires_at REAL NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS claims (task_name TEXT NOT NULL, slot INTEGER NOT NULL, owner_id TEXT NOT NULL, claimed_at REAL NOT NULL, PRIMARY KEY (task_name, slot))",
+        "CREATE INDEX IF NOT EXISTS claims_claimed_at ON claims (claimed_at)",
+    ]
+
+    # claims older than this many seconds are deleted, once every _CLEANUP_EVERY claims
+    _CLAIM_RETENTION = 7 * 24 * 60 * 60
+    _CLEANUP_EVERY = 1000
+
+    def __init__(self, db_path) -> None:
+
+        if not isinstance(db_path, str):
+            raise ValueError("db_path must be string")
+
+        self._db_path = db_path
+        folder_path = os.path.dirname(os.path.abspath(db_path))
+        if not os.path.exists(folder_path):
+            os.makedirs(folder_path)
+
+        # one connection per thread, sqlite3 connections must not be shared between threads
+        self._local = threading.local()
+        self._claim_count = 0
+
+        try:
+            connection = self._connection()
+            with connection:
+                for sql in self._CREATE_SQL:
+                    connection.execute(sql)
+        except Exception as e:
+            raise Exception(f"create coordinator {db_path} failed: {str(e)}")
+
+    @property
+    def db_path(self):
+        return self._db_path
+
+    def claim_run(self, owner_id, task_name, slot, now):
+        connection = self._connection()
+        with connection:
+            is_claimed = connection.execute("INSERT OR IGNORE INTO claims (task_name, slot, owner_id, claimed_at) VALUES (?, ?, ?, ?)",
+                                            (task_name, slot, owner_id, now)).rowcount == 1
+
+            self._claim_count += 1
+            if self._claim_count % self._CLEANUP_EVERY == 0:
+                connection.execute("DELETE FROM claims WHERE claimed_at < ?", (now - self._CLAIM_RETENTION,))
+        return is_claimed
+
+    def close(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    @contextlib.contextmanager
+    def _lease_state(self):
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            lease_dict = {task_name: (owner_id, expires_at) for task_name, owner_id, expires_at
+                          in connection.execute("SELECT task_name, owner_id, expires_at FROM leases")}
+            member_dict = dict(connection.execute("SELECT owner_id, expires_at FROM members"))
+            original_leases, original_members = dict(lease_dict), dict(member_dict)
+
+            yield lease_dict, member_dict
+
+            # only the changed rows are written
+            connection.executemany("DELETE FROM leases WHERE task_name = ?",
+                                   [(task_name,) for task_name in original_leases if task_name not in lease_dict])
+            connection.executemany("INSERT OR REPLACE INTO leases (task_name, owner_id, expires_at) VALUES (?, ?, ?)",
+                                   [(task_name, *lease) for task_name, lease in lease_dict.items() if original_leases.get(task_name) != lease])
+            connection.executemany("DELETE FROM members WHERE owner_id = ?",
+                                   [(owner_id,) for owner_id in original_members if owner_id not in member_dict])
+            connection.executemany("INSERT OR REPLACE INTO members (owner_id, expires_at) VALUES (?, ?)",
+                                   [(owner_id, expires_at) for owner_id, expires_at in member_dict.items() if original_members.get(owner_id) != expires_at])
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # transactions are explicit, so BEGIN IMMEDIATE takes the write lock up front
+            connection = sqlite3.connect(self._db_path, timeout=30, isolation_level=None)
+            self._local.connection = connection
+        return connection
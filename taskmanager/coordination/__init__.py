@@ -0,0 +1,3 @@
+from .Coordinator import Coordinator
+from .SqliteCoordinator import SqliteCoordinator
+from .FileLockCoordinator import FileLockCoordinator
\ No newline at end of file
@@ -0,0 +1,140 @@
+import asyncio
+import threading
+
+
+class AsyncioWorkerPool:
+    """
+    Runs coroutine task wrappers on one shared event loop thread.
+    A worker is the asyncio.Task of a run, so terminating or killing it maps to cancellation.
+    max_workers is None means no limit on concurrently running coroutines.
+    max_pending is 0 means no limit on coroutines waiting for a free slot.
+    """
+
+    def __init__(self, pool_name, max_workers=None, max_pending=0) -> None:
+
+        if max_workers is not None and max_workers <= 0:
+            raise ValueError("max_workers must be positive int or None")
+        if max_pending < 0:
+            raise ValueError("max_pending must not be negative")
+
+        self._pool_name = pool_name
+        self._max_workers = max_workers
+        self._max_pending = max_pending
+
+        self._loop = None
+        self._loop_thread = None
+        self._semaphore = None
+        self._running_count = 0
+        self._pending_count = 0
+        self._lock = threading.Lock()
+        # asyncio.Tasks which survived every cancellation
+        self._leaked_tasks = set()
+
+    @property
+    def pool_name(self):
+        return self._pool_name
+
+    @property
+    def max_workers(self):
+        return self._max_workers
+
+    @property
+    def worker_count(self):
+        return 1 if self._loop_thread is not None else 0
+
+    @property
+    def idle_count(self):
+        return 0
+
+    @property
+    def pending_count(self):
+        return self._pending_count
+
+    @property
+    def running_count(self):
+        return self._running_count
+
+    @property
+    def loop(self):
+        return self._loop
+
+    @property
+    def kill_delays(self):
+        return (0,)
+
+    @property
+    def leak_grace(self):
+        return 5
+
+    @property
+    def leaked_count(self):
+        return self.leak_stats()["leaked_count"]
+
+    def leak_stats(self):
+        """Returns {"leaked_count", "recovered_count", "leaked_cpu_time"}, coroutines share the loop thread so their CPU time is not measured."""
+        with self._lock:
+            leaked_tasks = list(self._leaked_tasks)
+        leaked_count = sum(1 for worker in leaked_tasks if not worker.done())
+        return {"leaked_count": leaked_count, "recovered_count": len(leaked_tasks) - leaked_count, "leaked_cpu_time": None}
+
+    def mark_leaked(self, worker):
+        # a coroutine which swallows every cancellation keeps running on the loop
+        if worker is None or worker.done():
+            return
+        with self._lock:
+            self._leaked_tasks.add(worker)
+
+    def submit(self, job):
+        """Schedules the coroutine function job on the event loop, raises if too many runs are pending."""
+        with self._lock:
+            if self._max_pending and self._pending_count >= self._max_pending:
+                raise Exception(f"pending queue of pool {self._pool_name} is full")
+            self._pending_count += 1
+            self._start_loop()
+
+        self._loop.call_soon_threadsafe(self._loop.create_task, self._run_job(job))
+
+    def current_worker(self):
+        return asyncio.current_task()
+
+    def invoke(self, task_func, terminate_event, args, kwargs):
+        return task_func(terminate_event, *args, **kwargs)
+
+    def terminate_worker(self, worker):
+        if worker is not None:
+            self._loop.call_soon_threadsafe(worker.cancel)
+
+    def kill_worker(self, worker, attempt):
+        # a coroutine may swallow the first cancellation, so cancel it again
+        if worker is None:
+            raise ValueError("task is not started on any worker")
+        self._loop.call_soon_threadsafe(worker.cancel)
+
+    async def _run_job(self, job):
+        try:
+            if self._semaphore is not None:
+                await self._semaphore.acquire()
+        finally:
+            with self._lock:
+                self._pending_count -= 1
+
+        self._running_count += 1
+        try:
+            await job()
+        except BaseException:
+            # the job reports its own result, a cancellation must not stop the loop
+            pass
+        finally:
+            self._running_count -= 1
+            if self._semaphore is not None:
+                self._semaphore.release()
+
+    def _start_loop(self):
+        if self._loop is not None:
+            return
+
+        self._loop = asyncio.new_event_loop()
+        if self._max_workers is not None:
+            self._semaphore = asyncio.Semaphore(self._max_workers)
+        self._loop_thread = threading.Thread(target=self._loop.run_forever, name=f"{self._pool_name}-loop", daemon=True)
+        self._loop_thread.start()
@@ -0,0 +1,178 @@
+import os
+import atexit
+import threading
+import multiprocessing
+
+from .ThreadWorkerPool import ThreadWorkerPool
+
+
+def _process_worker_main(conn, terminate_event):
+    """Entry point of a worker process, runs the received task functions until it gets None."""
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+
+        task_func, args, kwargs = job
+        try:
+            result = ("result", tuple(task_func(terminate_event, *args, **kwargs)))
+        except Exception as err:
+            result = ("error", err)
+
+        try:
+            conn.send(result)
+        except Exception as err:
+            # result or exception is not picklable
+            conn.send(("error", Exception(f"send result failed: {str(err)}")))
+
+
+class ProcessWorker:
+    """A worker process and the pipe used to send it task functions."""
+
+    # seconds between two checks of a released worker while its result is awaited
+    _POLL_INTERVAL = 0.1
+
+    def __init__(self, mp_context) -> None:
+        self._terminate_event = mp_context.Event()
+        self._conn, child_conn = mp_context.Pipe()
+        self._process = mp_context.Process(target=_process_worker_main, args=(child_conn, self._terminate_event), daemon=True)
+        self._process.start()
+        child_conn.close()
+        # a released worker is given up by its dispatcher thread, e.g. once its process is leaked
+        self._is_released = False
+
+    @property
+    def process(self):
+        return self._process
+
+    @property
+    def is_alive(self):
+        return self._process.is_alive()
+
+    @property
+    def is_released(self):
+        return self._is_released
+
+    def run(self, task_func, args, kwargs):
+        self._terminate_event.clear()
+        self._conn.send((task_func, args, kwargs))
+        try:
+            while not self._conn.poll(self._POLL_INTERVAL):
+                if self._is_released:
+                    raise Exception(f"worker process {self._process.pid} is released")
+            result_type, result = self._conn.recv()
+        except (EOFError, OSError):
+            raise Exception(f"worker process {self._process.pid} exited with code {self._process.exitcode}")
+
+        if result_type == "error":
+            raise result
+        return result
+
+    def terminate(self):
+        self._terminate_event.set()
+
+    def release(self):
+        self._is_released = True
+
+    def close(self):
+        self._conn.close()
+        self._process.join(0)
+
+
+class ProcessWorkerPool(ThreadWorkerPool):
+    """
+    Runs task functions in worker processes so CPU-bound tasks are not serialized on the GIL.
+    Each worker thread of the pool dispatches to its own worker process, so task functions,
+    args, kwargs and results must be picklable.
+    The kill ladder is SIGTERM after the terminate limit, then SIGKILL after kill_grace seconds.
+    A process which survives SIGKILL is leaked, its dispatcher thread gives it up and starts a new process for its next run.
+    Worker processes are started by start_method, forkserver where it is available and spawn otherwise, since forking
+    a manager which runs many threads may copy a lock held by one of them into the child.
+    """
+
+    def __init__(self, pool_name, max_workers=None, max_pending=0, kill_grace=5, start_method=None) -> None:
+        super().__init__(pool_name, max_workers or os.cpu_count() or 1, max_pending)
+        self._kill_grace = kill_grace
+        if start_method is None:
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        try:
+            self._mp_context = multiprocessing.get_context(start_method)
+        except ValueError:
+            raise ValueError(f"start_method {start_method} is not supported")
+        self._local = threading.local()
+        self._process_workers = set()
+        self._is_exit_registered = False
+        # worker processes which survived SIGKILL, e.g. stuck in an uninterruptible system call
+        self._leaked_processes = set()
+
+    @property
+    def kill_delays(self):
+        return (0, self._kill_grace)
+
+    @property
+    def leak_grace(self):
+        return self._kill_grace
+
+    @property
+    def leaked_count(self):
+        return self.leak_stats()["leaked_count"]
+
+    def leak_stats(self):
+        """Returns {"leaked_count", "recovered_count", "leaked_cpu_time"}, the CPU time of worker processes is not measured."""
+        with self._lock:
+            leaked_processes = list(self._leaked_processes)
+        leaked_count = sum(1 for worker in leaked_processes if worker.is_alive)
+        return {"leaked_count": leaked_count, "recovered_count": len(leaked_processes) - leaked_count, "leaked_cpu_time": None}
+
+    def mark_leaked(self, worker):
+        if worker is None or not worker.is_alive:
+            return
+        with self._lock:
+            self._leaked_processes.add(worker)
+            self._process_workers.discard(worker)
+        # the dispatcher thread stops waiting for the result, so the pool does not lose a worker
+        worker.release()
+
+    def current_worker(self):
+        worker = getattr(self._local, "worker", None)
+        if worker is None or not worker.is_alive or worker.is_released:
+            if worker is not None:
+                worker.close()
+                self._process_workers.discard(worker)
+            worker = ProcessWorker(self._mp_context)
+            self._process_workers.add(worker)
+            self._local.worker = worker
+            self._register_exit()
+        return worker
+
+    def _register_exit(self):
+        # a worker ignoring SIGTERM blocks the exit handler of multiprocessing,
+        # registering after the first process start makes this one run before it
+        if not self._is_exit_registered:
+            self._is_exit_registered = True
+            atexit.register(self.shutdown)
+
+    def shutdown(self):
+        for worker in list(self._process_workers):
+            if worker.is_alive:
+                worker.process.kill()
+            worker.close()
+        self._process_workers.clear()
+
+    def invoke(self, task_func, terminate_event, args, kwargs):
+        return self.current_worker().run(task_func, args, kwargs)
+
+    def terminate_worker(self, worker):
+        if worker is not None:
+            worker.terminate()
+
+    def kill_worker(self, worker, attempt):
+        if worker is None:
+            raise ValueError("task is not started on any worker")
+        if attempt == 0:
+            worker.process.terminate()
+        else:
+            worker.process.kill()
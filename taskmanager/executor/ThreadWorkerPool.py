@@ -0,0 +1,240 @@
+import time
+import queue
+import ctypes, inspect
+import threading
+
+
+class ThreadWorker:
+    """A pooled worker thread and the sequence number of the job it was handed out for."""
+    __slots__ = ("_thread", "_job_seq")
+
+    def __init__(self, thread, job_seq) -> None:
+        self._thread = thread
+        self._job_seq = job_seq
+
+    @property
+    def thread(self):
+        return self._thread
+
+    @property
+    def ident(self):
+        return self._thread.ident
+
+    @property
+    def job_seq(self):
+        return self._job_seq
+
+    @property
+    def is_alive(self):
+        return self._thread.is_alive()
+
+
+class ThreadWorkerPool:
+    """
+    A bounded pool of reusable worker threads with a pending-run queue.
+    max_workers is None means the pool grows whenever no worker is idle.
+    max_pending is 0 means the pending-run queue is unbounded.
+    A terminated run which ignores its terminate event gets SystemExit raised in its thread once per kill_delays entry.
+    A thread still running leak_grace seconds after the last attempt is leaked, it is replaced in the pool and watched
+    until it finishes. A kill only reaches the thread while it still runs the job it was aimed at.
+    """
+
+    def __init__(self, pool_name, max_workers=None, max_pending=0, kill_delays=(0, 1, 5), leak_grace=5) -> None:
+
+        if max_workers is not None and max_workers <= 0:
+            raise ValueError("max_workers must be positive int or None")
+        if max_pending < 0:
+            raise ValueError("max_pending must not be negative")
+        if not kill_delays or any(not isinstance(delay, (int, float)) or delay < 0 for delay in kill_delays):
+            raise ValueError("kill_delays must be non-empty sequence of non-negative numbers")
+        if not isinstance(leak_grace, (int, float)) or leak_grace < 0:
+            raise ValueError("leak_grace must be non-negative number")
+
+        self._pool_name = pool_name
+        self._max_workers = max_workers
+        self._max_pending = max_pending
+
+        self._pending_queue = queue.Queue(max_pending)
+        self._workers = set()
+        self._idle_count = 0
+        self._worker_seq = 0
+        # thread ident -> sequence number of the job the thread is running, guarded by the lock like the kills
+        self._running_jobs = {}
+        self._job_seq = 0
+        self._lock = threading.Lock()
+
+        self._kill_delays = tuple(kill_delays)
+        self._leak_grace = leak_grace
+        # thread ident -> (thread, cpu clock id or None) of the leaked workers which are still running
+        self._leaked_workers = {}
+        self._recovered_count = 0
+
+    @property
+    def pool_name(self):
+        return self._pool_name
+
+    @property
+    def max_workers(self):
+        return self._max_workers
+
+    @property
+    def worker_count(self):
+        with self._lock:
+            return len(self._workers)
+
+    @property
+    def idle_count(self):
+        with self._lock:
+            return self._idle_count
+
+    @property
+    def pending_count(self):
+        return self._pending_queue.qsize()
+
+    def submit(self, job):
+        """Queues job to run on a worker thread, raises if the pending-run queue is full."""
+        try:
+            self._pending_queue.put_nowait(job)
+        except queue.Full:
+            raise Exception(f"pending queue of pool {self._pool_name} is full")
+        self._adjust_workers()
+
+    @property
+    def kill_delays(self):
+        """Seconds to wait before each force kill attempt, the first one counts from the terminate limit."""
+        return self._kill_delays
+
+    @property
+    def leak_grace(self):
+        """Seconds to wait after the last force kill attempt before the worker is leaked."""
+        return self._leak_grace
+
+    @property
+    def leaked_count(self):
+        with self._lock:
+            return len(self._leaked_workers)
+
+    def leak_stats(self):
+        """
+        Returns {"leaked_count", "recovered_count", "leaked_cpu_time"}. leaked_cpu_time is the CPU time in seconds
+        used by the leaked threads which are still running, None if the platform has no per-thread CPU clock.
+        """
+        with self._lock:
+            leaked_workers = list(self._leaked_workers.values())
+            recovered_count = self._recovered_count
+
+        leaked_cpu_time = None
+        for _, clock_id in leaked_workers:
+            if clock_id is None:
+                continue
+            try:
+                leaked_cpu_time = (leaked_cpu_time or 0) + time.clock_gettime(clock_id)
+            except OSError:
+                # the thread has just exited
+                pass
+        return {"leaked_count": len(leaked_workers), "recovered_count": recovered_count, "leaked_cpu_time": leaked_cpu_time}
+
+    def mark_leaked(self, worker):
+        """Takes a worker which survived the kill ladder out of the pool, a new worker takes its place."""
+        if worker is None or not worker.is_alive:
+            return
+        try:
+            clock_id = time.pthread_getcpuclockid(worker.ident)
+        except (AttributeError, OSError):
+            clock_id = None
+        with self._lock:
+            self._leaked_workers[worker.ident] = (worker.thread, clock_id)
+            self._workers.discard(worker.thread)
+        self._adjust_workers()
+
+    def current_worker(self):
+        """The worker handle of the calling job, used to terminate or kill it later."""
+        with self._lock:
+            job_seq = self._running_jobs.get(threading.get_ident())
+        return ThreadWorker(threading.current_thread(), job_seq)
+
+    def invoke(self, task_func, terminate_event, args, kwargs):
+        """Runs task_func on the current worker, called from inside a submitted job."""
+        return task_func(terminate_event, *args, **kwargs)
+
+    def terminate_worker(self, worker):
+        # the thread shares the terminate event with the terminator, nothing else to signal
+        pass
+
+    def kill_worker(self, worker, attempt):
+        # raised again on every attempt, a thread blocked in a C call only sees it once it is back in Python code
+        if worker is None:
+            raise ValueError("task is not started on any worker")
+        with self._lock:
+            # the job may have finished, then the thread is idle or runs the job of another run
+            if self._running_jobs.get(worker.ident) != worker.job_seq:
+                return
+            self._async_raise(worker.ident, SystemExit)
+
+    def _adjust_workers(self):
+        with self._lock:
+            # drop workers which were killed by an async exception
+            self._workers = {worker for worker in self._workers if worker.is_alive()}
+            if self._idle_count >= self._pending_queue.qsize():
+                return
+            if self._max_workers is not None and len(self._workers) >= self._max_workers:
+                return
+
+            self._worker_seq += 1
+            worker = threading.Thread(target=self._worker_loop, name=f"{self._pool_name}-worker-{self._worker_seq}", daemon=True)
+            self._workers.add(worker)
+            self._idle_count += 1
+
+        worker.start()
+
+    def _worker_loop(self):
+        ident = threading.get_ident()
+        while True:
+            job = self._pending_queue.get()
+            with self._lock:
+                self._idle_count -= 1
+                self._job_seq += 1
+                self._running_jobs[ident] = self._job_seq
+            try:
+                job()
+            except BaseException:
+                # a force-killed job raises SystemExit here, the worker itself keeps serving
+                pass
+            # once the job is unregistered no new kill targets the thread, then a kill which is set but not raised yet
+            # is dropped, so it never reaches the next job; a kill raised before that is retried past
+            while True:
+                try:
+                    with self._lock:
+                        self._running_jobs.pop(ident, None)
+                    ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_long(ident), None)
+                    break
+                except BaseException:
+                    continue
+
+            with self._lock:
+                is_leaked = self._leaked_workers.pop(ident, None) is not None
+                if is_leaked:
+                    self._recovered_count += 1
+                else:
+                    self._idle_count += 1
+            # a leaked worker is already replaced
+            if is_leaked:
+                return
+
+    @staticmethod
+    def _async_raise(tid, exctype): 
+        """raises the exception, performs cleanup if needed"""
+        tid = ctypes.c_long(tid) 
+        if not inspect.isclass(exctype): 
+            exctype = type(exctype) 
+        res = ctypes.pythonapi.PyThreadState_SetAsyncExc(tid, ctypes.py_object(exctype)) 
+        if res == 0: 
+            raise ValueError("invalid thread id") 
+        elif res != 1: 
+            """ 
+            if it returns a number greater than one, you’re in 
+            trouble, # and you should call it again with exc=NULL to  
+            revert the effect
+            """
+            ctypes.pythonapi.PyThreadState_SetAsyncExc(tid, None) 
+            raise SystemError("PyThreadState_SetAsyncExc failed") 
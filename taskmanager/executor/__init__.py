@@ -0,0 +1,3 @@
+from .ThreadWorkerPool import ThreadWorker, ThreadWorkerPool
+from .ProcessWorkerPool import ProcessWorkerPool
+from .AsyncioWorkerPool import AsyncioWorkerPool
\ No newline at end of file
@@ -0,0 +1,29 @@
+import abc
+
+
+class RunLedger(abc.ABC):
+    """
+    Base class of the run ledgers. A ledger only appends run records, append is called on the manager loop
+    so it must not block. Old records are only removed by retention.
+    """
+
+    @abc.abstractmethod
+    def append(self, record):
+        """Queues the RunRecord to be written."""
+
+    @abc.abstractmethod
+    def query(self, task_name=None, start=None, end=None, limit=None):
+        """Returns the records of the runs which started in [start, end), earliest first."""
+
+    @abc.abstractmethod
+    def running_time_percentile(self, task_name, percentile, start=None, end=None):
+        """Returns the running time at the given percentile (0~100) of the runs which started in [start, end)."""
+
+    def apply_retention(self):
+        pass
+
+    def flush(self, timeout=30):
+        pass
+
+    def close(self, timeout=30):
+        pass
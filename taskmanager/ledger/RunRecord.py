@@ -0,0 +1,57 @@
+class RunRecord:
+    """
+    The report of one finished run, as it is stored in a run ledger.
+    result_args is only kept in memory for the subscriptions, ledgers do not store it.
+    """
+
+    def __init__(self, task_name, run_id, state, start_datetime, finish_datetime, running_time, result_bool, result_msg,
+                 result_args=None) -> None:
+        self._task_name = task_name
+        self._run_id = run_id
+        self._state = state
+        self._start_datetime = start_datetime
+        self._finish_datetime = finish_datetime
+        self._running_time = running_time
+        self._result_bool = result_bool
+        self._result_msg = result_msg
+        self._result_args = result_args
+
+    def __repr__(self):
+        return (f"RunRecord(task_name={self._task_name!r}, run_id={self._run_id}, state={self._state!r}, "
+                f"start_datetime={self._start_datetime}, running_time={self._running_time}, result_bool={self._result_bool})")
+
+    @property
+    def task_name(self):
+        return self._task_name
+
+    @property
+    def run_id(self):
+        return self._run_id
+
+    @property
+    def state(self):
+        return self._state
+
+    @property
+    def start_datetime(self):
+        return self._start_datetime
+
+    @property
+    def finish_datetime(self):
+        return self._finish_datetime
+
+    @property
+    def running_time(self):
+        return self._running_time
+
+    @property
+    def result_bool(self):
+        return self._result_bool
+
+    @property
+    def result_msg(self):
+        return self._result_msg
+
+    @property
+    def result_args(self):
+        return self._result_args
@@ -0,0 +1,275 @@
+import os
+import math
+import queue
+import atexit
+import sqlite3
+import datetime
+import threading
+
+from .RunLedger import RunLedger
+from .RunRecord import RunRecord
+
+
+class SqliteRunLedger(RunLedger):
+    """
+    Run ledger in a local SQLite file. Records are written in batches by a writer thread which owns the
+    write connection, queries open their own connection, the database runs in WAL mode so they do not block the writes.
+    Runs are indexed by (task_name, start_ts), by start_ts and by (task_name, running_time) for the percentiles.
+    Timestamps are stored as epoch seconds. The file is created with incremental auto vacuum, so retention gives a bounded
+    number of freed pages back per pass instead of rewriting the whole file.
+    """
+
+    _CREATE_SQL = [
+        """CREATE TABLE IF NOT EXISTS runs (
+            id INTEGER PRIMARY KEY,
+            task_name TEXT NOT NULL,
+            run_id INTEGER NOT NULL,
+            state TEXT NOT NULL,
+            start_ts REAL NOT NULL,
+            finish_ts REAL,
+            running_time REAL,
+            result_bool INTEGER,
+            result_msg TEXT
+        )""",
+        "CREATE INDEX IF NOT EXISTS runs_task_start ON runs (task_name, start_ts)",
+        "CREATE INDEX IF NOT EXISTS runs_start ON runs (start_ts)",
+        "CREATE INDEX IF NOT EXISTS runs_task_running_time ON runs (task_name, running_time)",
+    ]
+    _INSERT_SQL = "INSERT INTO runs (task_name, run_id, state, start_ts, finish_ts, running_time, result_bool, result_msg) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+    _COLUMNS = "task_name, run_id, state, start_ts, finish_ts, running_time, result_bool, result_msg"
+
+    # retention runs at most this often, in seconds
+    _RETENTION_INTERVAL = 60 * 60
+    # free pages given back to the file system per retention pass, the rest is reused by new runs
+    _VACUUM_PAGES = 2000
+
+    def __init__(self, db_path, retention_days=None, batch_size=500, flush_interval=1, max_pending=100000, logger=None) -> None:
+
+        if not isinstance(db_path, str):
+            raise ValueError("db_path must be string")
+        if retention_days is not None and (not isinstance(retention_days, (int, float)) or retention_days <= 0):
+            raise ValueError("retention_days must be positive number")
+        if not isinstance(batch_size, int) or batch_size <= 0:
+            raise ValueError("batch_size must be positive int")
+        if not isinstance(max_pending, int) or max_pending <= 0:
+            raise ValueError("max_pending must be positive int")
+
+        self._db_path = db_path
+        self._retention_days = retention_days
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        # Logger of the manager, None means write errors are only counted in dropped_count
+        self._logger = logger
+        self._log_title = f"[{self.__class__.__name__}]"
+
+        folder_path = os.path.dirname(os.path.abspath(db_path))
+        if not os.path.exists(folder_path):
+            os.makedirs(folder_path)
+
+        # the schema is created up front so queries work before the first write
+        try:
+            connection = sqlite3.connect(self._db_path)
+            with connection:
+                # only takes effect on a new file, a ledger created without it keeps its free pages for new runs
+                connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                connection.execute("PRAGMA journal_mode=WAL")
+                for sql in self._CREATE_SQL:
+                    connection.execute(sql)
+            connection.close()
+        except Exception as e:
+            raise Exception(f"create run ledger {db_path} failed: {str(e)}")
+
+        # the queue holds records, or events which are set once everything queued before them is written
+        self._pending_queue = queue.Queue(max_pending)
+        self._dropped_count = 0
+        self._lock = threading.Lock()
+        self._is_closed = False
+
+        self._writer_thread = threading.Thread(target=self._write_loop, name=f"run-ledger-{os.path.basename(db_path)}", daemon=True)
+        self._writer_thread.start()
+        atexit.register(self.close)
+
+    @property
+    def db_path(self):
+        return self._db_path
+
+    @property
+    def pending_count(self):
+        return self._pending_queue.qsize()
+
+    @property
+    def dropped_count(self):
+        return self._dropped_count
+
+    def append(self, record):
+        if self._is_closed:
+            raise Exception(f"run ledger {self._db_path} is closed")
+        try:
+            self._pending_queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self._dropped_count += 1
+
+    def flush(self, timeout=30):
+        """Blocks until the records appended before are written, returns False if they are not written within timeout seconds."""
+        if self._is_closed or not self._writer_thread.is_alive():
+            return False
+        written_event = threading.Event()
+        try:
+            self._pending_queue.put(written_event, timeout=timeout)
+        except queue.Full:
+            return False
+        return written_event.wait(timeout)
+
+    def close(self, timeout=30):
+        if self._is_closed:
+            return
+        self.flush(timeout)
+        self._is_closed = True
+        try:
+            self._pending_queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._writer_thread.join(timeout)
+        atexit.unregister(self.close)
+
+    def query(self, task_name=None, start=None, end=None, limit=None):
+        where_sql, params = self._where(task_name, start, end)
+        sql = f"SELECT {self._COLUMNS} FROM runs{where_sql} ORDER BY start_ts, id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        rows = self._read(sql, params)
+        return [self._to_record(row) for row in rows]
+
+    def running_time_percentile(self, task_name, percentile, start=None, end=None):
+        if not 0 <= percentile <= 100:
+            raise ValueError("percentile must be 0~100")
+
+        where_sql, params = self._where(task_name, start, end)
+        where_sql += " AND running_time IS NOT NULL" if where_sql else " WHERE running_time IS NOT NULL"
+        count = self._read(f"SELECT COUNT(*) FROM runs{where_sql}", params)[0][0]
+        if count == 0:
+            return None
+
+        # nearest-rank percentile, only one row is read
+        rank = max(1, math.ceil(percentile / 100 * count))
+        rows = self._read(f"SELECT running_time FROM runs{where_sql} ORDER BY running_time LIMIT 1 OFFSET ?", params + [rank - 1])
+        return rows[0][0]
+
+    def apply_retention(self):
+        """Deletes the runs older than retention_days and returns the number of deleted runs."""
+        if self._retention_days is None:
+            return 0
+        cutoff = (datetime.datetime.now() - datetime.timedelta(days=self._retention_days)).timestamp()
+
+        connection = sqlite3.connect(self._db_path, timeout=30)
+        try:
+            with connection:
+                deleted_count = connection.execute("DELETE FROM runs WHERE start_ts < ?", (cutoff,)).rowcount
+            # gives some of the freed pages back to the file system, the pragma frees one page per step so it runs as a script
+            if deleted_count > 0:
+                connection.executescript(f"PRAGMA incremental_vacuum({self._VACUUM_PAGES})")
+            return deleted_count
+        finally:
+            connection.close()
+
+    def _write_loop(self):
+        connection = sqlite3.connect(self._db_path, timeout=30)
+        last_retention = None
+        try:
+            while True:
+                batch = []
+                waiting_events = []
+                is_stopped = False
+
+                try:
+                    item = self._pending_queue.get(timeout=self._flush_interval)
+                    while True:
+                        if item is None:
+                            is_stopped = True
+                        elif isinstance(item, threading.Event):
+                            waiting_events.append(item)
+                        else:
+                            try:
+                                batch.append(self._to_row(item))
+                            except Exception as e:
+                                # a record which can not be stored must not stop the writer
+                                self._drop_records(1, f"convert record of task {getattr(item, 'task_name', None)} failed: {str(e)}")
+                        if is_stopped or len(batch) >= self._batch_size:
+                            break
+                        item = self._pending_queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+                if batch:
+                    try:
+                        with connection:
+                            connection.executemany(self._INSERT_SQL, batch)
+                    except Exception as e:
+                        self._drop_records(len(batch), f"write {len(batch)} records failed: {str(e)}")
+
+                for written_event in waiting_events:
+                    written_event.set()
+
+                if is_stopped:
+                    return
+
+                now = datetime.datetime.now()
+                if self._retention_days is not None and (last_retention is None or (now - last_retention).total_seconds() >= self._RETENTION_INTERVAL):
+                    last_retention = now
+                    try:
+                        self.apply_retention()
+                    except Exception as e:
+                        self._log_critical(f"apply retention of {self._db_path} failed: {str(e)}")
+        finally:
+            connection.close()
+
+    def _drop_records(self, record_count, msg):
+        with self._lock:
+            self._dropped_count += record_count
+        self._log_critical(msg)
+
+    def _log_critical(self, msg):
+        if self._logger is not None:
+            self._logger.critical(f"{self._log_title} {msg}")
+
+    def _read(self, sql, params):
+        connection = sqlite3.connect(self._db_path, timeout=30)
+        try:
+            return connection.execute(sql, params).fetchall()
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _where(task_name, start, end):
+        conditions = []
+        params = []
+        if task_name is not None:
+            conditions.append("task_name = ?")
+            params.append(task_name)
+        if start is not None:
+            conditions.append("start_ts >= ?")
+            params.append(start.timestamp())
+        if end is not None:
+            conditions.append("start_ts < ?")
+            params.append(end.timestamp())
+        where_sql = " WHERE " + " AND ".join(conditions) if conditions else ""
+        return where_sql, params
+
+    @staticmethod
+    def _to_row(record):
+        finish_ts = record.finish_datetime.timestamp() if record.finish_datetime is not None else None
+        result_msg = str(record.result_msg) if record.result_msg is not None else None
+        result_bool = int(bool(record.result_bool)) if record.result_bool is not None else None
+        return (record.task_name, record.run_id, record.state, record.start_datetime.timestamp(), finish_ts,
+                record.running_time, result_bool, result_msg)
+
+    @staticmethod
+    def _to_record(row):
+        task_name, run_id, state, start_ts, finish_ts, running_time, result_bool, result_msg = row
+        start_datetime = datetime.datetime.fromtimestamp(start_ts)
+        finish_datetime = datetime.datetime.fromtimestamp(finish_ts) if finish_ts is not None else None
+        result_bool = bool(result_bool) if result_bool is not None else None
+        return RunRecord(task_name, run_id, state, start_datetime, finish_datetime, running_time, result_bool, result_msg)
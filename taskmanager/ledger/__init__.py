@@ -0,0 +1,3 @@
+from .RunRecord import RunRecord
+from .RunLedger import RunLedger
+from .SqliteRunLedger import SqliteRunLedger
\ No newline at end of file
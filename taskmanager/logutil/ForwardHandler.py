@@ -0,0 +1,12 @@
+import logging
+
+
+class ForwardHandler(logging.Handler):
+    """Hands every record to another Logger, whose handlers format and write it."""
+
+    def __init__(self, target_logger) -> None:
+        super().__init__()
+        self._target_logger = target_logger
+
+    def emit(self, record):
+        self._target_logger.handle(record)
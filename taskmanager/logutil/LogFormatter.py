@@ -0,0 +1,15 @@
+import logging
+
+
+class LogFormatter(logging.Formatter):
+    """
+    Formats a record as one line. The message is only built and cleaned here,
+    so a record which no handler accepts is never formatted.
+    """
+
+    def __init__(self) -> None:
+        super().__init__('[%(asctime)s.%(msecs)03d][%(levelname)s][%(name)s] %(message)s', datefmt='%Y-%m-%d,%H:%M:%S')
+
+    def formatMessage(self, record):
+        record.message = str(record.message).replace("\n", ";").replace("\r", " ").replace("\t", " ")
+        return super().formatMessage(record)
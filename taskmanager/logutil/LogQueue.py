@@ -0,0 +1,140 @@
+import queue
+import atexit
+import logging
+import threading
+
+
+class LogQueue:
+    """
+    Bounded queue of log records. Producers only enqueue, a background thread hands the records
+    to the real handlers in batches. A record which does not fit in the queue is dropped and counted.
+    Once the queue is stopped, records are handed to the handlers at once.
+    """
+
+    # put in the queue to stop the writer thread
+    _STOP = None
+
+    def __init__(self, queue_name, max_size=10000, batch_size=256) -> None:
+
+        if not isinstance(max_size, int) or max_size <= 0:
+            raise ValueError("max_size must be positive int")
+        if not isinstance(batch_size, int) or batch_size <= 0:
+            raise ValueError("batch_size must be positive int")
+
+        self._queue_name = queue_name
+        self._queue = queue.Queue(max_size)
+        self._batch_size = batch_size
+        self._handlers = []
+
+        self._dropped_count = 0
+        self._lock = threading.Lock()
+
+        self._writer_thread = None
+        self._is_stopped = False
+        self._enqueue_handler = _EnqueueHandler(self)
+
+    @property
+    def enqueue_handler(self):
+        return self._enqueue_handler
+
+    @property
+    def handlers(self):
+        return self._handlers
+
+    @property
+    def depth(self):
+        return self._queue.qsize()
+
+    @property
+    def max_size(self):
+        return self._queue.maxsize
+
+    @property
+    def dropped_count(self):
+        return self._dropped_count
+
+    def add_handler(self, handler):
+        self._handlers.append(handler)
+
+    def put(self, record):
+        if self._is_stopped:
+            self._write(record)
+            return
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self._dropped_count += 1
+
+    def start(self):
+        if self._writer_thread is not None:
+            return
+        self._is_stopped = False
+        self._writer_thread = threading.Thread(target=self._write_loop, name=f"{self._queue_name}-log-writer", daemon=True)
+        self._writer_thread.start()
+        # the writer is a daemon thread, so the queued records are flushed before the interpreter exits
+        atexit.register(self.stop)
+
+    def stop(self):
+        if self._writer_thread is None:
+            return
+        # later records skip the queue, the ones put while the writer stops are written after it
+        self._is_stopped = True
+        self._queue.put(self._STOP)
+        self._writer_thread.join()
+        self._writer_thread = None
+        atexit.unregister(self.stop)
+        try:
+            while True:
+                self._write(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        for handler in self._handlers:
+            handler.flush()
+
+    def _write(self, record):
+        for handler in self._handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def _write_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            try:
+                while len(batch) < self._batch_size:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            is_stopped = False
+            for record in batch:
+                if record is self._STOP:
+                    is_stopped = True
+                    continue
+                self._write(record)
+
+            for handler in self._handlers:
+                handler.flush()
+
+            if is_stopped:
+                return
+
+
+class _EnqueueHandler(logging.Handler):
+    """The only handler of a queued logger, it hands the record to the queue with its message merged."""
+
+    def __init__(self, log_queue) -> None:
+        super().__init__()
+        self._log_queue = log_queue
+
+    def prepare(self, record):
+        # the args may be changed by the caller before the writer formats the record, so the message is merged now
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def emit(self, record):
+        try:
+            self._log_queue.put(self.prepare(record))
+        except Exception:
+            self.handleError(record)
@@ -2,6 +2,9 @@ import os
 import logging
 from logging.handlers import TimedRotatingFileHandler
 
+from .LogFormatter import LogFormatter
+from .LogQueue import LogQueue
+
 class Logger:
 
     def __init__(self, logger_name, streaming_log_level="DEBUG") -> None:
@@ -15,6 +18,9 @@ class Logger:
         self._log_folder_path = None
         self._rotate_days = 30
 
+        # queue logging, None means the handlers write on the caller's thread
+        self._log_queue = None
+
         # set logger
         self._logger = self.init_logger()
 
@@ -44,7 +50,7 @@ class Logger:
 
         try:
             # set formatters of log
-            formatter = logging.Formatter('[%(asctime)s.%(msecs)03d][%(levelname)s][%(name)s] %(message)s', datefmt='%Y-%m-%d,%H:%M:%S')
+            formatter = LogFormatter()
         except Exception as e:
             raise Exception(f"set streaming logging formatter failed: {str(e)}")
 
@@ -103,7 +109,7 @@ class Logger:
 
         try:
             # set formatters of log
-            formatter = logging.Formatter('[%(asctime)s.%(msecs)03d][%(levelname)s][%(name)s] %(message)s', datefmt='%Y-%m-%d,%H:%M:%S')
+            formatter = LogFormatter()
         except Exception as e:
             raise Exception(f"set phtsical logging formatter failed: {str(e)}")
 
@@ -122,35 +128,82 @@ class Logger:
             # set logger level to memo logs
             self._logger.setLevel(logging_level_value)
 
-            # add handler
-            self._logger.addHandler(file_handler) 
+            # add handler, a queued logger hands it to the writer thread
+            if self._log_queue is not None:
+                self._log_queue.add_handler(file_handler)
+            else:
+                self._logger.addHandler(file_handler)
         except Exception as e:
             raise Exception(f"enable phtsical logger failed: {str(e)}")
-        
-    
-    def info(self, message):
+
+    def enable_queue_logging(self, max_queue_size, batch_size):
+
+        if self._log_queue is not None:
+            return
+
         try:
-            self._logger.info(self._postprocess(message))
+            log_queue = LogQueue(self._logger_name, max_queue_size, batch_size)
+        except Exception as e:
+            raise Exception(f"create log queue failed: {str(e)}")
+
+        # the handlers move to the writer thread, the logger only enqueues records
+        for handler in list(self._logger.handlers):
+            self._logger.removeHandler(handler)
+            log_queue.add_handler(handler)
+        self._logger.addHandler(log_queue.enqueue_handler)
+
+        self._log_queue = log_queue
+        self._log_queue.start()
+
+    def forward_to(self, handler):
+        """Replaces the handlers of the logger with handler, e.g. to hand the records to another logger or process."""
+        for current_handler in list(self._logger.handlers):
+            self._logger.removeHandler(current_handler)
+        self._logger.addHandler(handler)
+
+    def handle(self, record):
+        # handles a record created by another logger, e.g. forwarded from a shard
+        self._logger.handle(record)
+
+    def stop_queue_logging(self):
+        # writes out the queued records, then the handlers are moved back to the logger
+        if self._log_queue is None:
+            return
+        log_queue = self._log_queue
+        log_queue.stop()
+        # the list is swapped in one step, so no record meets both the enqueue handler and the handlers, or neither
+        self._logger.handlers = [handler for handler in self._logger.handlers if handler is not log_queue.enqueue_handler] + log_queue.handlers
+        self._log_queue = None
+
+    @property
+    def queue_depth(self):
+        return self._log_queue.depth if self._log_queue is not None else 0
+
+    @property
+    def dropped_count(self):
+        return self._log_queue.dropped_count if self._log_queue is not None else 0
+
+    # message is formatted with args only when a handler accepts the record
+    def info(self, message, *args):
+        try:
+            self._logger.info(message, *args)
         except Exception as msg:
             raise Exception(f"store info log failed: {str(msg)}")
         
-    def debug(self, message):
+    def debug(self, message, *args):
         try:
-            self._logger.debug(self._postprocess(message))
+            self._logger.debug(message, *args)
         except Exception as msg:
             raise Exception(f"store debug log failed: {str(msg)}")
         
-    def warning(self, message):
+    def warning(self, message, *args):
         try:
-            self._logger.warning(self._postprocess(message))
+            self._logger.warning(message, *args)
         except Exception as msg:
             raise Exception(f"store warning log failed: {str(msg)}")
         
-    def critical(self, message):
+    def critical(self, message, *args):
         try:
-            self._logger.critical(self._postprocess(message))
+            self._logger.critical(message, *args)
         except Exception as msg:
             raise Exception(f"store critical log failed: {str(msg)}")
-        
-    def _postprocess(self, message):
-        return str(message).replace("\n", ";").replace("\r", " ").replace("\t", " ")
@@ -1 +1,4 @@
-from .Logger import Logger
\ No newline at end of file
+from .Logger import Logger
+from .LogFormatter import LogFormatter
+from .LogQueue import LogQueue
+from .ForwardHandler import ForwardHandler
\ No newline at end of file
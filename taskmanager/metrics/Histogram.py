@@ -0,0 +1,55 @@
+import bisect
+import threading
+
+
+# upper bounds in seconds, from a millisecond of lag to an hour of running time
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 1800, 3600)
+
+
+class Histogram:
+    """Fixed-bucket histogram, observe is a binary search and an increment."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS) -> None:
+
+        if not buckets or list(buckets) != sorted(buckets):
+            raise ValueError("buckets must be sorted non-empty sequence")
+
+        self._buckets = tuple(buckets)
+        # the last count is the +Inf bucket
+        self._counts = [0] * (len(self._buckets) + 1)
+        self._sum = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    @property
+    def buckets(self):
+        return self._buckets
+
+    @property
+    def count(self):
+        return self._count
+
+    @property
+    def sum(self):
+        return self._sum
+
+    def observe(self, value):
+        index = bisect.bisect_left(self._buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self):
+        """Returns {"buckets": [(upper_bound, cumulative_count)], "sum": ..., "count": ...}, the last bound is inf."""
+        with self._lock:
+            counts = list(self._counts)
+            histogram_sum = self._sum
+            histogram_count = self._count
+
+        cumulative_buckets = []
+        cumulative_count = 0
+        for upper_bound, bucket_count in zip(self._buckets + (float("inf"),), counts):
+            cumulative_count += bucket_count
+            cumulative_buckets.append((upper_bound, cumulative_count))
+        return {"buckets": cumulative_buckets, "sum": histogram_sum, "count": histogram_count}
@@ -0,0 +1,170 @@
+import sys
+import time
+import cProfile
+import threading
+import traceback
+import collections
+from concurrent.futures import Future
+
+
+class LoopProfiler:
+    """
+    Times the phases of every iteration of the manager loop and keeps rolling stats of the last window iterations.
+    A watchdog thread logs a warning with the stack of the loop thread once an iteration runs longer than budget seconds,
+    while it is still stalled. profile_iterations runs a profiler on the loop thread for the next iterations.
+    """
+
+    def __init__(self, logger, log_title, budget=0.1, window=1000) -> None:
+
+        if not isinstance(budget, (int, float)) or budget <= 0:
+            raise ValueError("budget must be positive number")
+        if not isinstance(window, int) or window <= 0:
+            raise ValueError("window must be positive int")
+
+        self._logger = logger
+        self._log_title = log_title
+        self._budget_ns = round(budget * 1_000_000_000)
+        self._window = window
+
+        # phase name -> durations in ns of the last window iterations, "total" is the whole iteration
+        self._phase_durations = {}
+        self._stall_count = 0
+        self._lock = threading.Lock()
+
+        # state of the current iteration, written by the loop thread only
+        self._loop_thread_id = None
+        self._iteration_start = None
+        self._phase_start = None
+        self._current_phase = None
+        # (phase name, duration in ns) of the current iteration, logged if it runs over budget
+        self._iteration_phases = []
+        self._is_stall_reported = False
+
+        # pending profile request, (profiler, iterations, future)
+        self._profile_request = None
+        self._active_profile = None
+
+        self._watchdog_stop_event = threading.Event()
+        self._watchdog_thread = None
+
+    @property
+    def stall_count(self):
+        return self._stall_count
+
+    def start_watchdog(self):
+        if self._watchdog_thread is not None:
+            return
+        self._watchdog_thread = threading.Thread(target=self._watch_loop, name=f"{self._log_title}-loop-watchdog", daemon=True)
+        self._watchdog_thread.start()
+
+    def stop_watchdog(self):
+        if self._watchdog_thread is None:
+            return
+        self._watchdog_stop_event.set()
+        self._watchdog_thread.join()
+        self._watchdog_thread = None
+
+    # =========================================== hot path, called by the loop thread =========================================
+
+    def start_iteration(self):
+        if self._profile_request is not None and self._active_profile is None:
+            profiler, iterations, future = self._profile_request
+            self._profile_request = None
+            profiler.enable()
+            self._active_profile = [profiler, iterations, future]
+
+        self._loop_thread_id = threading.get_ident()
+        self._is_stall_reported = False
+        self._current_phase = None
+        self._iteration_phases.clear()
+        self._phase_start = self._iteration_start = time.perf_counter_ns()
+
+    def mark(self, phase_name):
+        """Ends the phase which started at the previous mark, the next phase is named by the next mark."""
+        now = time.perf_counter_ns()
+        duration_ns = now - self._phase_start
+        self._record(phase_name, duration_ns)
+        self._iteration_phases.append((phase_name, duration_ns))
+        self._phase_start = now
+        self._current_phase = phase_name
+
+    def end_iteration(self):
+        iteration_start = self._iteration_start
+        total_ns = time.perf_counter_ns() - iteration_start
+        self._iteration_start = None
+        self._record("total", total_ns)
+
+        if total_ns > self._budget_ns:
+            with self._lock:
+                self._stall_count += 1
+            if not self._is_stall_reported:
+                # the window stats are only computed by stats(), the hot path logs the phases of this iteration
+                phase_times = ", ".join(f"{phase_name}: {duration_ns / 1e9:.3f} s" for phase_name, duration_ns in self._iteration_phases)
+                self._logger.warning("%s main loop iteration took %.3f s, over budget %.3f s, phases: %s",
+                                     self._log_title, total_ns / 1e9, self._budget_ns / 1e9, phase_times)
+
+        if self._active_profile is not None:
+            self._active_profile[1] -= 1
+            if self._active_profile[1] <= 0:
+                profiler, _, future = self._active_profile
+                self._active_profile = None
+                profiler.disable()
+                future.set_result(profiler)
+
+    # ==========================================================================================================================
+
+    def profile_iterations(self, iterations=100, profiler=None):
+        """
+        Runs profiler on the loop thread for the next iterations, profiler is anything with enable() and disable(),
+        cProfile.Profile() by default. Returns a Future which resolves to the profiler once it is disabled.
+        """
+        if not isinstance(iterations, int) or iterations <= 0:
+            raise ValueError("iterations must be positive int")
+        if profiler is None:
+            profiler = cProfile.Profile()
+
+        future = Future()
+        self._profile_request = (profiler, iterations, future)
+        return future
+
+    def stats(self):
+        """Returns {phase: {"count", "mean", "p50", "p99", "max"}} in seconds over the last window iterations."""
+        with self._lock:
+            phase_durations = {phase: list(durations) for phase, durations in self._phase_durations.items()}
+
+        phase_stats = {}
+        for phase, durations in phase_durations.items():
+            durations.sort()
+            count = len(durations)
+            phase_stats[phase] = {
+                "count": count,
+                "mean": sum(durations) / count / 1e9,
+                "p50": durations[(count - 1) // 2] / 1e9,
+                "p99": durations[min(count - 1, int(count * 0.99))] / 1e9,
+                "max": durations[-1] / 1e9,
+            }
+        return phase_stats
+
+    def _record(self, phase_name, duration_ns):
+        with self._lock:
+            durations = self._phase_durations.get(phase_name)
+            if durations is None:
+                durations = self._phase_durations[phase_name] = collections.deque(maxlen=self._window)
+            durations.append(duration_ns)
+
+    def _watch_loop(self):
+        poll_interval = max(0.01, self._budget_ns / 2e9)
+        while not self._watchdog_stop_event.wait(poll_interval):
+            iteration_start = self._iteration_start
+            if iteration_start is None or self._is_stall_reported:
+                continue
+            running_ns = time.perf_counter_ns() - iteration_start
+            if running_ns <= self._budget_ns:
+                continue
+
+            # the stack is taken while the loop is still stalled, so it shows where it is stuck
+            self._is_stall_reported = True
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else "unavailable"
+            self._logger.warning("%s main loop stalled for %.3f s, over budget %.3f s, after phase: %s, stack: %s",
+                                 self._log_title, running_ns / 1e9, self._budget_ns / 1e9, self._current_phase, stack)
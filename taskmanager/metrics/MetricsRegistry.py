@@ -0,0 +1,106 @@
+import threading
+
+
+class MetricsRegistry:
+    """
+    Collects the TaskMetrics and the overlap counters of the tasks of a manager.
+    snapshot is the pull API, render_prometheus renders the same data in the Prometheus text format.
+    """
+
+    _HISTOGRAMS = [
+        ("schedule_lag", "taskmanager_schedule_lag_seconds", "Delay between the due time of a run and Task.run."),
+        ("resource_wait", "taskmanager_resource_wait_seconds", "Delay between Task.run and the grant of the resource tokens of the run."),
+        ("queue_wait", "taskmanager_queue_wait_seconds", "Delay between the submit of a run and its start on a worker."),
+        ("running_time", "taskmanager_running_time_seconds", "Running time of the reported runs."),
+    ]
+    _OVERLAP_COUNTERS = ["dropped", "queued", "coalesced", "replaced"]
+
+    def __init__(self, manager_name) -> None:
+        self._manager_name = manager_name
+        self._task_dict = {}
+        self._lock = threading.Lock()
+
+    def add_task(self, task):
+        if task.metrics is None:
+            raise ValueError(f"task {task.task_name} has no metrics")
+        with self._lock:
+            self._task_dict[task.task_name] = task
+
+    def remove_task(self, task_name):
+        with self._lock:
+            self._task_dict.pop(task_name, None)
+
+    def snapshot(self):
+        """Returns {task_name: metrics}, where metrics is TaskMetrics.snapshot() with the overlap counters and gauges of the task."""
+        with self._lock:
+            tasks = list(self._task_dict.values())
+
+        task_snapshots = {}
+        for task in tasks:
+            task_snapshot = task.metrics.snapshot()
+            task_snapshot["overlap_counts"] = {action: getattr(task, f"{action}_count") for action in self._OVERLAP_COUNTERS}
+            task_snapshot["active_runs"] = len(task.active_runs)
+            task_snapshot["pending_runs"] = task.pending_count
+            if task.result_cache is not None:
+                task_snapshot["cache"] = task.result_cache.snapshot()
+            task_snapshots[task.task_name] = task_snapshot
+        return task_snapshots
+
+    def render_prometheus(self):
+        task_snapshots = self.snapshot()
+        lines = []
+
+        for snapshot_key, metric_name, metric_help in self._HISTOGRAMS:
+            lines.append(f"# HELP {metric_name} {metric_help}")
+            lines.append(f"# TYPE {metric_name} histogram")
+            for task_name, task_snapshot in task_snapshots.items():
+                labels = self._labels(task_name)
+                histogram = task_snapshot[snapshot_key]
+                for upper_bound, cumulative_count in histogram["buckets"]:
+                    bound_str = "+Inf" if upper_bound == float("inf") else repr(float(upper_bound))
+                    lines.append(f'{metric_name}_bucket{{{labels},le="{bound_str}"}} {cumulative_count}')
+                lines.append(f"{metric_name}_sum{{{labels}}} {float(histogram['sum'])}")
+                lines.append(f"{metric_name}_count{{{labels}}} {histogram['count']}")
+
+        lines.append("# HELP taskmanager_run_state_total Number of runs which entered each state.")
+        lines.append("# TYPE taskmanager_run_state_total counter")
+        for task_name, task_snapshot in task_snapshots.items():
+            labels = self._labels(task_name)
+            for state, state_count in task_snapshot["state_counts"].items():
+                lines.append(f'taskmanager_run_state_total{{{labels},state="{state}"}} {state_count}')
+
+        lines.append("# HELP taskmanager_run_failed_total Number of reported runs whose result is False.")
+        lines.append("# TYPE taskmanager_run_failed_total counter")
+        for task_name, task_snapshot in task_snapshots.items():
+            lines.append(f"taskmanager_run_failed_total{{{self._labels(task_name)}}} {task_snapshot['failed_count']}")
+
+        lines.append("# HELP taskmanager_run_overlap_total Number of due runs handled by the overlap policy.")
+        lines.append("# TYPE taskmanager_run_overlap_total counter")
+        for task_name, task_snapshot in task_snapshots.items():
+            labels = self._labels(task_name)
+            for action, action_count in task_snapshot["overlap_counts"].items():
+                lines.append(f'taskmanager_run_overlap_total{{{labels},action="{action}"}} {action_count}')
+
+        lines.append("# HELP taskmanager_cache_lookup_total Number of result cache lookups of the tasks with a cache.")
+        lines.append("# TYPE taskmanager_cache_lookup_total counter")
+        for task_name, task_snapshot in task_snapshots.items():
+            if "cache" in task_snapshot:
+                labels = self._labels(task_name)
+                lines.append(f'taskmanager_cache_lookup_total{{{labels},result="hit"}} {task_snapshot["cache"]["hits"]}')
+                lines.append(f'taskmanager_cache_lookup_total{{{labels},result="miss"}} {task_snapshot["cache"]["misses"]}')
+
+        for gauge_key, metric_name, metric_help in [("active_runs", "taskmanager_active_runs", "Number of runs which are not reported yet."),
+                                                    ("pending_runs", "taskmanager_pending_runs", "Number of runs waiting for a free instance slot.")]:
+            lines.append(f"# HELP {metric_name} {metric_help}")
+            lines.append(f"# TYPE {metric_name} gauge")
+            for task_name, task_snapshot in task_snapshots.items():
+                lines.append(f"{metric_name}{{{self._labels(task_name)}}} {task_snapshot[gauge_key]}")
+
+        return "\n".join(lines) + "\n"
+
+    def _labels(self, task_name):
+        return f'manager="{self._escape(self._manager_name)}",task="{self._escape(task_name)}"'
+
+    @staticmethod
+    def _escape(label_value):
+        return str(label_value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
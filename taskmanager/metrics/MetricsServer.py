@@ -0,0 +1,52 @@
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+class MetricsServer:
+    """Serves the metrics of a MetricsRegistry at /metrics in the Prometheus text format, on a daemon thread."""
+
+    def __init__(self, metrics_registry, port, host="127.0.0.1") -> None:
+
+        registry = metrics_registry
+
+        class _MetricsHandler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # scrapes are not logged
+                pass
+
+        try:
+            self._http_server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        except Exception as e:
+            raise Exception(f"bind metrics server to {host}:{port} failed: {str(e)}")
+        self._http_server.daemon_threads = True
+        self._server_thread = None
+
+    @property
+    def port(self):
+        return self._http_server.server_address[1]
+
+    def start(self):
+        if self._server_thread is not None:
+            return
+        self._server_thread = threading.Thread(target=self._http_server.serve_forever, name=f"metrics-server-{self.port}", daemon=True)
+        self._server_thread.start()
+
+    def stop(self):
+        if self._server_thread is None:
+            return
+        self._http_server.shutdown()
+        self._http_server.server_close()
+        self._server_thread.join()
+        self._server_thread = None
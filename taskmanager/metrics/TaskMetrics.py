@@ -0,0 +1,74 @@
+import threading
+
+from .Histogram import Histogram, DEFAULT_BUCKETS
+
+
+class TaskMetrics:
+    """
+    Histograms and counters of one task. All times are in seconds.
+    schedule_lag is due time to Task.run, resource_wait is Task.run to the grant of the resource tokens of the run,
+    queue_wait is the submit to the worker pool to the start on a worker, running_time is the reported running time of a run.
+    """
+
+    def __init__(self, task_name, buckets=DEFAULT_BUCKETS) -> None:
+        self._task_name = task_name
+
+        self._schedule_lag = Histogram(buckets)
+        self._resource_wait = Histogram(buckets)
+        self._queue_wait = Histogram(buckets)
+        self._running_time = Histogram(buckets)
+
+        # number of runs which entered each state, keyed by TaskState value
+        self._state_counts = {}
+        self._failed_count = 0
+        self._lock = threading.Lock()
+
+    @property
+    def task_name(self):
+        return self._task_name
+
+    @property
+    def schedule_lag(self):
+        return self._schedule_lag
+
+    @property
+    def resource_wait(self):
+        return self._resource_wait
+
+    @property
+    def queue_wait(self):
+        return self._queue_wait
+
+    @property
+    def running_time(self):
+        return self._running_time
+
+    @property
+    def failed_count(self):
+        return self._failed_count
+
+    def state_count(self, state):
+        return self._state_counts.get(state.value, 0)
+
+    def count_state(self, state):
+        with self._lock:
+            self._state_counts[state.value] = self._state_counts.get(state.value, 0) + 1
+
+    def observe_report(self, running_time, result_bool):
+        self._running_time.observe(running_time)
+        if not result_bool:
+            with self._lock:
+                self._failed_count += 1
+
+    def snapshot(self):
+        with self._lock:
+            state_counts = dict(self._state_counts)
+            failed_count = self._failed_count
+        return {
+            "schedule_lag": self._schedule_lag.snapshot(),
+            "resource_wait": self._resource_wait.snapshot(),
+            "queue_wait": self._queue_wait.snapshot(),
+            "running_time": self._running_time.snapshot(),
+            "state_counts": state_counts,
+            "failed_count": failed_count,
+        }
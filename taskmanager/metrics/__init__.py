@@ -0,0 +1,5 @@
+from .Histogram import Histogram
+from .TaskMetrics import TaskMetrics
+from .MetricsRegistry import MetricsRegistry
+from .MetricsServer import MetricsServer
+from .LoopProfiler import LoopProfiler
\ No newline at end of file
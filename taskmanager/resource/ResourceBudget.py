@@ -0,0 +1,113 @@
+import threading
+import collections
+
+
+class ResourceBudget:
+    """
+    Token budgets of the resources shared by the tasks of a manager, e.g. {"db": 4, "api": 10}.
+    A holder takes all of its tokens at once or waits in one FIFO queue. A waiter is only passed by later waiters
+    which need none of its resources, so no run starves and runs on other resources are not held up.
+    """
+
+    def __init__(self) -> None:
+        self._capacity_dict = {}
+        self._available_dict = {}
+        # holder -> demand of the holders owning tokens, and (holder, demand) of the waiters, earliest first
+        self._held_dict = {}
+        self._waiters = collections.deque()
+        # resource name -> number of waiters which need it
+        self._waiting_counts = {}
+        self._lock = threading.Lock()
+
+    @property
+    def resource_names(self):
+        return list(self._capacity_dict)
+
+    @property
+    def waiting_count(self):
+        return len(self._waiters)
+
+    def capacity(self, resource_name):
+        return self._capacity_dict[resource_name]
+
+    def add_resource(self, resource_name, capacity):
+        if not isinstance(resource_name, str):
+            raise ValueError("resource_name must be string")
+        if not isinstance(capacity, int) or capacity <= 0:
+            raise ValueError("capacity must be positive int")
+        with self._lock:
+            if resource_name in self._capacity_dict:
+                raise ValueError(f"resource {resource_name} already exists")
+            self._capacity_dict[resource_name] = capacity
+            self._available_dict[resource_name] = capacity
+            self._waiting_counts[resource_name] = 0
+
+    def acquire(self, holder, demand):
+        """Takes the tokens of demand {resource_name: tokens} for holder, returns False if the holder has to wait."""
+        with self._lock:
+            if self._is_free(demand, blocked_resources=None):
+                self._take(holder, demand)
+                return True
+            self._waiters.append((holder, demand))
+            for resource_name in demand:
+                self._waiting_counts[resource_name] += 1
+            return False
+
+    def release(self, holder):
+        """Gives back the tokens of holder, or drops it from the queue. Returns the waiters which got their tokens, in order."""
+        with self._lock:
+            demand = self._held_dict.pop(holder, None)
+            if demand is None:
+                self._drop_waiter(holder)
+                return []
+            for resource_name, tokens in demand.items():
+                self._available_dict[resource_name] += tokens
+            return self._grant_waiters()
+
+    def snapshot(self):
+        """Returns {resource_name: {"capacity", "available", "waiting"}}."""
+        with self._lock:
+            return {resource_name: {"capacity": capacity, "available": self._available_dict[resource_name],
+                                    "waiting": self._waiting_counts[resource_name]}
+                    for resource_name, capacity in self._capacity_dict.items()}
+
+    def _is_free(self, demand, blocked_resources):
+        # an earlier waiter on any of the resources goes first
+        for resource_name, tokens in demand.items():
+            if blocked_resources is None:
+                if self._waiting_counts[resource_name] > 0:
+                    return False
+            elif resource_name in blocked_resources:
+                return False
+            if self._available_dict[resource_name] < tokens:
+                return False
+        return True
+
+    def _take(self, holder, demand):
+        for resource_name, tokens in demand.items():
+            self._available_dict[resource_name] -= tokens
+        self._held_dict[holder] = demand
+
+    def _grant_waiters(self):
+        granted_holders = []
+        blocked_resources = set()
+        remaining_waiters = collections.deque()
+        for holder, demand in self._waiters:
+            if self._is_free(demand, blocked_resources):
+                self._take(holder, demand)
+                for resource_name in demand:
+                    self._waiting_counts[resource_name] -= 1
+                granted_holders.append(holder)
+            else:
+                blocked_resources.update(demand)
+                remaining_waiters.append((holder, demand))
+        self._waiters = remaining_waiters
+        return granted_holders
+
+    def _drop_waiter(self, holder):
+        for index, (waiter, demand) in enumerate(self._waiters):
+            if waiter is holder:
+                del self._waiters[index]
+                for resource_name in demand:
+                    self._waiting_counts[resource_name] -= 1
+                return
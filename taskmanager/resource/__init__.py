@@ -0,0 +1 @@
+from .ResourceBudget import ResourceBudget
\ No newline at end of file
@@ -0,0 +1,8 @@
+from enum import Enum
+
+class OverflowPolicy(Enum):
+    """What a subscription does with a record which is published while its buffer is full."""
+
+    DROP_OLDEST = "drop_oldest"   # drop the oldest buffered record
+    BLOCK = "block"               # wait up to block_timeout for the subscriber, then drop the oldest record
+    SAMPLE = "sample"             # keep one of every sample_every overflowing records, in place of the oldest
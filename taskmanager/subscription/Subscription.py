@@ -0,0 +1,194 @@
+import asyncio
+import threading
+import collections
+
+from .OverflowPolicy import OverflowPolicy
+
+
+class Subscription:
+    """
+    Bounded ring buffer of the RunRecords, with result_args, of the runs reported by a manager.
+    Records are read with get, by iterating, which blocks until the subscription is closed, or with async for.
+    With a callback the records are read on a thread of the subscription, so a slow callback never stalls the manager.
+    task_name None subscribes to every task. on_close is called with the subscription once it is closed.
+    """
+
+    def __init__(self, task_name=None, capacity=1024, overflow_policy=OverflowPolicy.DROP_OLDEST, callback=None,
+                 block_timeout=1, sample_every=10, on_close=None) -> None:
+
+        if not isinstance(capacity, int) or capacity <= 0:
+            raise ValueError("capacity must be positive int")
+        try:
+            overflow_policy = OverflowPolicy(overflow_policy)
+        except ValueError:
+            raise ValueError(f"overflow_policy {overflow_policy} is not supported")
+        if not isinstance(block_timeout, (int, float)) or block_timeout < 0:
+            raise ValueError("block_timeout must be non-negative number")
+        if not isinstance(sample_every, int) or sample_every <= 0:
+            raise ValueError("sample_every must be positive int")
+        if callback is not None and not callable(callback):
+            raise ValueError("callback must be callable")
+        if on_close is not None and not callable(on_close):
+            raise ValueError("on_close must be callable")
+
+        self._task_name = task_name
+        self._capacity = capacity
+        self._overflow_policy = overflow_policy
+        self._block_timeout = block_timeout
+        self._sample_every = sample_every
+
+        self._buffer = collections.deque()
+        self._condition = threading.Condition()
+        # (loop, future) of the async readers waiting for a record
+        self._async_waiters = []
+        self._is_closed = False
+        # called once on close, the manager uses it to unsubscribe
+        self._on_close = on_close
+
+        self._published_count = 0
+        self._dropped_count = 0
+        self._overflow_count = 0
+        self._callback_error_count = 0
+
+        self._callback = callback
+        if callback is not None:
+            threading.Thread(target=self._dispatch, name=f"subscription-{task_name or 'all'}", daemon=True).start()
+
+    @property
+    def task_name(self):
+        return self._task_name
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @property
+    def overflow_policy(self):
+        return self._overflow_policy
+
+    @property
+    def is_closed(self):
+        return self._is_closed
+
+    @property
+    def size(self):
+        return len(self._buffer)
+
+    @property
+    def published_count(self):
+        return self._published_count
+
+    @property
+    def dropped_count(self):
+        return self._dropped_count
+
+    @property
+    def callback_error_count(self):
+        return self._callback_error_count
+
+    def publish(self, record):
+        """Adds a record, called by the manager loop. Returns False if the record is dropped."""
+        with self._condition:
+            if self._is_closed:
+                return False
+            self._published_count += 1
+            if len(self._buffer) >= self._capacity and not self._make_room():
+                self._dropped_count += 1
+                return False
+            self._buffer.append(record)
+            self._condition.notify_all()
+            async_waiters, self._async_waiters = self._async_waiters, []
+
+        self._wake_async_waiters(async_waiters)
+        return True
+
+    def get(self, timeout=None):
+        """Returns the oldest record, None if there is none within timeout seconds or the subscription is closed and empty."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._buffer or self._is_closed, timeout)
+            if not self._buffer:
+                return None
+            record = self._buffer.popleft()
+            # a publisher may be blocked on the full buffer
+            self._condition.notify_all()
+            return record
+
+    def close(self):
+        """Stops the subscription, the buffered records can still be read."""
+        with self._condition:
+            if self._is_closed:
+                return
+            self._is_closed = True
+            self._condition.notify_all()
+            async_waiters, self._async_waiters = self._async_waiters, []
+
+        self._wake_async_waiters(async_waiters)
+        if self._on_close is not None:
+            self._on_close(self)
+
+    def __iter__(self):
+        while True:
+            record = self.get()
+            if record is None:
+                return
+            yield record
+
+    def __aiter__(self):
+        return self._async_records()
+
+    async def _async_records(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._condition:
+                if self._buffer:
+                    record = self._buffer.popleft()
+                    self._condition.notify_all()
+                elif self._is_closed:
+                    return
+                else:
+                    record = None
+                    future = loop.create_future()
+                    self._async_waiters.append((loop, future))
+
+            if record is None:
+                await future
+                continue
+            yield record
+
+    def _make_room(self):
+        # called with the condition held on a full buffer, returns False if the new record is dropped instead
+        if self._overflow_policy == OverflowPolicy.BLOCK:
+            self._condition.wait_for(lambda: len(self._buffer) < self._capacity or self._is_closed, self._block_timeout)
+            if self._is_closed:
+                return False
+            if len(self._buffer) < self._capacity:
+                return True
+        elif self._overflow_policy == OverflowPolicy.SAMPLE:
+            self._overflow_count += 1
+            if self._overflow_count % self._sample_every != 0:
+                return False
+
+        self._buffer.popleft()
+        self._dropped_count += 1
+        return True
+
+    def _dispatch(self):
+        for record in self:
+            try:
+                self._callback(record)
+            except Exception:
+                self._callback_error_count += 1
+
+    @staticmethod
+    def _wake_async_waiters(async_waiters):
+        for loop, future in async_waiters:
+            try:
+                loop.call_soon_threadsafe(_set_future_done, future)
+            except RuntimeError:
+                # the loop of the reader is closed
+                pass
+
+
+def _set_future_done(future):
+    if not future.done():
+        future.set_result(None)
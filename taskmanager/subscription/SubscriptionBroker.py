@@ -0,0 +1,38 @@
+import threading
+
+
+class SubscriptionBroker:
+    """
+    Routes the reported runs of a manager to the subscriptions of their task and to the subscriptions of every task.
+    The subscription lists are replaced on change, so publish never takes the lock.
+    """
+
+    def __init__(self) -> None:
+        # task name -> tuple of subscriptions, None is every task
+        self._subscription_dict = {}
+        self._lock = threading.Lock()
+
+    @property
+    def has_subscribers(self):
+        return bool(self._subscription_dict)
+
+    def add(self, subscription):
+        with self._lock:
+            subscription_dict = dict(self._subscription_dict)
+            subscription_dict[subscription.task_name] = subscription_dict.get(subscription.task_name, ()) + (subscription,)
+            self._subscription_dict = subscription_dict
+
+    def remove(self, subscription):
+        with self._lock:
+            subscription_dict = dict(self._subscription_dict)
+            subscriptions = tuple(item for item in subscription_dict.get(subscription.task_name, ()) if item is not subscription)
+            if subscriptions:
+                subscription_dict[subscription.task_name] = subscriptions
+            else:
+                subscription_dict.pop(subscription.task_name, None)
+            self._subscription_dict = subscription_dict
+
+    def publish(self, record):
+        subscription_dict = self._subscription_dict
+        for subscription in subscription_dict.get(record.task_name, ()) + subscription_dict.get(None, ()):
+            subscription.publish(record)
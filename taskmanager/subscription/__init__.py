@@ -0,0 +1,3 @@
+from .OverflowPolicy import OverflowPolicy
+from .Subscription import Subscription
+from .SubscriptionBroker import SubscriptionBroker
\ No newline at end of file
@@ -0,0 +1,9 @@
+from enum import Enum
+
+class OverlapPolicy(Enum):
+    """What to do with a run which is due while max_instances runs are still active."""
+
+    SKIP = "skip"           # drop the run
+    QUEUE = "queue"         # keep up to queue_depth runs pending
+    COALESCE = "coalesce"   # keep at most one pending run, later ones merge into it
+    REPLACE = "replace"     # terminate the oldest running instance and start the run after it
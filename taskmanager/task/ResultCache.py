@@ -0,0 +1,89 @@
+import time
+import hashlib
+import threading
+import collections
+
+
+class ResultCache:
+    """
+    Memoized results of a task, keyed by a fingerprint of its inputs. Only true results are cached.
+    key_func is called with the args and kwargs of the task, by default the key is a digest of their repr,
+    so a task with fixed arguments reruns only once its cached result is older than ttl seconds.
+    The least recently used result is evicted once max_size results are cached, ttl None never expires a result.
+    """
+
+    def __init__(self, ttl=None, max_size=128, key_func=None) -> None:
+
+        if ttl is not None and (not isinstance(ttl, (int, float)) or ttl <= 0):
+            raise ValueError("cache_ttl must be positive number")
+        if not isinstance(max_size, int) or max_size <= 0:
+            raise ValueError("cache_size must be positive int")
+        if key_func is not None and not callable(key_func):
+            raise ValueError("cache_key must be callable")
+
+        self._ttl = ttl
+        self._max_size = max_size
+        self._key_func = key_func
+
+        # key -> (expire time.monotonic() or None, result_bool, result_msg, result_args), least recently used first
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+        self._hit_count = 0
+        self._miss_count = 0
+        self._eviction_count = 0
+
+    @property
+    def size(self):
+        return len(self._entries)
+
+    @property
+    def hit_count(self):
+        return self._hit_count
+
+    @property
+    def miss_count(self):
+        return self._miss_count
+
+    @property
+    def eviction_count(self):
+        return self._eviction_count
+
+    def make_key(self, args, kwargs):
+        if self._key_func is not None:
+            return self._key_func(*args, **kwargs)
+        return hashlib.blake2b(repr((args, sorted(kwargs.items()))).encode(), digest_size=16).digest()
+
+    def get(self, key):
+        """Returns (result_bool, result_msg, result_args) of the key, None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                self._eviction_count += 1
+                entry = None
+            if entry is None:
+                self._miss_count += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hit_count += 1
+            # the run gets its own list, so the cached one is never changed
+            return entry[1], entry[2], list(entry[3])
+
+    def put(self, key, result_bool, result_msg, result_args):
+        if not result_bool:
+            return
+        expire_time = time.monotonic() + self._ttl if self._ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expire_time, result_bool, result_msg, list(result_args))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+                self._eviction_count += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self):
+        return {"hits": self._hit_count, "misses": self._miss_count, "evictions": self._eviction_count, "size": len(self._entries)}
@@ -1,158 +1,281 @@
-import threading
+import time
 
 from .TaskConfig import TaskConfig
-from .TaskState import TaskState
-from .TaskTimer import TaskTimer
-from .TaskResult import TaskResult
-from .TaskTerminator import TaskTerminator
+from .TaskRun import TaskRun
+from .ResultCache import ResultCache
+from .OverlapPolicy import OverlapPolicy
 
 from ..logutil import Logger
+from ..executor import ThreadWorkerPool, AsyncioWorkerPool
 
 
 class Task:
+    __slots__ = ("_log_title", "_task_name", "_logger", "_config", "_completion_queue", "_deadline_tracker", "_metrics", "_result_cache",
+                 "_resource_budget", "_executor", "_timeout", "_terminate_limit", "_max_instances", "_overlap_policy", "_queue_depth",
+                 "_active_runs", "_free_runs", "_pending_count", "_run_seq", "_is_retired",
+                 "_dropped_count", "_queued_count", "_coalesced_count", "_replaced_count")
 
-    def __init__(self, config:TaskConfig, task_name:str, logger:Logger) -> None:
-        
-        self._current_state = TaskState.INIT
+    def __init__(self, config:TaskConfig, task_name:str, logger:Logger, completion_queue=None, executor=None, deadline_tracker=None,
+                 metrics=None, resource_budget=None) -> None:
 
         self._log_title = f"[{self.__class__.__name__}][{task_name}]"
         self._task_name = task_name
         self._logger = logger
         self._config = config
 
+        # CompletionQueue of the manager, every state transition of a run is published to it
+        self._completion_queue = completion_queue
+
+        # DeadlineHeap of the manager, the pending timeout or kill deadline of a run is kept in it
+        self._deadline_tracker = deadline_tracker
+
+        # TaskMetrics of the task, None means the runs are not measured
+        self._metrics = metrics
+
+        # memoized results, None means every run calls the task function
+        self._result_cache = ResultCache(config.cache_ttl, config.cache_size, config.cache_key) if config.cache else None
+
+        # ResourceBudget of the manager, None means the runs hold no resource tokens
+        self._resource_budget = resource_budget if config.resources else None
+
+        # worker pool which runs the task, a private unbounded pool is used if none is given
+        if executor is None:
+            executor = AsyncioWorkerPool(task_name) if config.is_coroutine else ThreadWorkerPool(task_name)
+        self._executor = executor
+
         # set task related params
-        self._task_func = config.task_func
         self._timeout = config.timeout
-        self._args = config.args
-        self._kwargs = config.kwargs
         self._terminate_limit = config.terminate_limit
+        self._max_instances = config.max_instances
+        self._overlap_policy = config.overlap_policy
+        self._queue_depth = config.queue_depth
+
+        # run instances which are not reported yet, a killed run keeps its slot
+        self._active_runs = []
+        # reported runs whose worker is done, they are reset and reused instead of allocating new ones
+        self._free_runs = []
+        self._pending_count = 0
+        self._run_seq = 0
+        # a retired task is removed from its manager, it starts no new runs and its active runs drain
+        self._is_retired = False
+
+        # overlap counters
+        self._dropped_count = 0
+        self._queued_count = 0
+        self._coalesced_count = 0
+        self._replaced_count = 0
 
-        self.init_basic_params()
+    def _state_checker(self, checker):
+        return any(checker(task_run) for task_run in self._active_runs)
 
-    def _state_checker(self, state):
-        return self._current_state == state
-    
-    # state check
+    # state check, true if any active run is in the state
     @property
     def is_init(self):
-        return self._state_checker(TaskState.INIT)
-    
+        return not self._active_runs
+
     @property
     def is_running(self):
-        return self._state_checker(TaskState.RUNNING)
-    
-    @property
-    def is_done(self):
-        return self._state_checker(TaskState.DONE)
-    
+        return self._state_checker(lambda task_run: task_run.is_running)
+
     @property
     def is_terminating(self):
-        return self._state_checker(TaskState.TERMINATING)
-    
-    @property
-    def is_terminated(self):
-        return self._state_checker(TaskState.TERMINATED)
-    
+        return self._state_checker(lambda task_run: task_run.is_terminating)
+
     @property
     def is_killed(self):
-        return self._state_checker(TaskState.KILLED)
-
-    def init_basic_params(self):
+        return self._state_checker(lambda task_run: task_run.is_killed)
 
-         # empty task thread
-        self._task_thread = None
+    @property
+    def is_leaked(self):
+        return self._state_checker(lambda task_run: task_run.is_leaked)
 
-        self._result_manager = TaskResult()
-        self._task_timer = TaskTimer(self._timeout)
-        self._terminator = TaskTerminator(self, self._terminate_limit, self._logger)
+    @property
+    def is_waiting(self):
+        return self._state_checker(lambda task_run: task_run.is_waiting)
 
     @property
     def task_name(self):
         return self._task_name
-    
+
     @property
-    def task_thread(self):
-        return self._task_thread
-    
-    # =========================================== State Change Functions =========================================
+    def config(self):
+        return self._config
 
-    def init(self):
-        if self.is_done or self.is_terminated:
-            self._current_state = TaskState.INIT
-            self.init_basic_params()
+    @property
+    def logger(self):
+        return self._logger
 
-    def run(self):
-        if self.is_init:
-            self._current_state = TaskState.RUNNING
-            self._task_timer.timer_start()
+    @property
+    def timeout(self):
+        return self._timeout
 
-            try:
-                self._task_thread = threading.Thread(target=self._task_wrapper)
-                self._task_thread.start()        
-            except Exception as msg:
-                raise(Exception(f"{self._log_title} run task thread failed: {str(msg)}"))
-
-    def finish(self):
-        if self.is_running:
-            self._current_state = TaskState.DONE
-            self._task_timer.timer_stop()
-    
-    def terminate(self):
-        if self.is_running:
-            self._current_state = TaskState.TERMINATING
-            self._terminator.terminate()
-
-    def set_terminating_reslt(self):
-        if self.is_terminating:
-            if self._terminator.is_force_kill:
-                self._current_state = TaskState.KILLED
-                _result_msg = Exception(f"task is killed due timeout and it is force killed")
-            else:
-                self._current_state = TaskState.TERMINATED   
-                _result_msg = Exception(f"task is killed due timeout and it is terminated correctly")           
+    @property
+    def terminate_limit(self):
+        return self._terminate_limit
 
-            _result_bool = False
-            _result_args = []
+    @property
+    def executor(self):
+        return self._executor
 
-            self._result_manager.insert_result(_result_bool, _result_msg, _result_args)
-            self._task_timer.timer_stop()
+    @property
+    def completion_queue(self):
+        return self._completion_queue
 
     @property
-    def is_timeout(self):
-        return self._task_timer.is_timeout
+    def deadline_tracker(self):
+        return self._deadline_tracker
 
     @property
-    def is_finish_terminating(self):
-        if self.is_terminating:
-            return self._terminator.is_finish_terminating
-        return False
-    
-    # ======================================================================================================================
+    def metrics(self):
+        return self._metrics
 
-    def take_report(self):
-        result_bool, result_msg, result_args = self._result_manager.take_report()
-        start_datetime, finish_datetime, running_time = self._task_timer.time_report()
-        task_status = self._current_state.value
+    @property
+    def result_cache(self):
+        return self._result_cache
 
-        if not self.is_killed:
-            self.init()
+    @property
+    def resource_budget(self):
+        return self._resource_budget
 
-        return result_bool, result_msg, result_args, task_status, start_datetime, finish_datetime, running_time
+    @property
+    def active_runs(self):
+        return list(self._active_runs)
+
+    @property
+    def pending_count(self):
+        return self._pending_count
 
-    def _task_wrapper(self):
+    @property
+    def is_retired(self):
+        return self._is_retired
+
+    @property
+    def dropped_count(self):
+        return self._dropped_count
+
+    @property
+    def queued_count(self):
+        return self._queued_count
+
+    @property
+    def coalesced_count(self):
+        return self._coalesced_count
+
+    @property
+    def replaced_count(self):
+        return self._replaced_count
+
+    # =========================================== State Change Functions =========================================
+
+    def run(self, due_time=None):
+        # due_time is the time.monotonic_ns() value the run was scheduled at
+        if self._is_retired:
+            return
+        if due_time is not None and self._metrics is not None:
+            self._metrics.schedule_lag.observe(max(0, time.monotonic_ns() - due_time) / 1_000_000_000)
+
+        if len(self._active_runs) < self._max_instances:
+            self._start_run()
+        else:
+            self._handle_overlap()
+
+    def release_run(self, task_run):
+        """Called when a run is reported, frees its slot unless it is killed or leaked and starts pending runs."""
+        # a leaked worker may still use its resources, its tokens are given back once it finishes
+        if not task_run.is_leaked:
+            self._release_resources(task_run)
+        if task_run.is_killed or task_run.is_leaked or task_run not in self._active_runs:
+            return
+        self._free_slot(task_run)
+
+    def release_leaked_run(self, task_run):
+        """Called when the worker of a reported leaked run has finished at last, frees its slot."""
+        if task_run.is_leaked and task_run in self._active_runs:
+            self._release_resources(task_run)
+            self._free_slot(task_run)
+
+    def start_granted_run(self, task_run):
+        """Called when a run waiting in the resource queue got its tokens, starts it on the worker pool."""
+        task_run.grant_resources()
+        if self._is_retired:
+            self._active_runs.remove(task_run)
+            self._release_resources(task_run)
+            return
         try:
-            terminate_event = self._terminator.terminate_event
-            result_bool, result_msg, *result_args = self._task_func(terminate_event, *self._args, **self._kwargs)
-        except Exception as msg:
-            result_bool = False
-            result_msg = msg
-            result_args = []
-
-        if self._terminator.is_terminate:
+            self._launch_run(task_run)
+        except Exception as err:
+            self._logger.critical(f"{self._log_title} start granted run failed: {str(err)}")
+
+    def _release_resources(self, task_run):
+        if self._resource_budget is None:
             return
+        # the freed tokens may start waiting runs of any task, in queue order
+        for granted_run in self._resource_budget.release(task_run):
+            granted_run.task.start_granted_run(granted_run)
+
+    def _free_slot(self, task_run):
+        self._active_runs.remove(task_run)
+        if task_run.is_worker_done and len(self._free_runs) < self._max_instances:
+            self._free_runs.append(task_run)
+
+        if self._is_retired:
+            self._pending_count = 0
 
-        self._result_manager.insert_result(result_bool, result_msg, result_args)
-        self.finish()
+        while self._pending_count > 0 and len(self._active_runs) < self._max_instances:
+            self._pending_count -= 1
+            try:
+                self._start_run()
+            except Exception as err:
+                self._logger.critical(f"{self._log_title} start pending run failed: {str(err)}")
+
+    def retire(self):
+        """Stops new runs of the task, the pending runs are dropped when an active run is released."""
+        self._is_retired = True
 
+    def _start_run(self):
+        self._run_seq += 1
+        if self._free_runs:
+            task_run = self._free_runs.pop()
+            task_run.reset(self._run_seq)
+        else:
+            task_run = TaskRun(self, self._run_seq)
+        self._active_runs.append(task_run)
+        if self._resource_budget is not None:
+            # the run keeps its slot while it waits, its timeout starts once it has the tokens
+            task_run.wait_for_resources()
+            if not self._resource_budget.acquire(task_run, self._config.resources):
+                return
+            task_run.grant_resources()
+        self._launch_run(task_run)
+
+    def _launch_run(self, task_run):
+        try:
+            task_run.run()
+        except Exception:
+            self._active_runs.remove(task_run)
+            self._release_resources(task_run)
+            raise
+
+    def _handle_overlap(self):
+        if self._overlap_policy == OverlapPolicy.QUEUE:
+            if self._pending_count < self._queue_depth:
+                self._pending_count += 1
+                self._queued_count += 1
+                return
+        elif self._overlap_policy == OverlapPolicy.COALESCE:
+            if self._pending_count == 0:
+                self._pending_count = 1
+                self._queued_count += 1
+            else:
+                self._coalesced_count += 1
+            return
+        elif self._overlap_policy == OverlapPolicy.REPLACE:
+            running_runs = [task_run for task_run in self._active_runs if task_run.is_running]
+            if running_runs:
+                running_runs[0].terminate()
+                self._pending_count = 1
+                self._replaced_count += 1
+                return
 
-    
+        self._dropped_count += 1
+        self._logger.warning(f"{self._log_title} run is dropped by overlap policy {self._overlap_policy.value}, dropped count: {self._dropped_count}")
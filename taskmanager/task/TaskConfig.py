@@ -1,11 +1,54 @@
 import inspect
 
+from .OverlapPolicy import OverlapPolicy
+
 class TaskConfig:
-    def __init__(self, task_func, timeout, args=(), kwargs={}, terminate_limit=30*60) -> None:
+    def __init__(self, task_func, timeout, args=(), kwargs={}, terminate_limit=30*60, executor_name="default",
+                 max_instances=1, overlap_policy=OverlapPolicy.SKIP, queue_depth=1, cache=False, cache_ttl=None, cache_size=128,
+                 cache_key=None, resources=None) -> None:
         self.task_func = task_func
         self.timeout = timeout
         self.args = args
         self.kwargs = kwargs
         self.terminate_limit = terminate_limit
-        if not 'terminate_event' in inspect.signature(self.task_func).parameters:
-            raise ValueError("task_func must have terminate_event parameter")
\ No newline at end of file
+        self.executor_name = executor_name
+        self.is_coroutine = inspect.iscoroutinefunction(self.task_func)
+        self.has_terminate_event = 'terminate_event' in inspect.signature(self.task_func).parameters
+        if not self.has_terminate_event and not self.is_coroutine:
+            # coroutines are stopped by cancellation, so only they may leave terminate_event out
+            raise ValueError("task_func must have terminate_event parameter")
+
+        if not isinstance(max_instances, int) or max_instances <= 0:
+            raise ValueError("max_instances must be positive int")
+        if not isinstance(queue_depth, int) or queue_depth <= 0:
+            raise ValueError("queue_depth must be positive int")
+        try:
+            overlap_policy = OverlapPolicy(overlap_policy)
+        except ValueError:
+            raise ValueError(f"overlap_policy {overlap_policy} is not supported")
+        self.max_instances = max_instances
+        self.overlap_policy = overlap_policy
+        self.queue_depth = queue_depth
+
+        # memoization of the results, the cache itself is created by the task
+        # the arguments are fixed, so the default key never changes and a cache without ttl would replay the first result forever
+        if cache and cache_ttl is None and cache_key is None:
+            raise ValueError("cache needs cache_ttl or cache_key")
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.cache_key = cache_key
+
+        # tokens of the shared resources a run holds while it runs, {resource_name: tokens}, a list takes one token of each
+        if resources is None:
+            resources = {}
+        elif isinstance(resources, (list, tuple, set)):
+            resources = {resource_name: 1 for resource_name in resources}
+        if not isinstance(resources, dict):
+            raise ValueError("resources must be dict or list")
+        for resource_name, tokens in resources.items():
+            if not isinstance(resource_name, str):
+                raise ValueError("resource name must be string")
+            if not isinstance(tokens, int) or tokens <= 0:
+                raise ValueError(f"tokens of resource {resource_name} must be positive int")
+        self.resources = dict(resources)
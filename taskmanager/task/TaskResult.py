@@ -1,6 +1,10 @@
 class TaskResult:
+    __slots__ = ("_result_bool", "_result_msg", "_result_args")
 
     def __init__(self) -> None:
+        self.reset()
+
+    def reset(self):
         # result
         self._result_bool = None
         self._result_msg = None
@@ -16,4 +20,4 @@ class TaskResult:
         result_msg = self._result_msg
         result_args = self._result_args
 
-        return result_bool, result_msg, result_args
\ No newline at end of file
+        return result_bool, result_msg, result_args
@@ -0,0 +1,342 @@
+import time
+import asyncio
+import threading
+
+from .TaskState import TaskState
+from .TaskTimer import TaskTimer
+from .TaskResult import TaskResult
+from .TaskTerminator import TaskTerminator
+
+
+class TaskRun:
+    """
+    One run instance of a task, with its own state, timer, result and terminator.
+    A reported run may be reset and reused by the next run of its task, so it must not be referenced after take_report.
+    """
+    __slots__ = ("_task", "_run_id", "_current_state", "_task_thread", "_worker", "_deadline_entry", "_is_worker_done",
+                 "_is_reported", "_submit_time", "_resource_request_time",
+                 "_resource_wait", "_is_cache_hit", "_result_manager", "_task_timer", "_terminator")
+
+    def __init__(self, task, run_id) -> None:
+
+        self._task = task
+        self._result_manager = TaskResult()
+        self._task_timer = TaskTimer(task.timeout)
+        self._terminator = TaskTerminator(self, task.terminate_limit, task.logger)
+        self._reset_state(run_id)
+
+    def reset(self, run_id):
+        """Prepares a reported run, whose worker is done, for the next run of the task."""
+        self._result_manager.reset()
+        self._task_timer.reset()
+        self._terminator.reset()
+        self._reset_state(run_id)
+
+    def _reset_state(self, run_id):
+        self._run_id = run_id
+        self._current_state = TaskState.INIT
+
+        # empty task thread and worker handle of the executor
+        self._task_thread = None
+        self._worker = None
+        self._deadline_entry = None
+        self._is_worker_done = False
+        self._is_reported = False
+        # time.monotonic_ns() of the submit to the executor, for the queue wait
+        self._submit_time = None
+        # time.monotonic_ns() of the request of the resource tokens, and the seconds waited for them, None without resources
+        self._resource_request_time = None
+        self._resource_wait = None
+        # the result is replayed from the result cache of the task
+        self._is_cache_hit = False
+
+    @property
+    def _log_title(self):
+        return f"[{self.__class__.__name__}][{self._task.task_name}][{self._run_id}]"
+
+    def _state_checker(self, state):
+        return self._current_state == state
+
+    def _change_state(self, state):
+        self._current_state = state
+        metrics = self._task.metrics
+        if metrics is not None:
+            metrics.count_state(state)
+
+    # state check
+    @property
+    def is_init(self):
+        return self._state_checker(TaskState.INIT)
+
+    @property
+    def is_running(self):
+        return self._state_checker(TaskState.RUNNING)
+
+    @property
+    def is_done(self):
+        return self._state_checker(TaskState.DONE)
+
+    @property
+    def is_terminating(self):
+        return self._state_checker(TaskState.TERMINATING)
+
+    @property
+    def is_terminated(self):
+        return self._state_checker(TaskState.TERMINATED)
+
+    @property
+    def is_killed(self):
+        return self._state_checker(TaskState.KILLED)
+
+    @property
+    def is_leaked(self):
+        return self._state_checker(TaskState.LEAKED)
+
+    @property
+    def is_waiting(self):
+        """True while the run waits in the resource queue, it is not started on a worker yet."""
+        return self.is_init and self._resource_request_time is not None and self._resource_wait is None
+
+    @property
+    def task(self):
+        return self._task
+
+    @property
+    def task_name(self):
+        return self._task.task_name
+
+    @property
+    def run_id(self):
+        return self._run_id
+
+    @property
+    def executor(self):
+        return self._task.executor
+
+    @property
+    def task_thread(self):
+        return self._task_thread
+
+    @property
+    def worker(self):
+        return self._worker
+
+    @property
+    def is_worker_done(self):
+        return self._is_worker_done
+
+    @property
+    def resource_wait(self):
+        return self._resource_wait
+
+    @property
+    def is_cache_hit(self):
+        return self._is_cache_hit
+
+    @property
+    def is_reported(self):
+        return self._is_reported
+
+    # =========================================== State Change Functions =========================================
+
+    def run(self):
+        if self.is_init:
+            # the worker may report before submit returns, so the run is running already, it is counted once it is submitted
+            self._current_state = TaskState.RUNNING
+            self._task_timer.timer_start()
+            self.track_deadline(self._task_timer.deadline)
+            self._submit_time = time.monotonic_ns()
+
+            try:
+                if self._task.config.is_coroutine:
+                    self.executor.submit(self._async_task_wrapper)
+                else:
+                    self.executor.submit(self._task_wrapper)
+            except Exception as msg:
+                self._current_state = TaskState.INIT
+                self.track_deadline(None)
+                raise Exception(f"{self._log_title} run task thread failed: {str(msg)}") from msg
+            metrics = self._task.metrics
+            if metrics is not None:
+                metrics.count_state(TaskState.RUNNING)
+
+    def wait_for_resources(self):
+        self._resource_request_time = time.monotonic_ns()
+
+    def grant_resources(self):
+        self._resource_wait = (time.monotonic_ns() - self._resource_request_time) / 1_000_000_000
+        metrics = self._task.metrics
+        if metrics is not None:
+            metrics.resource_wait.observe(self._resource_wait)
+
+    def finish(self):
+        if self.is_running:
+            self._change_state(TaskState.DONE)
+            self._task_timer.timer_stop()
+            self.track_deadline(None)
+            self.publish_state_change()
+
+    def terminate(self):
+        if self.is_running:
+            self._change_state(TaskState.TERMINATING)
+            self._terminator.terminate()
+
+    def set_terminating_reslt(self):
+        if self.is_terminating:
+            if self._terminator.is_leaked:
+                self._change_state(TaskState.LEAKED)
+                _result_msg = Exception(f"task is killed due timeout and its worker is leaked after {self._terminator.kill_attempt} force kill attempts")
+            elif self._terminator.is_force_kill:
+                self._change_state(TaskState.KILLED)
+                _result_msg = Exception(f"task is killed due timeout and it is force killed")
+            else:
+                self._change_state(TaskState.TERMINATED)
+                _result_msg = Exception(f"task is killed due timeout and it is terminated correctly")
+
+            _result_bool = False
+            _result_args = []
+
+            self._result_manager.insert_result(_result_bool, _result_msg, _result_args)
+            self._task_timer.timer_stop()
+            self.track_deadline(None)
+            self.publish_state_change()
+
+    def track_deadline(self, deadline):
+        """Replaces the pending deadline of the run, None only cancels it."""
+        deadline_tracker = self._task.deadline_tracker
+        if deadline_tracker is None:
+            return
+        deadline_tracker.cancel(self._deadline_entry)
+        self._deadline_entry = None
+        if deadline is not None:
+            self._deadline_entry = deadline_tracker.add(deadline, self)
+
+    def _observe_queue_wait(self):
+        metrics = self._task.metrics
+        if metrics is not None:
+            metrics.queue_wait.observe((time.monotonic_ns() - self._submit_time) / 1_000_000_000)
+
+    def publish_state_change(self):
+        completion_queue = self._task.completion_queue
+        if completion_queue is not None:
+            completion_queue.put(self)
+
+    @property
+    def is_timeout(self):
+        return self._task_timer.is_timeout
+
+    @property
+    def is_finish_terminating(self):
+        if self.is_terminating:
+            return self._terminator.is_finish_terminating
+        return False
+
+    # ======================================================================================================================
+
+    def take_report(self):
+        result_bool, result_msg, result_args = self._result_manager.take_report()
+        start_datetime, finish_datetime, running_time = self._task_timer.time_report()
+        task_status = self._current_state.value
+        self._is_reported = True
+
+        metrics = self._task.metrics
+        if metrics is not None:
+            metrics.observe_report(running_time, result_bool)
+
+        # frees the instance slot of the task, which may start a pending run
+        self._task.release_run(self)
+
+        return result_bool, result_msg, result_args, task_status, start_datetime, finish_datetime, running_time
+
+    def _lookup_cache(self):
+        # runs on the worker, so a slow key function never holds the manager loop
+        result_cache = self._task.result_cache
+        if result_cache is None:
+            return None, None, None
+        config = self._task.config
+        cache_key = result_cache.make_key(config.args, config.kwargs)
+        cached_result = result_cache.get(cache_key)
+        self._is_cache_hit = cached_result is not None
+        return result_cache, cache_key, cached_result
+
+    def _task_wrapper(self):
+        self._task_thread = threading.current_thread()
+        config = self._task.config
+        try:
+            # the run may be terminated while it is still pending in the pool
+            if self._terminator.is_terminate:
+                return
+            self._observe_queue_wait()
+
+            try:
+                self._worker = self.executor.current_worker()
+                result_cache, cache_key, cached_result = self._lookup_cache()
+                if cached_result is not None:
+                    result_bool, result_msg, result_args = cached_result
+                else:
+                    terminate_event = self._terminator.terminate_event
+                    result_bool, result_msg, *result_args = self.executor.invoke(config.task_func, terminate_event, config.args, config.kwargs)
+                    if result_cache is not None:
+                        result_cache.put(cache_key, result_bool, result_msg, result_args)
+            except Exception as msg:
+                result_bool = False
+                result_msg = msg
+                result_args = []
+
+            if self._terminator.is_terminate:
+                return
+
+            self._result_manager.insert_result(result_bool, result_msg, result_args)
+            self.finish()
+        finally:
+            # the done flag is the last write of the worker, the run may be reused as soon as it is reported
+            is_terminate = self._terminator.is_terminate
+            self._is_worker_done = True
+            # a finished run is published by finish, a terminated one waits for the manager to set its result
+            if is_terminate:
+                self.publish_state_change()
+
+    async def _async_task_wrapper(self):
+        self._task_thread = threading.current_thread()
+        config = self._task.config
+        try:
+            # the run may be terminated while it is still pending on the event loop
+            if self._terminator.is_terminate:
+                return
+            self._observe_queue_wait()
+
+            try:
+                self._worker = self.executor.current_worker()
+                result_cache, cache_key, cached_result = self._lookup_cache()
+                if cached_result is not None:
+                    result_bool, result_msg, result_args = cached_result
+                else:
+                    if config.has_terminate_event:
+                        terminate_event = self._terminator.terminate_event
+                        coroutine = self.executor.invoke(config.task_func, terminate_event, config.args, config.kwargs)
+                    else:
+                        coroutine = config.task_func(*config.args, **config.kwargs)
+                    result_bool, result_msg, *result_args = await coroutine
+                    if result_cache is not None:
+                        result_cache.put(cache_key, result_bool, result_msg, result_args)
+            except asyncio.CancelledError:
+                result_bool = False
+                result_msg = Exception("task is cancelled")
+                result_args = []
+            except Exception as msg:
+                result_bool = False
+                result_msg = msg
+                result_args = []
+
+            if self._terminator.is_terminate:
+                return
+
+            self._result_manager.insert_result(result_bool, result_msg, result_args)
+            self.finish()
+        finally:
+            # the done flag is the last write of the worker, the run may be reused as soon as it is reported
+            is_terminate = self._terminator.is_terminate
+            self._is_worker_done = True
+            # a finished run is published by finish, a terminated one waits for the manager to set its result
+            if is_terminate:
+                self.publish_state_change()
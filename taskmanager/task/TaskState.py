@@ -7,3 +7,4 @@ class TaskState(Enum):
     TERMINATING = 'terminating'
     TERMINATED = 'terminated'
     KILLED = 'killed'     
+    LEAKED = 'leaked'     # the worker survived the kill ladder and still runs
@@ -1,24 +1,43 @@
 import time
-import ctypes, inspect
-import threading
 from threading import Event
 
 from ..logutil import Logger
 
 class TaskTerminator:
+    __slots__ = ("_task_run", "_logger", "_terminate_limit", "_kill_delays", "_leak_grace", "_is_terminate", "_is_force_kill",
+                 "_is_leaked", "_terminate_start_time", "_terminate_event", "_kill_attempt", "_next_kill_time", "_leak_check_time")
 
-    def __init__(self, task, terminate_limit, logger:Logger) -> None:
+    def __init__(self, task_run, terminate_limit, logger:Logger) -> None:
         
-        self._task = task
+        self._task_run = task_run
 
         self._logger = logger
-        self._log_title = f"[{self.__class__.__name__}][{self._task.task_name}]"
+        self._terminate_limit = terminate_limit
+
+        # kill ladder of the executor, each attempt waits its delay after the previous one
+        self._kill_delays = self._task_run.executor.kill_delays
+        # a worker still running this long after the last attempt is leaked
+        self._leak_grace = self._task_run.executor.leak_grace
+
+        self._terminate_event = Event()
+        self.reset()
 
+    def reset(self):
         self._is_terminate = False
         self._is_force_kill = False
+        self._is_leaked = False
         self._terminate_start_time = None
-        self._terminate_limit = terminate_limit
-        self._terminate_event = Event()
+        self._kill_attempt = 0
+        self._next_kill_time = None
+        self._leak_check_time = None
+
+        # a set event may still be watched by code of the terminated run, so it is replaced instead of cleared
+        if self._terminate_event.is_set():
+            self._terminate_event = Event()
+
+    @property
+    def _log_title(self):
+        return f"[{self.__class__.__name__}][{self._task_run.task_name}]"
 
     @property
     def is_terminate(self):
@@ -31,21 +50,38 @@ class TaskTerminator:
     @property
     def is_force_kill(self):
         return self._is_force_kill
+
+    @property
+    def is_leaked(self):
+        return self._is_leaked
+
+    @property
+    def kill_attempt(self):
+        return self._kill_attempt
+
+    @property
+    def next_kill_time(self):
+        """The time.monotonic_ns() value of the next force kill attempt, None if the kill ladder is exhausted."""
+        return self._next_kill_time
     
     @property
     def is_finish_terminating(self):
 
-        if not self._task.task_thread in threading.enumerate():
+        # pooled worker threads outlive the run, so the wrapper marks when it is finished
+        if self._task_run.is_worker_done:
+            return True
+
+        if self._leak_check_time is not None:
+            if time.monotonic_ns() < self._leak_check_time:
+                return False
+            self._leak_task_worker()
             return True
         
-        now_time = time.time()
-        now_running_time = now_time-self._terminate_start_time
-        if now_running_time <= self._terminate_limit:
+        if self._next_kill_time is None or time.monotonic_ns() < self._next_kill_time:
             return False
         
-        if not self._is_force_kill:
-            self._force_kill_task_thread()
-            self._logger.critical(f"{self._log_title} force kill task thread due to terminate event set timeout")
+        self._force_kill_task_thread()
+        self._logger.critical(f"{self._log_title} force kill task worker (attempt {self._kill_attempt}) due to terminate event set timeout")
 
         return False
 
@@ -55,29 +91,42 @@ class TaskTerminator:
     
     def _terminate_task_thread(self): 
         self._terminate_event.set()
-        self._terminate_start_time = time.time()
+        self._terminate_start_time = time.monotonic_ns()
+        self._next_kill_time = self._terminate_start_time + self._to_ns(self._terminate_limit + self._kill_delays[0])
+        self._task_run.track_deadline(self._next_kill_time)
+        self._task_run.publish_state_change()
+        try:
+            self._task_run.executor.terminate_worker(self._task_run.worker)
+        except Exception as err:
+            self._logger.critical(f"{self._log_title} terminate task worker failed: {str(err)}")
 
     def _force_kill_task_thread(self): 
         self._is_force_kill = True
         try:
-            self._async_raise(self._task.task_thread.ident, SystemExit)
+            self._task_run.executor.kill_worker(self._task_run.worker, self._kill_attempt)
+        except Exception as err:
+            self._logger.critical(f"{self._log_title} force kill task worker failed: {str(err)}")
+
+        self._kill_attempt += 1
+        if self._kill_attempt < len(self._kill_delays):
+            self._next_kill_time = time.monotonic_ns() + self._to_ns(self._kill_delays[self._kill_attempt])
+            self._task_run.track_deadline(self._next_kill_time)
+        else:
+            self._next_kill_time = None
+            self._leak_check_time = time.monotonic_ns() + self._to_ns(self._leak_grace)
+            self._task_run.track_deadline(self._leak_check_time)
+
+    def _leak_task_worker(self):
+        # the run is given up, the executor watches the worker until it finishes
+        self._is_leaked = True
+        self._leak_check_time = None
+        self._task_run.track_deadline(None)
+        try:
+            self._task_run.executor.mark_leaked(self._task_run.worker)
         except Exception as err:
-            self._logger.critical(f"{self._log_title} force kill task thread failed: {str(err)}")
+            self._logger.critical(f"{self._log_title} mark task worker leaked failed: {str(err)}")
+        self._logger.critical(f"{self._log_title} task worker is leaked, it still runs after {self._kill_attempt} force kill attempts")
 
     @staticmethod
-    def _async_raise(tid, exctype): 
-        """raises the exception, performs cleanup if needed"""
-        tid = ctypes.c_long(tid) 
-        if not inspect.isclass(exctype): 
-            exctype = type(exctype) 
-        res = ctypes.pythonapi.PyThreadState_SetAsyncExc(tid, ctypes.py_object(exctype)) 
-        if res == 0: 
-            raise ValueError("invalid thread id") 
-        elif res != 1: 
-            """ 
-            if it returns a number greater than one, you’re in 
-            trouble, # and you should call it again with exc=NULL to  
-            revert the effect
-            """
-            ctypes.pythonapi.PyThreadState_SetAsyncExc(tid, None) 
-            raise SystemError("PyThreadState_SetAsyncExc failed") 
\ No newline at end of file
+    def _to_ns(seconds):
+        return round(seconds * 1_000_000_000)
@@ -2,36 +2,43 @@ import time
 import datetime
 
 class TaskTimer:
+    __slots__ = ("_start_wall_time", "_finish_wall_time", "_start_time", "_finish_time", "_timeout_ns", "_deadline")
 
     def __init__(self, timeout) -> None:
-        # running datetime
-        self._start_datetime = None # datetime
-        self._finish_datetime = None # datetime
-
-        # running time
-        self._start_time = None # seconds
-        self._finish_time = None # seconds
-
         # timeout
-        self._timeout = timeout
+        self._timeout_ns = round(timeout * 1_000_000_000)
+        self.reset()
+
+    def reset(self):
+        # running wall clock, time.time_ns(), converted to datetime for reporting only
+        self._start_wall_time = None
+        self._finish_wall_time = None
+
+        # running time, monotonic so clock changes do not affect timing and timeouts
+        self._start_time = None # time.monotonic_ns()
+        self._finish_time = None # time.monotonic_ns()
+        self._deadline = None # time.monotonic_ns()
     
     @property
     def is_timeout(self):
-        now_time = time.time()
-        now_running_time = now_time-self._start_time
-        if now_running_time > self._timeout:
-            return True
-        return False
+        return time.monotonic_ns() > self._deadline
+
+    @property
+    def deadline(self):
+        return self._deadline
 
     def timer_start(self):
-        self._start_datetime = datetime.datetime.now()
-        self._start_time = time.time()
+        self._start_wall_time = time.time_ns()
+        self._start_time = time.monotonic_ns()
+        self._deadline = self._start_time + self._timeout_ns
 
     def timer_stop(self):
-        self._finish_datetime = datetime.datetime.now()
-        self._finish_time = time.time()
+        self._finish_wall_time = time.time_ns()
+        self._finish_time = time.monotonic_ns()
 
     def time_report(self):
-        running_time = self._finish_time - self._start_time
-        return self._start_datetime, self._finish_datetime, running_time
-
+        start_datetime = datetime.datetime.fromtimestamp(self._start_wall_time / 1_000_000_000)
+        finish_datetime = datetime.datetime.fromtimestamp(self._finish_wall_time / 1_000_000_000)
+        # running time in seconds
+        running_time = (self._finish_time - self._start_time) / 1_000_000_000
+        return start_datetime, finish_datetime, running_time
@@ -1,2 +1,6 @@
 from .Task import Task
+from .TaskRun import TaskRun
 from .TaskConfig import TaskConfig
+from .TaskState import TaskState
+from .ResultCache import ResultCache
+from .OverlapPolicy import OverlapPolicy
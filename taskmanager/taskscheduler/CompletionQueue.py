@@ -0,0 +1,42 @@
+import threading
+from collections import deque
+
+
+class CompletionQueue:
+    """
+    Thread-safe queue of tasks whose state has changed, which also wakes up the management loop.
+    Workers put tasks from their own threads, the manager drains them and then waits for the next entry.
+    """
+
+    def __init__(self) -> None:
+        self._items = deque()
+        self._condition = threading.Condition()
+        self._is_wakeup = False
+
+    def __len__(self):
+        with self._condition:
+            return len(self._items)
+
+    def put(self, item):
+        with self._condition:
+            self._items.append(item)
+            self._condition.notify()
+
+    def wakeup(self):
+        """Wakes up the waiting manager without an entry, e.g. when a job is added."""
+        with self._condition:
+            self._is_wakeup = True
+            self._condition.notify()
+
+    def wait(self, timeout=None):
+        """Waits until an entry is put, wakeup is called or timeout seconds pass, None waits without limit."""
+        with self._condition:
+            if not self._items and not self._is_wakeup:
+                self._condition.wait(timeout)
+            self._is_wakeup = False
+
+    def drain(self):
+        with self._condition:
+            items = list(self._items)
+            self._items.clear()
+        return items
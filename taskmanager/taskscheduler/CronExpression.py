@@ -0,0 +1,184 @@
+import datetime
+import calendar
+
+
+MONTH_NAMES = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+WEEKDAY_NAMES = ["sun", "mon", "tue", "wed", "thu", "fri", "sat"]
+
+# a matching day may be up to this many years ahead, e.g. "0 0 29 2 *"
+_MAX_SEARCH_YEARS = 8
+
+
+class CronExpression:
+    """
+    Cron expression compiled once into one bitset per field.
+    Supports "minute hour day-of-month month day-of-week", with an optional leading seconds field,
+    and *, a-b, */n, a-b/n, lists and month/weekday names. Day of week 0 and 7 are sunday.
+    As in cron, if both day fields are restricted a day matches either of them, a field starting with * is not restricted.
+    next_fire only jumps between set bits, so it never scans minute by minute.
+    """
+
+    def __init__(self, expression) -> None:
+
+        if not isinstance(expression, str):
+            raise ValueError("cron expression must be string")
+
+        fields = expression.split()
+        if len(fields) == 5:
+            fields = ["0"] + fields
+        if len(fields) != 6:
+            raise ValueError(f"cron expression must have 5 or 6 fields: {expression}")
+
+        self._expression = expression
+        self._second_mask = self._parse_field(fields[0], 0, 59)
+        self._minute_mask = self._parse_field(fields[1], 0, 59)
+        self._hour_mask = self._parse_field(fields[2], 0, 23)
+        self._day_mask = self._parse_field(fields[3], 1, 31)
+        self._month_mask = self._parse_field(fields[4], 1, 12, MONTH_NAMES, 1)
+        weekday_mask = self._parse_field(fields[5], 0, 7, WEEKDAY_NAMES, 0)
+        # 7 is sunday as well
+        self._weekday_mask = (weekday_mask | (weekday_mask >> 7)) & 0x7F
+
+        # a field starting with * such as */1, or one covering every day, does not restrict the days
+        self._is_day_restricted = not fields[3].startswith("*") and self._day_mask != self._full_mask(1, 31)
+        self._is_weekday_restricted = not fields[5].startswith("*") and self._weekday_mask != self._full_mask(0, 6)
+
+        # weekday pattern repeated over 38 days, shifted by the weekday of the 1st gives the month's day bitset
+        self._weekday_pattern = 0
+        for week in range(6):
+            self._weekday_pattern |= self._weekday_mask << (week * 7)
+
+    def __str__(self):
+        return self._expression
+
+    @property
+    def expression(self):
+        return self._expression
+
+    def next_fire(self, after:datetime.datetime):
+        """Returns the first matching datetime strictly after the given one."""
+        moment = after.replace(microsecond=0) + datetime.timedelta(seconds=1)
+        year, month, day = moment.year, moment.month, moment.day
+        hour, minute, second = moment.hour, moment.minute, moment.second
+
+        while year <= after.year + _MAX_SEARCH_YEARS:
+            next_month = self._next_bit(self._month_mask, month)
+            if next_month is None:
+                year, month, day, hour, minute, second = year + 1, 1, 1, 0, 0, 0
+                continue
+            if next_month != month:
+                month, day, hour, minute, second = next_month, 1, 0, 0, 0
+
+            next_day = self._next_bit(self._month_day_mask(year, month), day)
+            if next_day is None:
+                year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+                day, hour, minute, second = 1, 0, 0, 0
+                continue
+            if next_day != day:
+                day, hour, minute, second = next_day, 0, 0, 0
+
+            next_hour = self._next_bit(self._hour_mask, hour)
+            if next_hour is None:
+                year, month, day = self._next_day(year, month, day)
+                hour, minute, second = 0, 0, 0
+                continue
+            if next_hour != hour:
+                hour, minute, second = next_hour, 0, 0
+
+            next_minute = self._next_bit(self._minute_mask, minute)
+            if next_minute is None:
+                hour, minute, second = hour + 1, 0, 0
+                if hour == 24:
+                    year, month, day = self._next_day(year, month, day)
+                    hour = 0
+                continue
+            if next_minute != minute:
+                minute, second = next_minute, 0
+
+            next_second = self._next_bit(self._second_mask, second)
+            if next_second is None:
+                minute, second = minute + 1, 0
+                if minute == 60:
+                    hour, minute = hour + 1, 0
+                    if hour == 24:
+                        year, month, day = self._next_day(year, month, day)
+                        hour = 0
+                continue
+
+            return datetime.datetime(year, month, day, hour, minute, next_second)
+
+        raise ValueError(f"cron expression never fires: {self._expression}")
+
+    def _month_day_mask(self, year, month):
+        first_weekday, days_in_month = calendar.monthrange(year, month)
+        # calendar counts monday as 0, cron counts sunday as 0; bit 1 is the 1st of the month
+        first_weekday = (first_weekday + 1) % 7
+        weekday_days = (self._weekday_pattern >> first_weekday) << 1
+        month_days = ((1 << days_in_month) - 1) << 1
+
+        if self._is_day_restricted and self._is_weekday_restricted:
+            day_mask = self._day_mask | weekday_days
+        elif self._is_weekday_restricted:
+            day_mask = weekday_days
+        else:
+            day_mask = self._day_mask
+        return day_mask & month_days
+
+    @staticmethod
+    def _next_day(year, month, day):
+        if day < calendar.monthrange(year, month)[1]:
+            return year, month, day + 1
+        if month == 12:
+            return year + 1, 1, 1
+        return year, month + 1, 1
+
+    @staticmethod
+    def _next_bit(mask, value):
+        """The lowest set bit of mask at or above value, None if there is none."""
+        remaining = mask >> value
+        if remaining == 0:
+            return None
+        return value + (remaining & -remaining).bit_length() - 1
+
+    @staticmethod
+    def _full_mask(min_value, max_value):
+        return ((1 << (max_value + 1)) - 1) & ~((1 << min_value) - 1)
+
+    @staticmethod
+    def _parse_field(field, min_value, max_value, names=None, name_offset=0):
+        mask = 0
+        for part in field.split(","):
+            step = None
+            if "/" in part:
+                part, step_str = part.split("/", 1)
+                step = CronExpression._parse_value(step_str, None, 0)
+                if step <= 0:
+                    raise ValueError(f"invalid cron step: {field}")
+
+            if part == "*":
+                start, end = min_value, max_value
+            elif "-" in part:
+                start_str, end_str = part.split("-", 1)
+                start = CronExpression._parse_value(start_str, names, name_offset)
+                end = CronExpression._parse_value(end_str, names, name_offset)
+            else:
+                start = CronExpression._parse_value(part, names, name_offset)
+                # a/n means from a to the end of the range, for any n
+                end = max_value if step is not None else start
+
+            if start < min_value or end > max_value or start > end:
+                raise ValueError(f"invalid cron field: {field}")
+
+            for value in range(start, end + 1, step or 1):
+                mask |= 1 << value
+
+        return mask
+
+    @staticmethod
+    def _parse_value(value_str, names, name_offset):
+        if names is not None and value_str.lower() in names:
+            return names.index(value_str.lower()) + name_offset
+        try:
+            return int(value_str)
+        except ValueError:
+            raise ValueError(f"invalid cron value: {value_str}")
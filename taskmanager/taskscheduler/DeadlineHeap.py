@@ -0,0 +1,73 @@
+import heapq
+import itertools
+import threading
+
+
+class DeadlineHeap:
+    """
+    Thread-safe min-heap of (deadline, item) with lazy cancellation.
+    Adding and cancelling are O(log n), popping touches only the expired entries.
+    Deadlines are time.monotonic_ns() values.
+    """
+
+    # cancelled entries are swept once they are the majority of a heap this large
+    _COMPACT_MIN_SIZE = 64
+
+    def __init__(self) -> None:
+        # entry is [deadline, seq, item, is_active]
+        self._heap = []
+        self._seq = itertools.count()
+        self._cancelled_count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._heap) - self._cancelled_count
+
+    @property
+    def next_deadline(self):
+        """The earliest active deadline, None if the heap is empty."""
+        with self._lock:
+            self._drop_cancelled_head()
+            if not self._heap:
+                return None
+            return self._heap[0][0]
+
+    def add(self, deadline, item):
+        entry = [deadline, next(self._seq), item, True]
+        with self._lock:
+            heapq.heappush(self._heap, entry)
+        return entry
+
+    def cancel(self, entry):
+        if entry is None:
+            return
+        with self._lock:
+            if not entry[3]:
+                return
+            entry[3] = False
+            self._cancelled_count += 1
+            if len(self._heap) >= self._COMPACT_MIN_SIZE and self._cancelled_count * 2 > len(self._heap):
+                self._compact()
+
+    def pop_expired(self, now):
+        """Removes and returns the items whose deadline is not after now, earliest first."""
+        expired_items = []
+        with self._lock:
+            self._drop_cancelled_head()
+            while self._heap and self._heap[0][0] <= now:
+                entry = heapq.heappop(self._heap)
+                entry[3] = False
+                expired_items.append(entry[2])
+                self._drop_cancelled_head()
+        return expired_items
+
+    def _drop_cancelled_head(self):
+        while self._heap and not self._heap[0][3]:
+            heapq.heappop(self._heap)
+            self._cancelled_count -= 1
+
+    def _compact(self):
+        self._heap = [entry for entry in self._heap if entry[3]]
+        heapq.heapify(self._heap)
+        self._cancelled_count = 0
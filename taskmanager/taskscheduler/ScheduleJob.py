@@ -0,0 +1,206 @@
+import abc
+import time
+import random
+import datetime
+
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+NS_PER_SEC = 1_000_000_000
+
+
+class ScheduleJob(abc.ABC):
+    """
+    Base class of a job kept in the scheduler heap. next_run is a time.monotonic_ns() value,
+    None means the job will not run again.
+    offset shifts the phase of the job, jitter adds a deterministic random delay to every run, both in seconds.
+    The task run is called with the due time and the slot time, the wall clock point of the run in epoch seconds,
+    or None if the job has no wall clock points.
+    """
+    __slots__ = ("_task_run", "_next_run", "_last_run", "_offset_ns", "_jitter_ns", "_random", "_is_cancelled", "_is_queued")
+
+    def __init__(self, task_run, offset=0, jitter=0, seed=None) -> None:
+        self._task_run = task_run
+        self._next_run = None
+        self._last_run = None
+        self._offset_ns = round(offset * NS_PER_SEC)
+        self._jitter_ns = round(jitter * NS_PER_SEC)
+        # seeded per task, so the jitter sequence is the same after every restart, only jittered jobs carry the generator
+        self._random = random.Random(seed) if self._jitter_ns > 0 else None
+
+        # a cancelled job stays in the scheduler heap until it reaches the top, is_queued tells if it is in the heap
+        self._is_cancelled = False
+        self._is_queued = False
+
+    @property
+    def next_run(self):
+        return self._next_run
+
+    @property
+    def last_run(self):
+        return self._last_run
+
+    @property
+    def is_cancelled(self):
+        return self._is_cancelled
+
+    @property
+    def slot_time(self):
+        return None
+
+    def run(self):
+        self._last_run = time.monotonic_ns()
+        return self._task_run(self._next_run, self.slot_time)
+
+    @abc.abstractmethod
+    def schedule_next_run(self, now):
+        """Sets next_run from now, a time.monotonic_ns() value."""
+
+    def count_slots(self, since, until, limit):
+        """Counts the due points in [since, until], up to limit, both are datetimes."""
+        return 0
+
+    def _next_jitter(self, symmetric=False):
+        if self._jitter_ns == 0:
+            return 0
+        if symmetric:
+            return self._random.randint(-self._jitter_ns, self._jitter_ns)
+        return self._random.randint(0, self._jitter_ns)
+
+
+class OnceJob(ScheduleJob):
+    """Fires once, delay seconds after it is added."""
+    __slots__ = ()
+
+    def __init__(self, delay, task_run) -> None:
+        super().__init__(task_run, offset=delay)
+
+    def schedule_next_run(self, now):
+        self._next_run = now + self._offset_ns if self._last_run is None else None
+
+
+class IntervalJob(ScheduleJob):
+    """
+    Fixed-delay jobs fire interval after the time they last fired, the jitter is symmetric so the average interval is kept.
+    Fixed-rate jobs fire on the grid anchor + k * interval, so lateness never accumulates;
+    missed grid points are skipped instead of being fired in a burst.
+    The offset delays the first run only, which shifts the phase of every later run.
+    """
+    __slots__ = ("_interval_ns", "_is_fixed_rate", "_anchor", "_last_slot")
+
+    def __init__(self, interval, task_run, fixed_rate=False, offset=0, jitter=0, seed=None) -> None:
+        super().__init__(task_run, offset, jitter, seed)
+        self._interval_ns = round(interval * NS_PER_SEC)
+        self._is_fixed_rate = fixed_rate
+        self._anchor = None
+        self._last_slot = None
+
+    def schedule_next_run(self, now):
+        if not self._is_fixed_rate:
+            if self._last_run is None and self._offset_ns > 0:
+                self._next_run = now + self._offset_ns
+            else:
+                self._next_run = now + self._interval_ns + self._next_jitter(symmetric=True)
+            return
+
+        if self._anchor is None:
+            # the first grid point is the anchor itself when it is offset, one interval later otherwise
+            self._anchor = now + self._offset_ns
+            self._last_slot = self._anchor - self._interval_ns if self._offset_ns > 0 else self._anchor
+
+        # a run delayed by jitter must not fire its own grid point twice
+        after = max(now - self._jitter_ns, self._last_slot)
+        elapsed_intervals = (after - self._anchor) // self._interval_ns
+        self._last_slot = self._anchor + (elapsed_intervals + 1) * self._interval_ns
+        self._next_run = self._last_slot + self._next_jitter()
+
+    def count_slots(self, since, until, limit):
+        if since > until:
+            return 0
+        return min(limit, _timedelta_to_ns(until - since) // self._interval_ns + 1)
+
+
+class CalendarJob(ScheduleJob):
+    """
+    Base class of the jobs which fire at wall clock points.
+    The offset and jitter only delay a point, and a delayed point is never fired twice.
+    """
+    __slots__ = ("_last_slot",)
+
+    def __init__(self, task_run, offset=0, jitter=0, seed=None) -> None:
+        super().__init__(task_run, offset, jitter, seed)
+        self._last_slot = None
+
+    @property
+    def slot_time(self):
+        # the point itself, before the offset and jitter, so it is the same on every manager
+        if self._last_slot is None:
+            return None
+        return self._last_slot.timestamp()
+
+    def schedule_next_run(self, now):
+        now_datetime = datetime.datetime.now()
+        after = now_datetime - datetime.timedelta(microseconds=(self._offset_ns + self._jitter_ns) // 1000)
+        if self._last_slot is not None:
+            after = max(after, self._last_slot)
+        self._last_slot = self._next_slot(after)
+        self._next_run = now + _timedelta_to_ns(self._last_slot - now_datetime) + self._offset_ns + self._next_jitter()
+
+    def count_slots(self, since, until, limit):
+        slot_count = 0
+        # since is a due time, which is its slot delayed by the offset and jitter
+        slot = self._next_slot(since - datetime.timedelta(microseconds=(self._offset_ns + self._jitter_ns) // 1000 + 1))
+        while slot <= until and slot_count < limit:
+            slot_count += 1
+            slot = self._next_slot(slot)
+        return slot_count
+
+    @abc.abstractmethod
+    def _next_slot(self, after):
+        """The first wall clock point strictly after the given datetime."""
+
+
+class TimePointJob(CalendarJob):
+    """
+    One job for every time point of a daily or weekly plan.
+    weekday is None means the time point fires every day.
+    """
+    __slots__ = ("_time_points",)
+
+    def __init__(self, time_points, task_run, offset=0, jitter=0, seed=None) -> None:
+        super().__init__(task_run, offset, jitter, seed)
+        # list of (weekday, hour, minute, second)
+        self._time_points = time_points
+
+    def _next_slot(self, after):
+        return min(self._next_datetime(after, *time_point) for time_point in self._time_points)
+
+    @staticmethod
+    def _next_datetime(now_datetime, weekday, hour, minute, second):
+        candidate = now_datetime.replace(hour=hour, minute=minute, second=second, microsecond=0)
+        if weekday is None:
+            if candidate <= now_datetime:
+                candidate += datetime.timedelta(days=1)
+            return candidate
+
+        days_ahead = (weekday - now_datetime.weekday()) % 7
+        candidate += datetime.timedelta(days=days_ahead)
+        if candidate <= now_datetime:
+            candidate += datetime.timedelta(days=7)
+        return candidate
+
+
+class CronJob(CalendarJob):
+    """One job for a whole cron expression, however many times it matches."""
+    __slots__ = ("_cron_expression",)
+
+    def __init__(self, cron_expression, task_run, offset=0, jitter=0, seed=None) -> None:
+        super().__init__(task_run, offset, jitter, seed)
+        self._cron_expression = cron_expression
+
+    def _next_slot(self, after):
+        return self._cron_expression.next_fire(after)
+
+
+def _timedelta_to_ns(delta):
+    return (delta.days * 86400 + delta.seconds) * NS_PER_SEC + delta.microseconds * 1000
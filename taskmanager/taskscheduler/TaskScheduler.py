@@ -1,65 +1,192 @@
-from schedule import Scheduler
+import time
+import heapq
+import itertools
+import threading
+
+from .ScheduleJob import WEEKDAYS, NS_PER_SEC, OnceJob, IntervalJob, TimePointJob, CronJob
+from .CronExpression import CronExpression
+
 
 class TaskScheduler:
 
     def __init__(self) -> None:
-        
-        self._scehduler = Scheduler()
 
-    def create_interval_schedule(self, interval, task_run):
+        # heap of (next_run, seq, job), seq keeps the ordering stable for equal deadlines
+        self._job_heap = []
+        self._job_seq = itertools.count()
+        self._lock = threading.Lock()
+
+        # cancelled jobs are dropped lazily, and swept once they are the majority of a heap this large
+        self._cancelled_count = 0
+        self._compact_min_size = 64
+
+    def create_once_schedule(self, delay, task_run):
+
+        if delay is None or delay < 0:
+            raise ValueError("delay must be non-negative number")
+
+        if task_run is None:
+            raise ValueError("task must be Task")
+
+        return self._add_job(OnceJob(delay, task_run))
+
+    def create_interval_schedule(self, interval, task_run, fixed_rate=False, offset=0, jitter=0, seed=None):
 
         if interval is None:
-            raise ValueError("interval must be int")
+            raise ValueError("interval must be number")
         if interval <= 0:
-            raise ValueError("interval must be positive int")
-        
+            raise ValueError("interval must be positive")
+        if jitter >= interval:
+            raise ValueError("jitter must be less than interval")
+
         if task_run is None:
             raise ValueError("task must be Task")
 
-        self._scehduler.every(interval).seconds.do(task_run)
+        return self._add_job(IntervalJob(interval, task_run, fixed_rate, offset, jitter, seed))
 
-    def create_daily_schedule(self, time_points, task_run):
+    def create_daily_schedule(self, time_points, task_run, offset=0, jitter=0, seed=None):
 
         if time_points is None:
             raise ValueError("time_points must be list")
         if len(time_points) <= 0:
             raise ValueError("time_points must be positive list")
-        
+
         if task_run is None:
             raise ValueError("task must be Task")
 
-        for time_point in time_points:
-            self._scehduler.every().day.at(time_point).do(task_run)
+        parsed_points = [(None, *self._parse_time_point(time_point)) for time_point in time_points]
+        return self._add_job(TimePointJob(parsed_points, task_run, offset, jitter, seed))
+
+    def create_weekly_schedule(self, weekly_points, task_run, offset=0, jitter=0, seed=None):
 
-    def create_weekly_schedule(self, weekly_points, task_run):
-            
         if weekly_points is None:
             raise ValueError("weekly_points must be dict")
         if len(weekly_points) <= 0:
             raise ValueError("weekly_points must be positive dict")
-        
+
         if task_run is None:
             raise ValueError("task must be Task")
 
+        parsed_points = []
         for weekday in weekly_points:
-            time_points = weekly_points[weekday]
-            for time_point in time_points:
-                if weekday.lower() == 'monday':
-                    self._scehduler.every().monday.at(time_point).do(task_run)
-                elif weekday.lower() == 'tuesday':
-                    self._scehduler.every().tuesday.at(time_point).do(task_run)
-                elif weekday.lower() == 'wednesday':
-                    self._scehduler.every().wednesday.at(time_point).do(task_run)
-                elif weekday.lower() == 'thursday':
-                    self._scehduler.every().thursday.at(time_point).do(task_run)
-                elif weekday.lower() == 'friday':
-                    self._scehduler.every().friday.at(time_point).do(task_run)
-                elif weekday.lower() == 'saturday':
-                    self._scehduler.every().saturday.at(time_point).do(task_run)
-                elif weekday.lower() == 'sunday':
-                    self._scehduler.every().sunday.at(time_point).do(task_run)
-                else:
-                    raise ValueError("weekday must be monday, tuesday, wednesday, thursday, friday, saturday or sunday")
-                
+            if weekday.lower() not in WEEKDAYS:
+                raise ValueError("weekday must be monday, tuesday, wednesday, thursday, friday, saturday or sunday")
+            weekday_index = WEEKDAYS.index(weekday.lower())
+            for time_point in weekly_points[weekday]:
+                parsed_points.append((weekday_index, *self._parse_time_point(time_point)))
+
+        return self._add_job(TimePointJob(parsed_points, task_run, offset, jitter, seed))
+
+    def create_cron_schedule(self, cron_expression, task_run, offset=0, jitter=0, seed=None):
+
+        if not isinstance(cron_expression, CronExpression):
+            raise ValueError("cron_expression must be CronExpression")
+
+        if task_run is None:
+            raise ValueError("task must be Task")
+
+        return self._add_job(CronJob(cron_expression, task_run, offset, jitter, seed))
+
+    def cancel_job(self, job):
+        """Removes the job from the schedule in O(log n) amortized, a job which is running now is not rescheduled."""
+        with self._lock:
+            if job.is_cancelled:
+                return
+            job._is_cancelled = True
+            if not job._is_queued:
+                return
+            self._cancelled_count += 1
+            if len(self._job_heap) >= self._compact_min_size and self._cancelled_count * 2 > len(self._job_heap):
+                self._compact()
+
+    @property
+    def job_count(self):
+        with self._lock:
+            return len(self._job_heap) - self._cancelled_count
+
+    @property
+    def next_run_time(self):
+        """The time.monotonic_ns() value of the earliest job, None if there is no job."""
+        with self._lock:
+            self._drop_cancelled_head()
+            if not self._job_heap:
+                return None
+            return self._job_heap[0][0]
+
+    @property
+    def idle_seconds(self):
+        next_run_time = self.next_run_time
+        if next_run_time is None:
+            return None
+        return max(0, next_run_time - time.monotonic_ns()) / NS_PER_SEC
+
     def run_pending(self):
-        self._scehduler.run_pending()
\ No newline at end of file
+        now = time.monotonic_ns()
+
+        # pop every due job first, so jobs are never run while holding the lock
+        due_jobs = []
+        with self._lock:
+            self._drop_cancelled_head()
+            while self._job_heap and self._job_heap[0][0] <= now:
+                job = heapq.heappop(self._job_heap)[2]
+                job._is_queued = False
+                due_jobs.append(job)
+                self._drop_cancelled_head()
+
+        errors = []
+        for job in due_jobs:
+            # the job may be cancelled by another thread after it was popped
+            if job.is_cancelled:
+                continue
+            try:
+                job.run()
+            except Exception as err:
+                errors.append(str(err))
+            finally:
+                self._push_job(job, time.monotonic_ns())
+
+        if errors:
+            raise Exception(f"run pending jobs failed: {'; '.join(errors)}")
+
+    def _add_job(self, job):
+        self._push_job(job, time.monotonic_ns())
+        return job
+
+    def _push_job(self, job, now):
+        job.schedule_next_run(now)
+        if job.next_run is None:
+            return
+        with self._lock:
+            if job.is_cancelled:
+                return
+            job._is_queued = True
+            heapq.heappush(self._job_heap, (job.next_run, next(self._job_seq), job))
+
+    def _drop_cancelled_head(self):
+        while self._job_heap and self._job_heap[0][2].is_cancelled:
+            heapq.heappop(self._job_heap)[2]._is_queued = False
+            self._cancelled_count -= 1
+
+    def _compact(self):
+        for _, _, job in self._job_heap:
+            if job.is_cancelled:
+                job._is_queued = False
+        self._job_heap = [entry for entry in self._job_heap if not entry[2].is_cancelled]
+        heapq.heapify(self._job_heap)
+        self._cancelled_count = 0
+
+    @staticmethod
+    def _parse_time_point(time_point):
+        # HH:MM or HH:MM:SS
+        try:
+            parts = list(map(int, time_point.split(":")))
+        except Exception:
+            raise ValueError(f"Invalid time format: {time_point}")
+        if len(parts) == 2:
+            parts.append(0)
+        if len(parts) != 3:
+            raise ValueError(f"Invalid time format: {time_point}")
+        hour, minute, second = parts
+        if not (0 <= hour < 24 and 0 <= minute < 60 and 0 <= second < 60):
+            raise ValueError(f"Invalid time format: {time_point}")
+        return hour, minute, second
@@ -1 +1,4 @@
-from .TaskScheduler import TaskScheduler
\ No newline at end of file
+from .TaskScheduler import TaskScheduler
+from .DeadlineHeap import DeadlineHeap
+from .CompletionQueue import CompletionQueue
+from .CronExpression import CronExpression
\ No newline at end of file
@@ -0,0 +1,111 @@
+from .WorkflowRun import WorkflowRun
+
+
+class Workflow:
+    """
+    A DAG of task functions which runs as one unit on the time plan given to Manager.add_workflow.
+    A node starts as soon as all of its upstream nodes are done with a true result, so independent branches run concurrently.
+    Every node runs as a task with its own timeout, a failed node fails all of its downstream nodes.
+    """
+
+    def __init__(self, workflow_name:str) -> None:
+
+        if not isinstance(workflow_name, str) or not workflow_name:
+            raise ValueError("workflow_name must be non-empty string")
+
+        self._workflow_name = workflow_name
+        # node name -> (task_func, timeout, args, kwargs, executor)
+        self._node_dict = {}
+        # node name -> tuple of upstream node names, and the reverse edges
+        self._upstream_dict = {}
+        self._downstream_dict = {}
+
+        # one run at a time, a run which is due while the previous one is active is skipped
+        self._run_seq = 0
+        self._active_run = None
+        self._last_report = None
+        self._skipped_count = 0
+
+    @property
+    def workflow_name(self):
+        return self._workflow_name
+
+    @property
+    def node_names(self):
+        return list(self._node_dict)
+
+    @property
+    def active_run(self):
+        return self._active_run
+
+    @property
+    def last_report(self):
+        return self._last_report
+
+    @property
+    def skipped_count(self):
+        return self._skipped_count
+
+    def node(self, node_name):
+        return self._node_dict[node_name]
+
+    def upstreams(self, node_name):
+        return self._upstream_dict[node_name]
+
+    def downstreams(self, node_name):
+        return self._downstream_dict[node_name]
+
+    def node_task_name(self, node_name):
+        """The name of the task which runs the node, as it appears in the logs, the metrics and the run ledger."""
+        return f"{self._workflow_name}.{node_name}"
+
+    def add_node(self, node_name:str, task_func, timeout:int, *args, depends_on=None, executor="default", **kwargs):
+        """
+        Adds a node to the workflow, its upstream nodes must be added first.
+
+        Parameters:
+        - node_name (str): The name of the node, unique in the workflow.
+        - task_func (callable): The function that implements the node, see Manager.add_task.
+        - timeout (int): Maximum allowed runtime for the node in seconds.
+        - args (tuple, optional): Positional arguments to pass to task_func.
+        - depends_on (list, optional): The names of the upstream nodes.
+        - executor (str, optional): The name of the worker pool which runs the node.
+        - kwargs (dict, optional): Keyword arguments to pass to task_func.
+        Returns:
+        Workflow: the workflow itself, so nodes can be chained.
+        """
+
+        if not isinstance(node_name, str) or not node_name:
+            raise ValueError("node_name must be non-empty string")
+        if node_name in self._node_dict:
+            raise ValueError(f"node {node_name} already exists")
+
+        upstreams = tuple(depends_on or ())
+        for upstream in upstreams:
+            if upstream not in self._node_dict:
+                raise ValueError(f"upstream node {upstream} of node {node_name} does not exist")
+        if len(set(upstreams)) != len(upstreams):
+            raise ValueError(f"node {node_name} depends on a node twice")
+
+        # upstreams must exist already, so the graph can never have a cycle
+        self._node_dict[node_name] = (task_func, timeout, args, kwargs, executor)
+        self._upstream_dict[node_name] = upstreams
+        self._downstream_dict[node_name] = []
+        for upstream in upstreams:
+            self._downstream_dict[upstream].append(node_name)
+        return self
+
+    def start_run(self):
+        """Starts a new run, None if the previous run is still active."""
+        if self._active_run is not None:
+            self._skipped_count += 1
+            return None
+        self._run_seq += 1
+        self._active_run = WorkflowRun(self, self._run_seq)
+        return self._active_run
+
+    def finish_run(self):
+        """Ends the active run and keeps its report."""
+        self._last_report = self._active_run.report()
+        self._active_run = None
+        return self._last_report
@@ -0,0 +1,113 @@
+import datetime
+
+
+WAITING = "waiting"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+UPSTREAM_FAILED = "upstream_failed"
+
+
+class WorkflowRun:
+    """
+    The node states of one run of a workflow. Nodes are started in dependency order,
+    a failed node marks every node downstream of it as upstream_failed without running them.
+    """
+
+    def __init__(self, workflow, run_id) -> None:
+        self._workflow = workflow
+        self._run_id = run_id
+        self._start_datetime = datetime.datetime.now()
+        self._finish_datetime = None
+
+        self._node_states = {node_name: WAITING for node_name in workflow.node_names}
+        # node name -> number of upstream nodes which are not done yet
+        self._remaining_upstreams = {node_name: len(workflow.upstreams(node_name)) for node_name in workflow.node_names}
+        self._active_count = 0
+        # node name -> (start_datetime, finish_datetime, running_time) of the finished nodes
+        self._node_reports = {}
+
+    @property
+    def run_id(self):
+        return self._run_id
+
+    @property
+    def node_states(self):
+        return dict(self._node_states)
+
+    @property
+    def is_finished(self):
+        return self._active_count == 0 and WAITING not in self._node_states.values()
+
+    @property
+    def is_success(self):
+        return all(node_state == DONE for node_state in self._node_states.values())
+
+    def take_ready_nodes(self):
+        """Returns the waiting nodes whose upstream nodes are all done, and marks them running."""
+        ready_nodes = [node_name for node_name, node_state in self._node_states.items()
+                       if node_state == WAITING and self._remaining_upstreams[node_name] == 0]
+        for node_name in ready_nodes:
+            self._node_states[node_name] = RUNNING
+        self._active_count += len(ready_nodes)
+        return ready_nodes
+
+    def finish_node(self, node_name, is_success, start_datetime=None, finish_datetime=None, running_time=None):
+        if self._node_states[node_name] != RUNNING:
+            return
+        self._active_count -= 1
+        self._node_reports[node_name] = (start_datetime, finish_datetime, running_time)
+
+        if is_success:
+            self._node_states[node_name] = DONE
+            for downstream in self._workflow.downstreams(node_name):
+                self._remaining_upstreams[downstream] -= 1
+        else:
+            self._node_states[node_name] = FAILED
+            failed_nodes = list(self._workflow.downstreams(node_name))
+            while failed_nodes:
+                downstream = failed_nodes.pop()
+                if self._node_states[downstream] == WAITING:
+                    self._node_states[downstream] = UPSTREAM_FAILED
+                    failed_nodes.extend(self._workflow.downstreams(downstream))
+
+        if self.is_finished:
+            self._finish_datetime = datetime.datetime.now()
+
+    def critical_path(self):
+        """
+        Returns [(node_name, running_time)] of the chain of nodes which decided the run time:
+        from the node which finished last, back through the upstream which finished last at every step.
+        """
+        finished_nodes = [node_name for node_name, node_report in self._node_reports.items() if node_report[1] is not None]
+        if not finished_nodes:
+            return []
+
+        node_name = max(finished_nodes, key=lambda name: self._node_reports[name][1])
+        path = []
+        while node_name is not None:
+            path.append((node_name, self._node_reports[node_name][2]))
+            upstreams = [upstream for upstream in self._workflow.upstreams(node_name)
+                         if upstream in self._node_reports and self._node_reports[upstream][1] is not None]
+            node_name = max(upstreams, key=lambda name: self._node_reports[name][1]) if upstreams else None
+        path.reverse()
+        return path
+
+    def report(self):
+        """
+        Returns {"workflow_name", "run_id", "result", "start_datetime", "finish_datetime", "elapsed", "node_states",
+        "critical_path", "critical_path_time"}, elapsed and the times of the critical path are in seconds.
+        """
+        finish_datetime = self._finish_datetime or datetime.datetime.now()
+        critical_path = self.critical_path()
+        return {
+            "workflow_name": self._workflow.workflow_name,
+            "run_id": self._run_id,
+            "result": self.is_success,
+            "start_datetime": self._start_datetime,
+            "finish_datetime": finish_datetime,
+            "elapsed": (finish_datetime - self._start_datetime).total_seconds(),
+            "node_states": dict(self._node_states),
+            "critical_path": critical_path,
+            "critical_path_time": sum(running_time or 0 for _, running_time in critical_path),
+        }
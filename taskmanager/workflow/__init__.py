@@ -0,0 +1,2 @@
+from .Workflow import Workflow
+from .WorkflowRun import WorkflowRun
\ No newline at end of file
@@ -0,0 +1,78 @@
+import os
+import time
+import threading
+import tempfile
+import collections
+
+import pytest
+
+from taskmanager import Manager, TimePlan
+from taskmanager.coordination import Coordinator, SqliteCoordinator, FileLockCoordinator
+
+
+def _claim_manager(manager_name, coordinator):
+    manager = Manager(manager_name, streaming_log_level="CRITICAL")
+    manager.enable_coordination(coordinator, mode="claim", owner_id=manager_name)
+    return manager
+
+
+def test_claim_of_a_slot_is_granted_once_across_skewed_clocks():
+    coordinator = SqliteCoordinator(os.path.join(tempfile.mkdtemp(), "coordination.db"))
+    first_manager = _claim_manager("first", coordinator)
+    second_manager = _claim_manager("second", coordinator)
+
+    # both managers fire the same cron point, their due times straddle the slot boundary
+    slot_time = float(int(time.time()) + 1)
+    now_ns = time.monotonic_ns()
+    assert first_manager._is_run_granted("task", now_ns - 1_000_000, slot_time)
+    assert not second_manager._is_run_granted("task", now_ns + 1_000_000, slot_time)
+    # the next point is a new slot
+    assert second_manager._is_run_granted("task", now_ns, slot_time + 1)
+
+
+def test_boundary_aligned_cron_point_fires_once():
+    coordinator = SqliteCoordinator(os.path.join(tempfile.mkdtemp(), "coordination.db"))
+    fire_counts = collections.Counter()
+    lock = threading.Lock()
+
+    def record_fire(terminate_event):
+        with lock:
+            fire_counts[round(time.time())] += 1
+        return True, None
+
+    managers = [_claim_manager(f"manager-{index}", coordinator) for index in range(2)]
+    for manager in managers:
+        manager.add_task("every_second", record_fire, TimePlan.create_cron_schedule("* * * * * *"), 5)
+        threading.Thread(target=manager.start, daemon=True).start()
+
+    time.sleep(4.5)
+    for manager in managers:
+        manager.remove_task("every_second")
+
+    assert sum(fire_counts.values()) >= 3
+    assert all(fire_count == 1 for fire_count in fire_counts.values()), fire_counts
+
+
+def test_claim_is_granted_to_one_of_many_concurrent_claimers():
+    coordinator = FileLockCoordinator(tempfile.mkdtemp())
+    barrier = threading.Barrier(8)
+    granted_owners = []
+
+    def claim(owner_id):
+        barrier.wait()
+        for slot in range(20):
+            if coordinator.claim_run(owner_id, "task", slot, time.time()):
+                granted_owners.append((slot, owner_id))
+
+    threads = [threading.Thread(target=claim, args=(f"owner-{index}",)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(slot for slot, _ in granted_owners) == list(range(20))
+
+
+def test_coordinator_base_is_abstract():
+    with pytest.raises(TypeError):
+        Coordinator()
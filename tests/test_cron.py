@@ -0,0 +1,68 @@
+import datetime
+
+import pytest
+
+from taskmanager.taskscheduler import CronExpression
+
+
+def test_feb_29_is_found_in_the_next_leap_year():
+    cron_expression = CronExpression("0 0 29 2 *")
+    assert cron_expression.next_fire(datetime.datetime(2025, 3, 1)) == datetime.datetime(2028, 2, 29)
+    assert cron_expression.next_fire(datetime.datetime(2028, 2, 29)) == datetime.datetime(2032, 2, 29)
+
+
+def test_day_31_skips_short_months():
+    cron_expression = CronExpression("0 12 31 * *")
+    assert cron_expression.next_fire(datetime.datetime(2025, 4, 1)) == datetime.datetime(2025, 5, 31, 12)
+
+
+def test_restricted_day_of_month_and_day_of_week_match_either():
+    # the 13th, or any friday
+    cron_expression = CronExpression("0 0 13 * fri")
+    # 2025-06-01 is a sunday, friday the 6th comes before the 13th
+    assert cron_expression.next_fire(datetime.datetime(2025, 6, 1)) == datetime.datetime(2025, 6, 6)
+    assert cron_expression.next_fire(datetime.datetime(2025, 6, 12)) == datetime.datetime(2025, 6, 13)
+    assert cron_expression.next_fire(datetime.datetime(2025, 6, 13)) == datetime.datetime(2025, 6, 20)
+
+
+def test_unrestricted_day_of_month_only_uses_day_of_week():
+    cron_expression = CronExpression("0 0 * * mon")
+    assert cron_expression.next_fire(datetime.datetime(2025, 6, 1)) == datetime.datetime(2025, 6, 2)
+    assert cron_expression.next_fire(datetime.datetime(2025, 6, 2)) == datetime.datetime(2025, 6, 9)
+
+
+def test_sunday_is_0_and_7():
+    for expression in ("0 0 * * 0", "0 0 * * 7", "0 0 * * sun"):
+        assert CronExpression(expression).next_fire(datetime.datetime(2025, 6, 2)) == datetime.datetime(2025, 6, 8)
+
+
+def test_seconds_field_and_steps():
+    cron_expression = CronExpression("*/20 * * * * *")
+    assert cron_expression.next_fire(datetime.datetime(2025, 1, 1, 0, 0, 59)) == datetime.datetime(2025, 1, 1, 0, 1, 0)
+    assert cron_expression.next_fire(datetime.datetime(2025, 1, 1, 0, 1, 0)) == datetime.datetime(2025, 1, 1, 0, 1, 20)
+
+
+@pytest.mark.parametrize("expression", ["* * * *", "61 * * * *", "* * 0 * *", "* * * 13 *", "*/0 * * * *", "5-1 * * * *"])
+def test_invalid_expressions_are_rejected(expression):
+    with pytest.raises(ValueError):
+        CronExpression(expression)
+
+
+def test_expression_which_never_matches_is_rejected_on_search():
+    with pytest.raises(ValueError):
+        CronExpression("0 0 30 2 *").next_fire(datetime.datetime(2025, 1, 1))
+
+
+def test_star_step_day_of_month_is_unrestricted():
+    # */1 covers every day, so only the mondays match
+    cron_expression = CronExpression("0 0 */1 * mon")
+    assert cron_expression.next_fire(datetime.datetime(2025, 6, 2)) == datetime.datetime(2025, 6, 9)
+    cron_expression = CronExpression("0 0 1-31 * mon")
+    assert cron_expression.next_fire(datetime.datetime(2025, 6, 2)) == datetime.datetime(2025, 6, 9)
+
+
+def test_step_of_one_runs_to_the_end_of_the_range():
+    cron_expression = CronExpression("0 10/1 * * *")
+    assert cron_expression.next_fire(datetime.datetime(2025, 6, 2, 1)) == datetime.datetime(2025, 6, 2, 10)
+    assert cron_expression.next_fire(datetime.datetime(2025, 6, 2, 10)) == datetime.datetime(2025, 6, 2, 11)
+    assert cron_expression.next_fire(datetime.datetime(2025, 6, 2, 23)) == datetime.datetime(2025, 6, 3, 10)
@@ -0,0 +1,52 @@
+import os
+import time
+import threading
+
+from taskmanager.executor import ProcessWorkerPool
+
+
+def _sleep_and_report_pid(terminate_event, seconds):
+    time.sleep(seconds)
+    return True, os.getpid()
+
+
+def test_leaked_process_worker_is_replaced():
+    pool = ProcessWorkerPool("test-process", max_workers=1)
+    workers = []
+    results = []
+
+    def dispatch(seconds):
+        def job():
+            workers.append(pool.current_worker())
+            try:
+                results.append(pool.invoke(_sleep_and_report_pid, None, (seconds,), {}))
+            except Exception as err:
+                results.append(err)
+        return job
+
+    try:
+        pool.submit(dispatch(30))
+        deadline = time.monotonic() + 10
+        while not workers and time.monotonic() < deadline:
+            time.sleep(0.05)
+        # as if the process had survived SIGKILL
+        pool.mark_leaked(workers[0])
+        pool.submit(dispatch(0))
+
+        deadline = time.monotonic() + 20
+        while len(results) < 2 and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        assert isinstance(results[0], Exception)
+        assert results[1][0] is True
+        assert results[1][1] != workers[0].process.pid
+        assert pool.leak_stats()["leaked_count"] == 1
+    finally:
+        pool.shutdown()
+        for worker in workers:
+            worker.process.kill()
+
+
+def test_process_workers_are_not_forked():
+    pool = ProcessWorkerPool("test-process")
+    assert pool._mp_context.get_start_method() in ("forkserver", "spawn")
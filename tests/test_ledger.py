@@ -0,0 +1,52 @@
+import os
+import datetime
+import tempfile
+
+import pytest
+
+from taskmanager.ledger import RunLedger, SqliteRunLedger, RunRecord
+
+
+class _Unprintable:
+    def __str__(self):
+        raise RuntimeError("can not be printed")
+
+
+def _record(run_id, result_msg="ok", running_time=1.0, start_datetime=None):
+    start_datetime = start_datetime or datetime.datetime.now()
+    return RunRecord("task", run_id, "done", start_datetime, start_datetime, running_time, True, result_msg, [])
+
+
+def test_bad_record_is_dropped_and_writer_keeps_running():
+    ledger = SqliteRunLedger(os.path.join(tempfile.mkdtemp(), "runs.db"), flush_interval=0.05)
+    try:
+        ledger.append(_record(1))
+        ledger.append(_record(2, result_msg=_Unprintable()))
+        ledger.append(_record(3))
+        assert ledger.flush(timeout=5)
+        assert [record.run_id for record in ledger.query("task")] == [1, 3]
+        assert ledger.dropped_count == 1
+    finally:
+        ledger.close(timeout=5)
+
+
+def test_running_time_percentile_and_retention():
+    ledger = SqliteRunLedger(os.path.join(tempfile.mkdtemp(), "runs.db"), retention_days=1, flush_interval=0.05)
+    try:
+        old = datetime.datetime.now() - datetime.timedelta(days=3)
+        for run_id in range(100):
+            ledger.append(_record(run_id, running_time=run_id / 100 + 0.01))
+        ledger.append(_record(100, start_datetime=old))
+        assert ledger.flush(timeout=5)
+        # the writer applies retention on its own as well
+        ledger.apply_retention()
+        assert 100 not in [record.run_id for record in ledger.query("task")]
+        assert ledger.running_time_percentile("task", 95) == 0.95
+        assert ledger.running_time_percentile("task", 100) == 1.0
+    finally:
+        ledger.close(timeout=5)
+
+
+def test_run_ledger_base_is_abstract():
+    with pytest.raises(TypeError):
+        RunLedger()
@@ -0,0 +1,49 @@
+import logging
+
+from taskmanager.logutil import Logger
+
+
+class _ListHandler(logging.Handler):
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def _queued_logger(logger_name):
+    logger = Logger(logger_name, streaming_log_level="CRITICAL")
+    list_handler = _ListHandler()
+    logging.getLogger(logger_name).addHandler(list_handler)
+    logger.enable_queue_logging(1000, 16)
+    return logger, list_handler
+
+
+def test_queued_record_keeps_the_args_of_the_call():
+    logger, list_handler = _queued_logger("test-queue-args")
+    counts = {"runs": 1}
+    logger.critical("runs: %(runs)s", counts)
+    counts["runs"] = 2
+    logger.stop_queue_logging()
+
+    assert list_handler.messages == ["runs: 1"]
+
+
+def test_stop_writes_every_record_and_moves_the_handlers_back():
+    logger, list_handler = _queued_logger("test-queue-stop")
+    for index in range(100):
+        logger.critical("record %s", index)
+    logger.stop_queue_logging()
+    logger.critical("after stop")
+
+    assert list_handler.messages == [f"record {index}" for index in range(100)] + ["after stop"]
+    assert list_handler in logging.getLogger("test-queue-stop").handlers
+    assert logger.queue_depth == 0
+
+    # queue logging can be enabled again
+    logger.enable_queue_logging(1000, 16)
+    logger.critical("queued again")
+    logger.stop_queue_logging()
+    assert list_handler.messages[-1] == "queued again"
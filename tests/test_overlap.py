@@ -0,0 +1,88 @@
+import time
+import threading
+
+import pytest
+
+from taskmanager import Manager, TimePlan, OverlapPolicy
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@pytest.fixture
+def manager():
+    manager = Manager("overlap", streaming_log_level="CRITICAL")
+    threading.Thread(target=manager.start, daemon=True).start()
+    yield manager
+    for task_name in list(manager.task_dict):
+        manager.remove_task(task_name)
+
+
+def _add_blocking_task(manager, overlap_policy, **task_kwargs):
+    # every run blocks until the gate opens, runs are due every 50 ms
+    gate = threading.Event()
+    started = []
+
+    def blocking(terminate_event):
+        started.append(time.monotonic())
+        while not gate.is_set() and not terminate_event.is_set():
+            time.sleep(0.01)
+        return True, None
+
+    manager.add_task("blocking", blocking, TimePlan.create_interval_schedule(ms=50), 5,
+                     overlap_policy=overlap_policy, **task_kwargs)
+    return manager.task_dict["blocking"], gate, started
+
+
+def test_skip_drops_overlapping_runs(manager):
+    task, gate, started = _add_blocking_task(manager, OverlapPolicy.SKIP)
+    assert _wait_for(lambda: task.dropped_count >= 3)
+    assert len(started) == 1
+    assert task.pending_count == 0
+    gate.set()
+
+
+def test_queue_keeps_up_to_queue_depth_runs(manager):
+    task, gate, started = _add_blocking_task(manager, OverlapPolicy.QUEUE, queue_depth=2)
+    assert _wait_for(lambda: task.dropped_count >= 2)
+    assert task.queued_count == 2
+    assert task.pending_count == 2
+    assert len(started) == 1
+
+    # the queued runs start once the active one is reported
+    gate.set()
+    assert _wait_for(lambda: len(started) >= 3)
+
+
+def test_coalesce_merges_overlapping_runs_into_one(manager):
+    task, gate, started = _add_blocking_task(manager, OverlapPolicy.COALESCE)
+    assert _wait_for(lambda: task.coalesced_count >= 3)
+    assert task.queued_count == 1
+    assert task.pending_count == 1
+    assert task.dropped_count == 0
+
+    gate.set()
+    assert _wait_for(lambda: len(started) >= 2)
+
+
+def test_replace_terminates_the_running_run(manager):
+    task, gate, started = _add_blocking_task(manager, OverlapPolicy.REPLACE)
+    # the replaced run sees terminate_event, so the next run starts without opening the gate
+    assert _wait_for(lambda: len(started) >= 3)
+    assert task.replaced_count >= 2
+    assert task.dropped_count == 0
+    gate.set()
+
+
+def test_max_instances_runs_side_by_side(manager):
+    task, gate, started = _add_blocking_task(manager, OverlapPolicy.SKIP, max_instances=3)
+    assert _wait_for(lambda: task.dropped_count >= 1)
+    assert len(started) == 3
+    assert len(task.active_runs) == 3
+    gate.set()
@@ -0,0 +1,53 @@
+import time
+import logging
+
+from taskmanager.logutil import Logger
+from taskmanager.metrics import LoopProfiler
+
+
+class _ListHandler(logging.Handler):
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def _profiler(logger_name, budget):
+    list_handler = _ListHandler()
+    logger = Logger(logger_name, streaming_log_level="CRITICAL")
+    logging.getLogger(logger_name).addHandler(list_handler)
+    list_handler.setLevel(logging.WARNING)
+    logging.getLogger(logger_name).setLevel(logging.WARNING)
+    return LoopProfiler(logger, "[test]", budget=budget, window=10), list_handler
+
+
+def test_stats_cover_the_last_window_iterations():
+    loop_profiler, _ = _profiler("test-profiler-stats", budget=1)
+    for _ in range(25):
+        loop_profiler.start_iteration()
+        loop_profiler.mark("fire")
+        loop_profiler.mark("report")
+        loop_profiler.end_iteration()
+
+    phase_stats = loop_profiler.stats()
+    assert set(phase_stats) == {"fire", "report", "total"}
+    assert all(stats["count"] == 10 for stats in phase_stats.values())
+    assert phase_stats["total"]["p50"] <= phase_stats["total"]["max"]
+    assert loop_profiler.stall_count == 0
+
+
+def test_over_budget_iteration_logs_its_own_phases():
+    loop_profiler, list_handler = _profiler("test-profiler-stall", budget=0.01)
+    loop_profiler.start_iteration()
+    loop_profiler.mark("fire")
+    time.sleep(0.02)
+    loop_profiler.mark("report")
+    loop_profiler.end_iteration()
+
+    assert loop_profiler.stall_count == 1
+    assert len(list_handler.messages) == 1
+    assert "phases: fire: 0.0" in list_handler.messages[0]
+    assert "report: 0.0" in list_handler.messages[0]
@@ -0,0 +1,56 @@
+from taskmanager.resource import ResourceBudget
+
+
+def _budget():
+    resource_budget = ResourceBudget()
+    resource_budget.add_resource("db", 2)
+    resource_budget.add_resource("api", 1)
+    return resource_budget
+
+
+def test_big_waiter_is_not_starved_by_later_small_ones():
+    resource_budget = _budget()
+    assert resource_budget.acquire("small-1", {"db": 1})
+    # needs the whole db budget, waits for small-1
+    assert not resource_budget.acquire("big", {"db": 2})
+    # a db token is free, but big is queued first on db
+    assert not resource_budget.acquire("small-2", {"db": 1})
+
+    assert resource_budget.release("small-1") == ["big"]
+    assert resource_budget.release("big") == ["small-2"]
+    assert resource_budget.snapshot()["db"] == {"capacity": 2, "available": 1, "waiting": 0}
+
+
+def test_waiter_on_other_resources_passes_the_queue():
+    resource_budget = _budget()
+    assert resource_budget.acquire("small", {"db": 1})
+    assert not resource_budget.acquire("big", {"db": 2})
+    # needs nothing big waits for, so it is not held up
+    assert resource_budget.acquire("api_only", {"api": 1})
+    assert not resource_budget.acquire("api_later", {"api": 1})
+    assert resource_budget.waiting_count == 2
+
+    assert resource_budget.release("api_only") == ["api_later"]
+    assert resource_budget.release("small") == ["big"]
+
+
+def test_waiters_are_granted_in_queue_order():
+    resource_budget = _budget()
+    assert resource_budget.acquire("holder", {"db": 2, "api": 1})
+    for holder in ("first", "second", "third"):
+        assert not resource_budget.acquire(holder, {"db": 1})
+
+    # two tokens come back, the two earliest waiters take them
+    assert resource_budget.release("holder") == ["first", "second"]
+    assert resource_budget.release("first") == ["third"]
+
+
+def test_dropped_waiter_leaves_the_queue():
+    resource_budget = _budget()
+    assert resource_budget.acquire("holder", {"api": 1})
+    assert not resource_budget.acquire("dropped", {"api": 1})
+    assert not resource_budget.acquire("kept", {"api": 1})
+
+    assert resource_budget.release("dropped") == []
+    assert resource_budget.snapshot()["api"]["waiting"] == 1
+    assert resource_budget.release("holder") == ["kept"]
@@ -0,0 +1,75 @@
+import time
+
+import pytest
+
+from taskmanager.taskscheduler import TaskScheduler
+from taskmanager.taskscheduler.ScheduleJob import ScheduleJob, CalendarJob
+
+
+def _recorder(fired, name):
+    def fire(due_time, slot_time):
+        fired.append(name)
+    return fire
+
+
+def test_due_jobs_run_in_deadline_order():
+    scheduler = TaskScheduler()
+    fired = []
+    for name, delay in [("c", 0.03), ("a", 0.01), ("b", 0.02)]:
+        scheduler.create_once_schedule(delay, _recorder(fired, name))
+
+    time.sleep(0.05)
+    scheduler.run_pending()
+    assert fired == ["a", "b", "c"]
+    # once jobs are not rescheduled
+    assert scheduler.job_count == 0
+    assert scheduler.next_run_time is None
+
+
+def test_cancelled_job_never_runs_and_is_not_counted():
+    scheduler = TaskScheduler()
+    fired = []
+    early_job = scheduler.create_once_schedule(0.01, _recorder(fired, "early"))
+    late_job = scheduler.create_once_schedule(0.02, _recorder(fired, "late"))
+
+    scheduler.cancel_job(early_job)
+    # cancelling twice is a no-op
+    scheduler.cancel_job(early_job)
+    assert scheduler.job_count == 1
+    # the cancelled head is dropped lazily, the next run time is the one of the live job
+    assert scheduler.next_run_time == late_job.next_run
+
+    time.sleep(0.03)
+    scheduler.run_pending()
+    assert fired == ["late"]
+
+
+def test_heap_is_compacted_once_most_jobs_are_cancelled():
+    scheduler = TaskScheduler()
+    jobs = [scheduler.create_interval_schedule(60, _recorder([], index)) for index in range(100)]
+    for job in jobs[:60]:
+        scheduler.cancel_job(job)
+
+    assert scheduler.job_count == 40
+    # the sweep ran when the 51st job was cancelled, the later ones wait for a lazy drop
+    assert len(scheduler._job_heap) == 49
+    assert sum(job._is_queued for job in jobs[:60]) == 9
+
+
+def test_interval_job_is_rescheduled_after_it_runs():
+    scheduler = TaskScheduler()
+    fired = []
+    scheduler.create_interval_schedule(0.02, _recorder(fired, "interval"))
+
+    for _ in range(3):
+        time.sleep(max(0, scheduler.idle_seconds) + 0.005)
+        scheduler.run_pending()
+    assert fired == ["interval"] * 3
+    assert scheduler.job_count == 1
+
+
+def test_schedule_job_bases_are_abstract():
+    with pytest.raises(TypeError):
+        ScheduleJob(lambda due_time, slot_time: None)
+    with pytest.raises(TypeError):
+        CalendarJob(lambda due_time, slot_time: None)
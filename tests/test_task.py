@@ -0,0 +1,31 @@
+import pytest
+
+from taskmanager.logutil import Logger
+from taskmanager.executor import ThreadWorkerPool
+from taskmanager.metrics import TaskMetrics
+from taskmanager.task import Task, TaskConfig, TaskState
+
+
+class _FullPool(ThreadWorkerPool):
+    """A worker pool whose pending queue is always full."""
+
+    def submit(self, job):
+        raise Exception("pending queue of pool full is full")
+
+
+def _noop(terminate_event):
+    return True, None
+
+
+def test_failed_submit_is_not_counted_as_running():
+    metrics = TaskMetrics("noop")
+    task = Task(TaskConfig(_noop, 5), "noop", Logger("test-task", streaming_log_level="CRITICAL"),
+                executor=_FullPool("full"), metrics=metrics)
+
+    with pytest.raises(Exception) as error_info:
+        task.run()
+
+    assert "pending queue of pool full is full" in str(error_info.value.__cause__)
+    assert metrics.state_count(TaskState.RUNNING) == 0
+    # the slot is given back, so the next due run tries again
+    assert task.active_runs == []
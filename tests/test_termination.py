@@ -0,0 +1,42 @@
+import time
+import threading
+
+from taskmanager import Manager, TimePlan, Timeout
+
+
+def test_kill_ladder_reports_a_stubborn_thread_as_leaked():
+    stop = threading.Event()
+
+    def stubborn(terminate_event):
+        # ignores terminate_event and swallows the async exceptions of the kill ladder
+        while not stop.is_set():
+            try:
+                time.sleep(0.01)
+            except BaseException:
+                pass
+        return True, None
+
+    manager = Manager("termination", streaming_log_level="CRITICAL")
+    manager.add_executor("fast", kill_delays=(0, 0.2, 0.2), leak_grace=0.3)
+    manager.add_task("stubborn", stubborn, TimePlan.create_interval_schedule(sec=10), Timeout(ms=200), executor="fast")
+    # do not wait half an hour for the run to stop after terminate_event is set
+    manager.task_dict["stubborn"]._terminate_limit = 0.1
+    threading.Thread(target=manager.start, daemon=True).start()
+
+    try:
+        deadline = time.monotonic() + 10
+        while manager.leak_stats()["fast"]["leaked_count"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        assert manager.leak_stats()["fast"]["leaked_count"] == 1
+        assert manager.metrics_snapshot()["stubborn"]["state_counts"].get("leaked") == 1
+        assert manager.status()["leaked_workers"] == 1
+    finally:
+        stop.set()
+        manager.remove_task("stubborn")
+
+    # the leaked thread is recovered once it finally returns
+    deadline = time.monotonic() + 5
+    while manager.leak_stats()["fast"]["recovered_count"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert manager.leak_stats()["fast"]["recovered_count"] == 1